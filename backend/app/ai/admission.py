@@ -0,0 +1,149 @@
+"""
+Admission control for new evaluations.
+
+POST /apply calls admit() before it accepts an upload:
+
+- Past the hard limits on outstanding work (ai_queue pending + processing,
+  globally and per job) the request is refused with 429 and Retry-After.
+- Otherwise the evaluation is queued, and it only starts in the API
+  process if try_acquire() finds a free in-flight slot. When the process
+  is saturated the row simply waits in the durable queue for a worker.
+
+Jobs flagged `priority` form a separate lane: their queue rows are claimed
+first, and ADMISSION_PRIORITY_RESERVE of the global queue depth and
+in-flight slots is held back for them.
+
+Bulk ingest (ai.ingest) sizes each chunk by capacity() and waits while the
+queue is full, so a large archive never queues past the same limits.
+"""
+import time
+from typing import Dict, Optional, Tuple
+
+from ..core.config import settings
+from ..core.metrics import registry
+from ..db.counters import queue_counts
+from ..db.mongo import db
+
+PRIORITY_LANE = "priority"
+STANDARD_LANE = "standard"
+
+OUTSTANDING = ("pending", "processing")
+
+_depths: Dict[Optional[str], Tuple[float, int]] = {}
+_inflight: Dict[str, int] = {}
+
+admission_decisions = registry.counter(
+    "admission_decisions_total",
+    "POST /apply admission outcomes (inline, queued, rejected) by lane"
+)
+inflight_gauge = registry.gauge(
+    "admission_inflight_evaluations",
+    "Evaluations running inline in this API process"
+)
+
+
+class AdmissionRejected(Exception):
+    def __init__(self, reason: str, retry_after: int):
+        self.reason = reason
+        self.retry_after = retry_after
+        super().__init__(reason)
+
+
+def lane_for(job: dict) -> str:
+    return PRIORITY_LANE if job.get("priority") else STANDARD_LANE
+
+
+def queue_priority(lane: str) -> int:
+    """ai_queue sort key: higher is claimed first"""
+    return 1 if lane == PRIORITY_LANE else 0
+
+
+def lane_limit(limit: int, lane: str) -> int:
+    """Global limits: the standard lane stops short of the priority reserve"""
+    if lane == PRIORITY_LANE:
+        return limit
+    return max(1, int(limit * (1 - settings.ADMISSION_PRIORITY_RESERVE)))
+
+
+# ---------- Queue depth ----------
+
+async def outstanding(job_id: Optional[str] = None, fresh: bool = False) -> int:
+    """Pending + processing items, globally or for one job, cached briefly"""
+    entry = _depths.get(job_id)
+    if not fresh and entry is not None and entry[0] > time.monotonic():
+        return entry[1]
+
+    if job_id is None:
+        counts = await queue_counts()
+        depth = sum(counts[status] for status in OUTSTANDING)
+    else:
+        depth = await db.ai_queue.count_documents(
+            {"job_id": job_id, "status": {"$in": list(OUTSTANDING)}}
+        )
+    _depths[job_id] = (time.monotonic() + settings.ADMISSION_DEPTH_TTL_SECONDS, depth)
+    return depth
+
+
+async def admit(job: dict) -> str:
+    """Return the job's lane, or raise AdmissionRejected past the hard limits"""
+    lane = lane_for(job)
+    job_id = str(job["_id"])
+
+    if await outstanding() >= lane_limit(settings.ADMISSION_MAX_QUEUE_DEPTH, lane):
+        admission_decisions.inc(lane=lane, outcome="rejected")
+        raise AdmissionRejected(
+            "Evaluation queue is full, please retry later",
+            settings.ADMISSION_RETRY_AFTER_SECONDS
+        )
+    if await outstanding(job_id) >= settings.ADMISSION_MAX_QUEUE_DEPTH_PER_JOB:
+        admission_decisions.inc(lane=lane, outcome="rejected")
+        raise AdmissionRejected(
+            "Too many applications awaiting evaluation for this job, please retry later",
+            settings.ADMISSION_RETRY_AFTER_SECONDS
+        )
+    return lane
+
+
+async def capacity(job: dict) -> int:
+    """
+    How many more evaluations the job may queue before hitting either hard
+    limit. Bulk ingest sizes each chunk by this, so it reads fresh counts.
+    """
+    lane = lane_for(job)
+    job_id = str(job["_id"])
+    return min(
+        lane_limit(settings.ADMISSION_MAX_QUEUE_DEPTH, lane) - await outstanding(fresh=True),
+        settings.ADMISSION_MAX_QUEUE_DEPTH_PER_JOB - await outstanding(job_id, fresh=True)
+    )
+
+
+# ---------- In-flight slots (this process) ----------
+
+def inflight(job_id: Optional[str] = None) -> int:
+    if job_id is None:
+        return sum(_inflight.values())
+    return _inflight.get(job_id, 0)
+
+
+def try_acquire(job_id: str, lane: str) -> bool:
+    """Take an in-flight slot for an inline evaluation; False means leave it queued"""
+    if (
+        inflight() >= lane_limit(settings.ADMISSION_MAX_INFLIGHT, lane)
+        or inflight(job_id) >= settings.ADMISSION_MAX_INFLIGHT_PER_JOB
+    ):
+        admission_decisions.inc(lane=lane, outcome="queued")
+        return False
+
+    _inflight[job_id] = _inflight.get(job_id, 0) + 1
+    inflight_gauge.set(inflight())
+    admission_decisions.inc(lane=lane, outcome="inline")
+    return True
+
+
+def release(job_id: str):
+    remaining = _inflight.get(job_id, 0) - 1
+    if remaining > 0:
+        _inflight[job_id] = remaining
+    else:
+        _inflight.pop(job_id, None)
+    inflight_gauge.set(inflight())
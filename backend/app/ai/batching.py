@@ -0,0 +1,87 @@
+"""
+Batched resume extraction for the queue worker.
+
+Instead of one LLM round trip per applicant, the worker hands a drained
+batch of graph states to prefill_resume_data. It resolves what it can
+from the parse cache, extracts the remaining texts concurrently, and
+sends them to the LLM as multi-document prompts. Each result is written
+back into its applicant's state, so resume_node can skip the LLM.
+"""
+import asyncio
+from typing import Dict, List
+
+from ..core.config import settings
+from .parse_cache import hash_file, parse_cache
+from .resume_parser import extract_resume_text, parse_resume_texts_batch, prepare_resume_text
+
+
+def group_by_size(texts: Dict[str, str], max_chars: int) -> List[Dict[str, str]]:
+    """Split texts into groups whose combined size stays under max_chars"""
+    groups: List[Dict[str, str]] = []
+    current: Dict[str, str] = {}
+    size = 0
+    for doc_id, text in texts.items():
+        if current and size + len(text) > max_chars:
+            groups.append(current)
+            current, size = {}, 0
+        current[doc_id] = text
+        size += len(text)
+    if current:
+        groups.append(current)
+    return groups
+
+
+async def _hash_and_lookup(state: dict):
+    if not state.get("resume_hash"):
+        state["resume_hash"] = await asyncio.to_thread(hash_file, state["resume_path"])
+    cached = await parse_cache.get(state["resume_hash"])
+    if cached is not None:
+        state["resume_data"] = cached
+
+
+async def _extract(state: dict):
+    try:
+        return prepare_resume_text(await extract_resume_text(state["resume_path"]))
+    except Exception as e:
+        print("Batch extraction failed:", e)
+        return None
+
+
+async def prefill_resume_data(states: List[dict]):
+    """
+    Fill state["resume_data"] for as many states as possible in few LLM calls.
+
+    States that cannot be resolved here are left untouched and go
+    through the regular per-applicant resume_node.
+    """
+    await asyncio.gather(*(_hash_and_lookup(s) for s in states), return_exceptions=True)
+
+    pending = [s for s in states if "resume_data" not in s and s.get("resume_hash")]
+    if not pending:
+        return
+
+    texts = await asyncio.gather(*(_extract(s) for s in pending))
+    by_id = {}
+    resume_texts = {}
+    for index, (state, text) in enumerate(zip(pending, texts)):
+        if text is None:
+            continue
+        doc_id = f"doc{index}"
+        by_id[doc_id] = state
+        resume_texts[doc_id] = text
+
+    groups = group_by_size(resume_texts, settings.LLM_BATCH_MAX_CHARS)
+    results = await asyncio.gather(
+        *(parse_resume_texts_batch(group) for group in groups),
+        return_exceptions=True
+    )
+
+    for result in results:
+        if isinstance(result, Exception):
+            print("Batch resume parsing failed:", result)
+            continue
+        for doc_id, resume_data in result.items():
+            state = by_id[doc_id]
+            state["resume_data"] = resume_data
+            if resume_data.get("skills"):
+                await parse_cache.put(state["resume_hash"], resume_data)
@@ -0,0 +1,148 @@
+"""
+Single dispatch path for evaluations.
+
+Every evaluation is identified by an idempotency key
+(applicant_id + job_id + PIPELINE_VERSION). ai_queue and evaluations both
+have a unique index on it, so a key is queued once and evaluated once, no
+matter how often it is submitted. The API process may start an evaluation
+right away, but only by claiming the queue row like any other worker.
+"""
+import asyncio
+from datetime import datetime, timezone
+from typing import Optional
+
+from pymongo.errors import DuplicateKeyError
+
+from ..core import events
+from ..core.config import settings
+from ..db.mongo import db
+from ..db.counters import record_transition
+from . import admission, queue
+
+_owner: Optional[str] = None
+_tasks = set()
+
+
+def idempotency_key(applicant_id: str, job_id: str) -> str:
+    return f"{applicant_id}:{job_id}:{settings.PIPELINE_VERSION}"
+
+
+def _api_owner() -> str:
+    global _owner
+    if _owner is None:
+        _owner = queue.new_worker_id()
+    return _owner
+
+
+async def enqueue(applicant_id: str, job_id: str, **fields) -> tuple:
+    """
+    Create the queue row for a key unless it already exists.
+
+    Returns (row, created).
+    """
+    key = idempotency_key(applicant_id, job_id)
+    try:
+        result = await db.ai_queue.update_one(
+            {"idempotency_key": key},
+            {"$setOnInsert": {
+                "idempotency_key": key,
+                "applicant_id": applicant_id,
+                "job_id": job_id,
+                "status": "pending",
+                "attempts": 0,
+                "created_at": datetime.now(timezone.utc),
+                **fields
+            }},
+            upsert=True
+        )
+        created = result.upserted_id is not None
+    except DuplicateKeyError:
+        # Lost an upsert race against an identical submission
+        created = False
+
+    row = await db.ai_queue.find_one({"idempotency_key": key})
+    if created:
+        await record_transition(to_status="pending", wait=True)
+        events.publish_status(row, "pending")
+        queue.notify()
+    return row, created
+
+
+async def _heartbeat(owner: str, item_id):
+    while True:
+        await asyncio.sleep(settings.QUEUE_HEARTBEAT_SECONDS)
+        await queue.heartbeat(owner, [item_id])
+
+
+async def run_inline(item_id):
+    """Evaluate a queue row in this process if no worker has claimed it yet"""
+    from .graph import get_graph
+    from .process_queue import build_state, run_item
+
+    owner = _api_owner()
+    item = await queue.claim_item(item_id, owner)
+    if item is None:
+        return
+
+    beat = asyncio.create_task(_heartbeat(owner, item["_id"]))
+    try:
+        state = await build_state(item, owner)
+        if state is not None:
+            await run_item(get_graph(), item, state, owner)
+    finally:
+        beat.cancel()
+
+
+async def dispatch_evaluation(
+    applicant_id: str,
+    job_id: str,
+    run_now: bool = None,
+    lane: str = admission.STANDARD_LANE
+) -> dict:
+    """
+    Queue an evaluation exactly once and, if run_now and an in-flight slot
+    is free (see ai.admission), start it in-process. Otherwise it stays in
+    the durable queue for a worker.
+
+    Returns the current status for the key, so duplicate submissions see
+    the existing evaluation instead of a new one.
+    """
+    if run_now is None:
+        run_now = settings.DISPATCH_INLINE
+    row, created = await enqueue(applicant_id, job_id, priority=admission.queue_priority(lane))
+
+    if created and run_now and admission.try_acquire(job_id, lane):
+        task = asyncio.create_task(run_inline(row["_id"]))
+        _tasks.add(task)
+        task.add_done_callback(_tasks.discard)
+        task.add_done_callback(lambda _: admission.release(job_id))
+
+    status = await evaluation_status(applicant_id, job_id)
+    status["created"] = created
+    return status
+
+
+async def drain(timeout: float = None):
+    """Wait for evaluations started by this process, e.g. on shutdown"""
+    if _tasks:
+        await asyncio.wait(list(_tasks), timeout=timeout)
+
+
+async def evaluation_status(applicant_id: str, job_id: str) -> dict:
+    key = idempotency_key(applicant_id, job_id)
+    row = await db.ai_queue.find_one({"idempotency_key": key}, {"status": 1, "error": 1})
+    evaluation = await db.evaluations.find_one(
+        {"idempotency_key": key},
+        {"final_score": 1, "decision": 1}
+    )
+
+    status = {
+        "idempotency_key": key,
+        "status": row["status"] if row else "not_queued"
+    }
+    if row and row.get("error"):
+        status["error"] = row["error"]
+    if evaluation:
+        status["final_score"] = evaluation.get("final_score")
+        status["decision"] = evaluation.get("decision")
+    return status
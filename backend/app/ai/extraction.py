@@ -0,0 +1,228 @@
+"""
+Off-loop document text extraction backed by a bounded process pool
+"""
+import asyncio
+import ctypes
+import mmap
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Optional, Tuple
+from xml.etree import ElementTree
+
+import pdfplumber
+import pypdfium2
+
+from ..core.blobstore import open_blob
+from ..core.config import settings
+from ..core.tracing import span
+
+PAGE_SEPARATOR = "\f"
+
+DOCX_BODY = "word/document.xml"
+WORD_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+
+_executor: Optional[ProcessPoolExecutor] = None
+
+
+# ---------- Pool ----------
+
+def get_executor() -> ProcessPoolExecutor:
+    """Return the shared extraction pool, creating it on first use"""
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=settings.EXTRACTION_WORKERS)
+    return _executor
+
+
+def shutdown_executor():
+    """Stop the extraction pool, e.g. on application shutdown"""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True, cancel_futures=True)
+        _executor = None
+
+
+def reset_executor(executor: Optional[ProcessPoolExecutor] = None):
+    """
+    Kill a pool whose worker is stuck on a runaway extraction.
+
+    A timed-out future keeps running inside its process, so the only way
+    to get the worker back is to terminate the pool; the next call to
+    get_executor starts a fresh one.
+    """
+    global _executor
+    target = executor or _executor
+    if target is None:
+        return
+    if _executor is target:
+        _executor = None
+    # ProcessPoolExecutor has no public way to stop a busy worker
+    for process in list((target._processes or {}).values()):
+        process.terminate()
+    target.shutdown(wait=False, cancel_futures=True)
+
+
+async def run_in_pool(fn, *args):
+    """
+    Run fn in the extraction pool.
+
+    Jobs caught in a pool reset by someone else's runaway extraction are
+    retried once on the replacement pool.
+    """
+    loop = asyncio.get_running_loop()
+    for attempt in range(2):
+        executor = get_executor()
+        try:
+            return await loop.run_in_executor(executor, fn, *args)
+        except BrokenProcessPool:
+            reset_executor(executor)
+            if attempt:
+                raise
+
+
+# ---------- Workers (run inside the pool) ----------
+
+def extract_pdf_pages(file_path: str, start: int, stop: int, max_chars: int) -> Tuple[str, int]:
+    """
+    Extract pages [start, stop) of a PDF.
+
+    Returns the page texts joined by PAGE_SEPARATOR and the document's
+    total page count, so the first call also tells the caller how many
+    more ranges to schedule.
+    """
+    parts: List[str] = []
+    size = 0
+    with open_blob(file_path) as data, pdfplumber.open(data) as pdf:
+        total_pages = len(pdf.pages)
+        for page in pdf.pages[start:stop]:
+            page_text = page.extract_text() or ""
+            parts.append(page_text)
+            size += len(page_text)
+            if size >= max_chars:
+                break
+    return PAGE_SEPARATOR.join(parts), total_pages
+
+
+def extract_pdf_text_layer(file_path: str, max_pages: int, max_chars: int) -> str:
+    """
+    Read the embedded text layer with pdfium.
+
+    An order of magnitude faster than pdfplumber's layout analysis, which
+    stays available as the fallback for documents this gets nothing from.
+    pdfium reads the mapped blob in place rather than a copy of it.
+    """
+    with open_blob(file_path) as data:
+        return _extract_text_layer(data, max_pages, max_chars)
+
+
+def _extract_text_layer(data, max_pages: int, max_chars: int) -> str:
+    # Kept apart so the buffer borrowed from the mapping is released on
+    # return, before open_blob unmaps it
+    parts: List[str] = []
+    size = 0
+    if isinstance(data, mmap.mmap):
+        buffer = (ctypes.c_char * len(data)).from_buffer(data)
+    else:
+        buffer = data.getvalue()
+    pdf = pypdfium2.PdfDocument(buffer)
+    try:
+        for index in range(min(len(pdf), max_pages)):
+            page = pdf[index]
+            textpage = page.get_textpage()
+            try:
+                page_text = textpage.get_text_bounded().replace("\r\n", "\n")
+            finally:
+                textpage.close()
+                page.close()
+            parts.append(page_text)
+            size += len(page_text)
+            if size >= max_chars:
+                break
+    finally:
+        pdf.close()
+    return PAGE_SEPARATOR.join(parts)[:max_chars]
+
+
+def extract_docx_text(file_path: str, max_chars: int, max_xml_bytes: int) -> str:
+    """
+    Stream the paragraphs out of a DOCX body.
+
+    word/document.xml is parsed incrementally and each paragraph is
+    discarded once its text is taken, so memory stays flat however large
+    the document is. Explicit page breaks become PAGE_SEPARATOR.
+    """
+    parts: List[str] = []
+    size = 0
+    with open_blob(file_path) as data, zipfile.ZipFile(data) as archive:
+        try:
+            info = archive.getinfo(DOCX_BODY)
+        except KeyError:
+            raise ValueError("Not a Word document: missing word/document.xml")
+        # Guard against zip bombs before inflating anything
+        if info.file_size > max_xml_bytes:
+            raise ValueError(f"Document body exceeds {max_xml_bytes} bytes")
+
+        with archive.open(info) as body:
+            paragraph: List[str] = []
+            for _, elem in ElementTree.iterparse(body, events=("end",)):
+                tag = elem.tag
+                if tag == WORD_NS + "t":
+                    paragraph.append(elem.text or "")
+                elif tag == WORD_NS + "tab":
+                    paragraph.append("\t")
+                elif tag == WORD_NS + "br":
+                    page_break = elem.get(WORD_NS + "type") == "page"
+                    paragraph.append(PAGE_SEPARATOR if page_break else "\n")
+                elif tag == WORD_NS + "p":
+                    line = "".join(paragraph)
+                    paragraph = []
+                    elem.clear()
+                    parts.append(line)
+                    size += len(line) + 1
+                    if size >= max_chars:
+                        break
+
+    return "\n".join(parts)[:max_chars]
+
+
+def page_ranges(start: int, stop: int, step: int) -> List[Tuple[int, int]]:
+    return [(i, min(i + step, stop)) for i in range(start, stop, step)]
+
+
+# ---------- Engine ----------
+
+async def extract_pdf_text(file_path: str) -> str:
+    """
+    Extract PDF text without blocking the event loop.
+
+    The first page range is extracted straight away; larger documents are
+    split into further ranges that run in parallel across the pool.
+    Output is capped at RESUME_MAX_PAGES pages and RESUME_MAX_CHARS characters.
+    """
+    with span("pdf.extract") as attrs:
+        text = await _extract_pdf_text(file_path, attrs)
+        attrs["chars"] = len(text)
+        return text
+
+
+async def _extract_pdf_text(file_path: str, attrs: dict) -> str:
+    step = settings.EXTRACTION_PAGES_PER_TASK
+    max_chars = settings.RESUME_MAX_CHARS
+
+    first_stop = min(step, settings.RESUME_MAX_PAGES)
+    first_text, total_pages = await run_in_pool(
+        extract_pdf_pages, file_path, 0, first_stop, max_chars
+    )
+
+    chunks = [first_text]
+    last_page = min(total_pages, settings.RESUME_MAX_PAGES)
+    attrs["pages"] = last_page
+    if len(first_text) < max_chars and last_page > first_stop:
+        rest = await asyncio.gather(*[
+            run_in_pool(extract_pdf_pages, file_path, start, stop, max_chars)
+            for start, stop in page_ranges(first_stop, last_page, step)
+        ])
+        chunks.extend(text for text, _ in rest)
+
+    return PAGE_SEPARATOR.join(chunks)[:max_chars]
@@ -1,39 +1,18 @@
-import requests
-import json
-from langchain_google_genai import ChatGoogleGenerativeAI
-from ..core.config import settings
+from .llm import get_llm
+from .github_client import GitHubError, get_github_client
+from .structured import GitHubAnalysis, decode
 
-llm = ChatGoogleGenerativeAI(
-    model="gemini-1.5-flash",
-    google_api_key=settings.GEMINI_API_KEY,
-    temperature=0
-)
 
-GITHUB_API = "https://api.github.com/users"
-
-
-def fetch_repos(username: str):
+async def fetch_repos(username: str) -> list:
     try:
-        response = requests.get(f"{GITHUB_API}/{username}/repos", timeout=10)
-        response.raise_for_status()
-        return response.json()
-    except requests.RequestException as e:
+        return await get_github_client().repo_summaries(username)
+    except GitHubError as e:
         raise Exception(f"Failed to fetch GitHub repos: {str(e)}")
 
 
 async def analyze_github(username: str, job_role: str) -> dict:
     try:
-        repos = fetch_repos(username)
-
-        simplified_repos = [
-            {
-                "name": r.get("name", ""),
-                "description": r.get("description", ""),
-                "language": r.get("language", ""),
-                "stars": r.get("stargazers_count", 0)
-            }
-            for r in repos
-        ]
+        simplified_repos = await fetch_repos(username)
 
         prompt = f"""
         You are evaluating a GitHub profile for a {job_role} role.
@@ -50,17 +29,17 @@ async def analyze_github(username: str, job_role: str) -> dict:
         Output JSON only with keys: github_score, tech_strengths, weaknesses, hiring_insight
         """
 
-        response = llm.invoke(prompt)
-        
-        try:
-            return json.loads(response.content)
-        except json.JSONDecodeError:
+        response = await get_llm().complete(prompt)
+
+        result = await decode(response, GitHubAnalysis, prompt)
+        if result is None:
             return {
                 "github_score": 0,
                 "tech_strengths": [],
                 "weaknesses": [],
                 "hiring_insight": "Unable to analyze GitHub profile"
             }
+        return result.model_dump()
     except Exception as e:
         return {
             "github_score": 0,
@@ -0,0 +1,221 @@
+"""
+Pooled async GitHub REST client.
+
+- One keep-alive connection pool per process, authenticated with GITHUB_TOKEN.
+- ETag / If-None-Match on every GET; 304s are served from the local copy
+  and do not count against the rate limit.
+- Follows Link pagination up to GITHUB_MAX_REPOS repositories.
+- Reads X-RateLimit-* headers and waits for the reset window (up to
+  GITHUB_RATE_LIMIT_MAX_WAIT_SECONDS) instead of failing when exhausted.
+- Caches simplified repo summaries per username for GITHUB_CACHE_TTL_SECONDS.
+
+base_url and transport are injectable, so tests and benchmarks can point
+the client at a local fake server.
+"""
+import asyncio
+import time
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+import httpx
+
+from ..core.config import settings
+from ..core.tracing import record, span
+
+ETAG_CACHE_SIZE = 4096
+SUMMARY_CACHE_SIZE = 4096
+
+
+class GitHubError(Exception):
+    pass
+
+
+class GitHubRateLimitError(GitHubError):
+    def __init__(self, reset_at: float):
+        self.reset_at = reset_at
+        super().__init__(f"GitHub rate limit exhausted until {int(reset_at)}")
+
+
+class GitHubClient:
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        token: Optional[str] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        max_repos: Optional[int] = None,
+        cache_ttl: Optional[float] = None
+    ):
+        self.base_url = base_url or settings.GITHUB_API_URL
+        self.token = settings.GITHUB_TOKEN if token is None else token
+        self.transport = transport
+        self.max_repos = max_repos or settings.GITHUB_MAX_REPOS
+        self.cache_ttl = settings.GITHUB_CACHE_TTL_SECONDS if cache_ttl is None else cache_ttl
+
+        self._client: Optional[httpx.AsyncClient] = None
+        self._etags: "OrderedDict[str, Tuple[str, object, Optional[str]]]" = OrderedDict()
+        self._summaries: "OrderedDict[str, Tuple[float, List[dict]]]" = OrderedDict()
+        self._rate_remaining: Optional[int] = None
+        self._rate_reset: float = 0.0
+        self.stats = {"requests": 0, "not_modified": 0, "summary_hits": 0, "rate_limit_waits": 0}
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            headers = {
+                "Accept": "application/vnd.github+json",
+                "User-Agent": "ai-hiring-platform"
+            }
+            if self.token:
+                headers["Authorization"] = f"Bearer {self.token}"
+
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers=headers,
+                timeout=settings.GITHUB_TIMEOUT_SECONDS,
+                limits=httpx.Limits(
+                    max_connections=settings.GITHUB_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.GITHUB_MAX_CONNECTIONS
+                ),
+                transport=self.transport
+            )
+        return self._client
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    # ---------- Rate limiting ----------
+
+    def _record_rate_limit(self, response: httpx.Response):
+        remaining = response.headers.get("X-RateLimit-Remaining")
+        reset = response.headers.get("X-RateLimit-Reset")
+        if remaining is not None:
+            self._rate_remaining = int(remaining)
+        if reset is not None:
+            self._rate_reset = float(reset)
+
+    async def _wait_for_rate_limit(self):
+        if self._rate_remaining is None or self._rate_remaining > 0:
+            return
+
+        delay = self._rate_reset - time.time()
+        if delay <= 0:
+            self._rate_remaining = None
+            return
+        if delay > settings.GITHUB_RATE_LIMIT_MAX_WAIT_SECONDS:
+            raise GitHubRateLimitError(self._rate_reset)
+
+        self.stats["rate_limit_waits"] += 1
+        await asyncio.sleep(delay)
+        self._rate_remaining = None
+
+    # ---------- Requests ----------
+
+    def _remember(self, url: str, etag: str, data, next_url: Optional[str]):
+        self._etags[url] = (etag, data, next_url)
+        self._etags.move_to_end(url)
+        while len(self._etags) > ETAG_CACHE_SIZE:
+            self._etags.popitem(last=False)
+
+    async def get_json(self, url: str) -> Tuple[object, Optional[str]]:
+        """GET a URL, returning (json, next page URL)"""
+        with span("github.request") as attrs:
+            return await self._get_json(url, attrs)
+
+    async def _get_json(self, url: str, attrs: dict) -> Tuple[object, Optional[str]]:
+        for attempt in range(2):
+            attrs["retries"] = attempt
+            await self._wait_for_rate_limit()
+
+            cached = self._etags.get(url)
+            headers = {"If-None-Match": cached[0]} if cached else {}
+
+            self.stats["requests"] += 1
+            try:
+                response = await self.client.get(url, headers=headers)
+            except httpx.HTTPError as e:
+                raise GitHubError(f"GitHub request failed: {str(e)}")
+            self._record_rate_limit(response)
+            attrs["status"] = response.status_code
+
+            if response.status_code == 304 and cached:
+                self.stats["not_modified"] += 1
+                self._etags.move_to_end(url)
+                return cached[1], cached[2]
+
+            if response.status_code in (403, 429) and self._rate_remaining == 0:
+                # Exhausted mid-flight: wait for the window once, then retry
+                continue
+
+            if response.status_code == 404:
+                raise GitHubError(f"GitHub resource not found: {url}")
+            if response.status_code >= 400:
+                raise GitHubError(f"GitHub request failed with {response.status_code}: {url}")
+
+            data = response.json()
+            next_link = response.links.get("next", {}).get("url")
+            etag = response.headers.get("ETag")
+            if etag:
+                self._remember(url, etag, data, next_link)
+            return data, next_link
+
+        raise GitHubRateLimitError(self._rate_reset)
+
+    async def list_repos(self, username: str) -> List[dict]:
+        """All public repos of a user, newest first, capped at max_repos"""
+        per_page = min(100, self.max_repos)
+        url = f"/users/{username}/repos?per_page={per_page}&sort=updated"
+        repos: List[dict] = []
+
+        while url and len(repos) < self.max_repos:
+            page, url = await self.get_json(url)
+            repos.extend(page)
+
+        return repos[:self.max_repos]
+
+    async def repo_summaries(self, username: str) -> List[dict]:
+        """Compact per-repo summaries for the analyzer prompt, cached per user"""
+        key = username.lower()
+        cached = self._summaries.get(key)
+        if cached and cached[0] > time.monotonic():
+            self._summaries.move_to_end(key)
+            self.stats["summary_hits"] += 1
+            record("github.summary_cache", 0.0, hit=True)
+            return cached[1]
+
+        summaries = [
+            {
+                "name": r.get("name", ""),
+                "description": r.get("description", ""),
+                "language": r.get("language", ""),
+                "stars": r.get("stargazers_count", 0)
+            }
+            for r in await self.list_repos(username)
+        ]
+        self._summaries[key] = (time.monotonic() + self.cache_ttl, summaries)
+        self._summaries.move_to_end(key)
+        while len(self._summaries) > SUMMARY_CACHE_SIZE:
+            self._summaries.popitem(last=False)
+        return summaries
+
+
+_github_client: Optional[GitHubClient] = None
+
+
+def get_github_client() -> GitHubClient:
+    global _github_client
+    if _github_client is None:
+        _github_client = GitHubClient()
+    return _github_client
+
+
+def set_github_client(client: GitHubClient) -> GitHubClient:
+    global _github_client
+    _github_client = client
+    return client
+
+
+async def close_github_client():
+    if _github_client is not None:
+        await _github_client.aclose()
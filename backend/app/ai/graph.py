@@ -3,9 +3,15 @@ from typing import TypedDict, List
 from datetime import datetime
 
 from .resume_parser import parse_resume
+from .parse_cache import parse_cache
 from .github_analyzer import analyze_github
 from .skill_matcher import match_skills
-from ..db.mongo import db
+from .scoring import combine_scores, decide
+from . import leaderboard
+from .dispatch import idempotency_key
+from ..db.write_behind import write_behind
+from ..core import events
+from ..core.tracing import span, traced
 
 
 # ---------- STATE ----------
@@ -13,7 +19,9 @@ from ..db.mongo import db
 class HiringState(TypedDict):
     applicant_id: str
     job_id: str
+    idempotency_key: str
     resume_path: str
+    resume_hash: str
     github_username: str
     job_skills: List[str]
     job_role: str
@@ -26,93 +34,159 @@ class HiringState(TypedDict):
 
 
 # ---------- NODES ----------
+# Nodes return only the keys they produce: the resume and GitHub branches
+# run in the same step, and returning the whole state from both would be
+# a conflicting write.
 
+@traced("node.resume_parser")
 async def resume_node(state: HiringState):
+    # Already filled in by the batched queue worker
+    if state.get("resume_data"):
+        return {}
+
     try:
-        state["resume_data"] = await parse_resume(state["resume_path"])
+        resume_data = await parse_cache.get_or_parse(
+            state["resume_path"],
+            parse_resume,
+            content_hash=state.get("resume_hash")
+        )
     except Exception as e:
         print("Resume parsing failed:", e)
-        state["resume_data"] = {"skills": []}
-    return state
+        resume_data = {"skills": []}
+    return {"resume_data": resume_data}
 
 
+@traced("node.skill_matcher")
 async def skill_match_node(state: HiringState):
     try:
         resume_skills = state.get("resume_data", {}).get("skills", [])
-        state["skill_match_result"] = match_skills(
+        skill_match_result = match_skills(
             state["job_skills"],
             resume_skills
         )
     except Exception as e:
         print("Skill matching failed:", e)
-        state["skill_match_result"] = {"skill_match_score": 0}
-    return state
+        skill_match_result = {"skill_match_score": 0}
+    return {"skill_match_result": skill_match_result}
 
 
+@traced("node.github_analyzer")
 async def github_node(state: HiringState):
     try:
-        state["github_data"] = await analyze_github(
-            state["github_username"]    # ✅ FIXED
+        github_data = await analyze_github(
+            state["github_username"],
+            state["job_role"]
         )
     except Exception as e:
         print("GitHub analysis failed:", e)
-        state["github_data"] = {
+        github_data = {
             "github_score": 0,
             "hiring_insight": "GitHub analysis failed"
         }
-    return state
+    return {"github_data": github_data}
 
 
+@traced("node.decision_maker")
 async def decision_node(state: HiringState):
     try:
         skill_score = state.get("skill_match_result", {}).get("skill_match_score", 0)
         github_score = state.get("github_data", {}).get("github_score", 0)
 
-        final_score = int(skill_score * 0.6 + github_score * 0.4)
-
-        decision = (
-            "Strong Match" if final_score >= 75 else
-            "Moderate Match" if final_score >= 50 else
-            "Weak Match"
-        )
+        final_score = combine_scores(skill_score, github_score)
+        decision = decide(final_score)
 
         hiring_insight = state.get("github_data", {}).get(
             "hiring_insight",
             "No insight available"
         )
 
-        await db.evaluations.insert_one({
-            "applicant_id": state["applicant_id"],
-            "job_id": state["job_id"],
-            "final_score": final_score,
-            "decision": decision,
-            "ai_summary": hiring_insight,
-            "created_at": datetime.utcnow()
-        })
-
-        state["final_score"] = final_score
-        state["decision"] = decision
+        # One evaluation per idempotency key, even if the item is retried
+        key = state.get("idempotency_key") or idempotency_key(
+            state["applicant_id"],
+            state["job_id"]
+        )
+        with span("mongo.evaluation_write"):
+            await write_behind.update_one(
+                "evaluations",
+                {"idempotency_key": key},
+                {
+                    "$set": {
+                        "applicant_id": state["applicant_id"],
+                        "job_id": state["job_id"],
+                        "final_score": final_score,
+                        "decision": decision,
+                        "ai_summary": hiring_insight,
+                        # Inputs kept so the job can be rescored without the LLM
+                        "resume_data": state.get("resume_data", {}),
+                        "github_data": state.get("github_data", {}),
+                        "skill_match_result": state.get("skill_match_result", {}),
+                        "updated_at": datetime.utcnow()
+                    },
+                    "$setOnInsert": {"created_at": datetime.utcnow()}
+                },
+                upsert=True
+            )
+
+        with span("mongo.leaderboard_write"):
+            await leaderboard.record_evaluation(
+                state["applicant_id"],
+                state["job_id"],
+                final_score,
+                decision,
+                hiring_insight
+            )
+
+        events.publish(
+            "evaluation",
+            state["applicant_id"],
+            state["job_id"],
+            final_score=final_score,
+            decision=decision,
+            ai_summary=hiring_insight
+        )
+        return {"final_score": final_score, "decision": decision}
 
     except Exception as e:
         print("Decision node failed:", e)
 
-    return state
+    return {}
 
 
 # ---------- GRAPH ----------
+#
+#             ┌─> resume_parser -> skill_matcher ─┐
+#   start ────┤                                   ├─> decision_maker
+#             └─> github_analyzer ────────────────┘
+#
+# The GitHub branch does not depend on the resume, so wall time per
+# applicant is roughly max(resume branch, github branch).
+
+def fan_out(state: HiringState) -> List[str]:
+    return ["resume_parser", "github_analyzer"]
+
 
 def build_graph():
     graph = StateGraph(HiringState)
 
     graph.add_node("resume_parser", resume_node)
-    graph.add_node("skill_matcher", skill_match_node)   # ✅ renamed
+    graph.add_node("skill_matcher", skill_match_node)
     graph.add_node("github_analyzer", github_node)
     graph.add_node("decision_maker", decision_node)
 
-    graph.set_entry_point("resume_parser")
+    graph.set_conditional_entry_point(fan_out, ["resume_parser", "github_analyzer"])
     graph.add_edge("resume_parser", "skill_matcher")
-    graph.add_edge("skill_matcher", "github_analyzer")
-    graph.add_edge("github_analyzer", "decision_maker")
-    graph.add_edge("decision_maker", END)  
+    graph.add_edge(["skill_matcher", "github_analyzer"], "decision_maker")
+    graph.add_edge("decision_maker", END)
 
     return graph.compile()
+
+
+_compiled_graph = None
+
+
+def get_graph():
+    """Process-wide compiled graph; compiling per application is wasted work"""
+    global _compiled_graph
+    if _compiled_graph is None:
+        _compiled_graph = build_graph()
+    return _compiled_graph
@@ -0,0 +1,555 @@
+"""
+Bulk applicant ingest from resume archives.
+
+POST /apply/{job_id}/bulk spools the ZIP to disk (see core.uploads) and
+creates an ingest_batches document; run_batch then works through the
+entries in chunks of BULK_INSERT_BATCH_SIZE:
+
+- entries are copied out of the archive in a thread, one bounded chunk at
+  a time, so neither the archive nor a resume is ever held in memory
+- applicants are created with insert_many and their ai_queue rows with one
+  bulk upsert on the idempotency key, so a redone chunk can't queue twice;
+  the rows go straight to the worker pool (never inline)
+- both carry batch_id, which is what the progress endpoint aggregates on
+- each chunk is sized to the room left under the admission limits (see
+  ai.admission); while the queue is full the batch is "throttled" and waits
+- entries are staged, then deduplicated into the blob store (core.blobstore)
+  once they are known to belong to a new applicant
+
+Batches are leased like queue rows: the owning process renews the lease
+with every chunk and records the offset reached. run_reaper resumes batches
+whose lease lapsed (a crash, a restart, an error) from that offset, and
+fails them, deleting the archive, after BULK_MAX_ATTEMPTS.
+
+Roster rows (from the optional CSV) are matched to entries by their
+`file` column, or else by an entry named after the applicant's email.
+"""
+import asyncio
+import hashlib
+import logging
+import os
+import uuid
+import zipfile
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+from bson import ObjectId
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError
+
+from ..core import events
+from ..core.blobstore import get_blob_store
+from ..core.config import settings
+from ..core.uploads import HEAD_BYTES
+from ..db.counters import record_transition
+from ..db.mongo import db
+from . import admission, queue
+from .dispatch import idempotency_key
+from .resume_parser import EXTRACTORS, sniff_format, unsupported_reason
+
+ALLOWED_EXTENSIONS = {"pdf", "doc", "docx", "txt"}
+
+logger = logging.getLogger(__name__)
+
+# Kept on the batch document; the counts cover the rest
+MAX_RECORDED_ERRORS = 100
+
+DUPLICATE_KEY = 11000
+
+# Batches a process should be working on (or resuming)
+RUNNING = ("ingesting", "throttled")
+
+# Left out of the progress endpoint
+PRIVATE_FIELDS = {"archive_path": 0, "roster": 0, "owner": 0, "lease_expires_at": 0}
+
+# Lease holder for batches run by this process
+_owner = queue.new_worker_id()
+
+_tasks = set()
+
+
+# ---------- Archive handling (runs in a thread) ----------
+
+def list_entries(archive_path: str) -> List[str]:
+    """Resume entries in the archive; raises zipfile.BadZipFile for a bad archive"""
+    with zipfile.ZipFile(archive_path) as archive:
+        names = []
+        for info in archive.infolist():
+            base = os.path.basename(info.filename)
+            if info.is_dir() or not base or base.startswith(".") or info.filename.startswith("__MACOSX/"):
+                continue
+            names.append(info.filename)
+        return names
+
+
+def entry_extension(name: str) -> str:
+    return name.rsplit(".", 1)[-1].lower() if "." in os.path.basename(name) else ""
+
+
+def store_entries(archive_path: str, names: List[str], dest_dir: str, max_bytes: int) -> List[dict]:
+    """
+    Copy entries out of the archive in UPLOAD_CHUNK_SIZE chunks.
+
+    Sizes are enforced on the bytes actually inflated, not the header,
+    so a forged entry size can't get past max_bytes.
+    """
+    os.makedirs(dest_dir, exist_ok=True)
+    stored = []
+    with zipfile.ZipFile(archive_path) as archive:
+        for name in names:
+            ext = entry_extension(name)
+            if ext not in ALLOWED_EXTENSIONS:
+                stored.append({"entry": name, "error": "Unsupported file type"})
+                continue
+
+            final_path = os.path.join(dest_dir, f"{uuid.uuid4()}.{ext}")
+            temp_path = os.path.join(dest_dir, f".{uuid.uuid4().hex}.part")
+            digest = hashlib.sha256()
+            size = 0
+            head = b""
+            try:
+                with archive.open(name) as source, open(temp_path, "wb") as out:
+                    while True:
+                        chunk = source.read(settings.UPLOAD_CHUNK_SIZE)
+                        if not chunk:
+                            break
+                        size += len(chunk)
+                        if size > max_bytes:
+                            raise ValueError(f"Resume exceeds {max_bytes} bytes")
+                        if len(head) < HEAD_BYTES:
+                            head += chunk[:HEAD_BYTES - len(head)]
+                        digest.update(chunk)
+                        out.write(chunk)
+                os.replace(temp_path, final_path)
+            except (ValueError, zipfile.BadZipFile, zipfile.LargeZipFile, RuntimeError, OSError) as e:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+                stored.append({"entry": name, "error": str(e)})
+                continue
+
+            resume_format = sniff_format(head, final_path)
+            if resume_format not in EXTRACTORS:
+                os.remove(final_path)
+                stored.append({"entry": name, "error": unsupported_reason(resume_format)})
+                continue
+
+            stored.append({"entry": name, "path": final_path, "sha256": digest.hexdigest(), "size": size})
+    return stored
+
+
+# ---------- Roster matching ----------
+
+def match_roster(entry: str, roster: Dict[str, dict]) -> Optional[dict]:
+    base = os.path.basename(entry).lower()
+    stem = base.rsplit(".", 1)[0]
+    return roster.get(entry.lower()) or roster.get(base) or roster.get(stem)
+
+
+def index_roster(rows: List[dict]) -> Dict[str, dict]:
+    """Look-up keys: the row's file (full path and base name), else its email"""
+    index = {}
+    for row in rows:
+        if row.get("file"):
+            index[row["file"].lower()] = row
+            index[os.path.basename(row["file"]).lower()] = row
+        elif row.get("email"):
+            index[row["email"]] = row
+    return index
+
+
+# ---------- Batch documents ----------
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _lease_deadline() -> datetime:
+    return _now() + timedelta(seconds=settings.BULK_LEASE_SECONDS)
+
+
+async def create_batch(job_id: str, archive_path: str, entries: int, roster_rows: List[dict]) -> str:
+    result = await db.ingest_batches.insert_one({
+        "job_id": job_id,
+        "status": "ingesting",
+        "archive_path": archive_path,
+        "entries": entries,
+        "roster": roster_rows,
+        "roster_rows": len(roster_rows),
+        "offset": 0,
+        "processed": 0,
+        "queued": 0,
+        "duplicates": 0,
+        "skipped": 0,
+        "errors": [],
+        "attempts": 0,
+        "owner": _owner,
+        "lease_expires_at": _lease_deadline(),
+        "created_at": _now()
+    })
+    return str(result.inserted_id)
+
+
+async def _record(batch_id: str, offset: int, processed: int, queued: int, duplicates: int,
+                  errors: List[dict]) -> bool:
+    """Count a finished chunk and move the resume point past it; False if the lease was lost"""
+    result = await db.ingest_batches.update_one(
+        {"_id": ObjectId(batch_id), "owner": _owner},
+        {
+            "$inc": {
+                "processed": processed,
+                "queued": queued,
+                "duplicates": duplicates,
+                "skipped": len(errors)
+            },
+            "$push": {"errors": {"$each": errors, "$slice": MAX_RECORDED_ERRORS}},
+            "$set": {
+                "status": "ingesting",
+                "offset": offset,
+                "lease_expires_at": _lease_deadline(),
+                "updated_at": _now()
+            }
+        }
+    )
+    return result.matched_count > 0
+
+
+async def _renew(batch_id: str, status: str) -> bool:
+    result = await db.ingest_batches.update_one(
+        {"_id": ObjectId(batch_id), "owner": _owner},
+        {"$set": {"status": status, "lease_expires_at": _lease_deadline(), "updated_at": _now()}}
+    )
+    return result.matched_count > 0
+
+
+async def _release(batch_id: str):
+    """Hand the batch back; the next reaper sweep (here or elsewhere) resumes it"""
+    await db.ingest_batches.update_one(
+        {"_id": ObjectId(batch_id), "owner": _owner},
+        {"$set": {"lease_expires_at": _now()}, "$unset": {"owner": ""}}
+    )
+
+
+async def _finish(batch_id: str, archive_path: str, fields: dict):
+    await db.ingest_batches.update_one(
+        {"_id": ObjectId(batch_id), "owner": _owner},
+        {
+            "$set": {**fields, "finished_at": _now()},
+            "$unset": {"owner": "", "lease_expires_at": "", "roster": ""}
+        }
+    )
+    try:
+        os.remove(archive_path)
+    except FileNotFoundError:
+        pass
+
+
+# ---------- Ingest ----------
+
+async def _existing(batch_id: str, job_id: str, emails: List[str], hashes: List[str]):
+    """
+    Emails and hashes already applied with, plus the ids of those applicants
+    this batch created itself (by email, or by hash for unnamed entries):
+    an earlier attempt at the chunk may have stopped before queueing them.
+    """
+    emails_seen, hashes_seen, ours = set(), set(), {}
+    query = {"job_id": job_id, "$or": [
+        {"email": {"$in": emails}},
+        {"resume_sha256": {"$in": hashes}}
+    ]}
+    async for doc in db.applicants.find(query, {"email": 1, "resume_sha256": 1, "batch_id": 1}):
+        emails_seen.add(doc.get("email"))
+        hashes_seen.add(doc.get("resume_sha256"))
+        if doc.get("batch_id") == batch_id:
+            ours[doc.get("email") or doc.get("resume_sha256")] = doc["_id"]
+    return emails_seen, hashes_seen, ours
+
+
+async def _insert_chunk(batch_id: str, job: dict, stored: List[dict], roster: Dict[str, dict]) -> tuple:
+    """Create applicants and queue rows for one chunk; returns (queued, duplicates)"""
+    job_id = str(job["_id"])
+    candidates = []
+    for item in stored:
+        row = match_roster(item["entry"], roster) or {}
+        candidates.append((item, row))
+
+    emails = [row["email"] for _, row in candidates if row.get("email")]
+    emails_seen, hashes_seen, ours = await _existing(
+        batch_id, job_id, emails, [item["sha256"] for item in stored]
+    )
+
+    accepted = []
+    recovered = []
+    for item, row in candidates:
+        email = row.get("email")
+        # Same email, or for unnamed entries the same file, is a repeat submission
+        duplicate = email in emails_seen if email else item["sha256"] in hashes_seen
+        if duplicate:
+            os.remove(item["path"])
+            applicant_id = ours.pop(email or item["sha256"], None)
+            if applicant_id is not None:
+                # Created by an earlier attempt at this chunk; make sure it is queued
+                recovered.append(applicant_id)
+            continue
+        if email:
+            emails_seen.add(email)
+        hashes_seen.add(item["sha256"])
+        accepted.append((item, row))
+
+    if not accepted:
+        queued = await _enqueue(batch_id, job, recovered)
+        return queued, len(stored) - len(recovered)
+
+    blob_store = get_blob_store()
+    paths = await asyncio.gather(*[
+        blob_store.put(item["path"], item["sha256"], item["size"]) for item, _ in accepted
+    ])
+
+    now = datetime.now(timezone.utc)
+    applicants = []
+    for (item, row), path in zip(accepted, paths):
+        email = row.get("email")
+        applicants.append({
+            "job_id": job_id,
+            "name": row.get("name") or os.path.basename(item["entry"]).rsplit(".", 1)[0],
+            "email": email,
+            "github_url": row.get("github_url", ""),
+            "github_username": row.get("github_username", ""),
+            "resume_path": path,
+            "resume_sha256": item["sha256"],
+            "resume_size": item["size"],
+            "batch_id": batch_id,
+            "created_at": now,
+            "status": "submitted"
+        })
+
+    try:
+        applicant_ids = (await db.applicants.insert_many(applicants, ordered=False)).inserted_ids
+    except BulkWriteError as e:
+        # The unique (job_id, email) index turns away an email another
+        # batch or POST /apply took meanwhile; those are duplicates too
+        write_errors = e.details.get("writeErrors", [])
+        rejected = {error["index"] for error in write_errors}
+        for index in rejected:
+            await blob_store.release(applicants[index]["resume_sha256"])
+        if any(error.get("code") != DUPLICATE_KEY for error in write_errors):
+            raise
+        applicant_ids = [a["_id"] for i, a in enumerate(applicants) if i not in rejected]
+    except Exception:
+        for applicant in applicants:
+            await blob_store.release(applicant["resume_sha256"])
+        raise
+    queued = await _enqueue(batch_id, job, recovered + applicant_ids)
+    return queued, len(stored) - len(applicant_ids) - len(recovered)
+
+
+async def _enqueue(batch_id: str, job: dict, applicant_ids: list) -> int:
+    """
+    Upsert the queue rows on their idempotency keys (as dispatch.enqueue
+    does), so rows that already exist are left alone; returns the number
+    created.
+    """
+    if not applicant_ids:
+        return 0
+    job_id = str(job["_id"])
+    priority = admission.queue_priority(admission.lane_for(job))
+    now = datetime.now(timezone.utc)
+    rows = [
+        {
+            "idempotency_key": idempotency_key(str(applicant_id), job_id),
+            "applicant_id": str(applicant_id),
+            "job_id": job_id,
+            "status": "pending",
+            "attempts": 0,
+            "priority": priority,
+            "batch_id": batch_id,
+            "created_at": now
+        }
+        for applicant_id in applicant_ids
+    ]
+    requests = [
+        UpdateOne({"idempotency_key": row["idempotency_key"]}, {"$setOnInsert": row}, upsert=True)
+        for row in rows
+    ]
+    try:
+        upserted = (await db.ai_queue.bulk_write(requests, ordered=False)).upserted_ids
+    except BulkWriteError as e:
+        # A racing upsert of the same key loses with a duplicate key error;
+        # that row exists and was announced by whoever created it
+        if any(error.get("code") != DUPLICATE_KEY for error in e.details.get("writeErrors", [])):
+            raise
+        upserted = {entry["index"]: entry["_id"] for entry in e.details.get("upserted", [])}
+
+    created = [rows[index] for index in sorted(upserted)]
+    await record_transition(to_status="pending", count=len(created), wait=True)
+    for row in created:
+        events.publish_status(row, "pending")
+    queue.notify()
+    return len(created)
+
+
+async def run_batch(batch_id: str, job: dict, archive_path: str, names: List[str],
+                    roster_rows: List[dict], offset: int = 0):
+    """
+    Ingest names[offset:], recording the offset after every chunk. A chunk
+    cut short by a crash or an error is redone: _insert_chunk skips
+    applicants that already exist, and queues any this batch created
+    without getting as far as their queue rows.
+    """
+    roster = index_roster(roster_rows)
+    dest_dir = get_blob_store().staging_dir
+    step = settings.BULK_INSERT_BATCH_SIZE
+    throttled = False
+    try:
+        while offset < len(names):
+            # Never queue past the admission limits; wait for workers instead
+            room = await admission.capacity(job)
+            if room <= 0:
+                throttled = True
+                if not await _renew(batch_id, "throttled"):
+                    logger.warning("Bulk ingest %s was taken over by another process", batch_id)
+                    return
+                await asyncio.sleep(settings.ADMISSION_RETRY_AFTER_SECONDS)
+                continue
+            if throttled:
+                throttled = False
+                await _renew(batch_id, "ingesting")
+
+            chunk = names[offset:offset + min(step, room)]
+            results = await asyncio.to_thread(
+                store_entries, archive_path, chunk, dest_dir, settings.MAX_RESUME_BYTES
+            )
+            errors = [r for r in results if "error" in r]
+            stored = [r for r in results if "error" not in r]
+            queued, duplicates = await _insert_chunk(batch_id, job, stored, roster) if stored else (0, 0)
+            offset += len(chunk)
+            if not await _record(batch_id, offset, len(chunk), queued, duplicates, errors):
+                logger.warning("Bulk ingest %s was taken over by another process", batch_id)
+                return
+
+        await _finish(batch_id, archive_path, {"status": "ingested"})
+    except asyncio.CancelledError:
+        # Shutting down: leave the archive for whoever resumes the batch
+        await _release(batch_id)
+        raise
+    except Exception as e:
+        logger.exception("Bulk ingest %s failed at entry %d of %d", batch_id, offset, len(names))
+        batch = await db.ingest_batches.find_one_and_update(
+            {"_id": ObjectId(batch_id), "owner": _owner},
+            {"$inc": {"attempts": 1}, "$set": {"last_error": str(e)}},
+            return_document=ReturnDocument.AFTER
+        )
+        if batch is not None and batch["attempts"] >= settings.BULK_MAX_ATTEMPTS:
+            await _finish(batch_id, archive_path, {"status": "failed", "error": str(e)})
+        else:
+            await _release(batch_id)
+
+
+def start_batch(*args):
+    task = asyncio.create_task(run_batch(*args))
+    _tasks.add(task)
+    task.add_done_callback(_tasks.discard)
+    return task
+
+
+async def drain(timeout: float = None):
+    """
+    Wait for ingests running in this process, e.g. on shutdown. Those still
+    running after the timeout are cancelled, releasing their batches.
+    """
+    if not _tasks:
+        return
+    _, pending = await asyncio.wait(list(_tasks), timeout=timeout)
+    for task in pending:
+        task.cancel()
+    if pending:
+        await asyncio.gather(*pending, return_exceptions=True)
+
+
+# ---------- Recovery ----------
+
+def _stalled_query() -> dict:
+    now = _now()
+    stale = now - timedelta(seconds=settings.BULK_LEASE_SECONDS)
+    return {
+        "status": {"$in": list(RUNNING)},
+        "$or": [
+            {"lease_expires_at": {"$lt": now}},
+            # Batches started before leases existed: only once they've gone quiet
+            {"lease_expires_at": {"$exists": False}, "updated_at": {"$lt": stale}},
+            {"lease_expires_at": {"$exists": False}, "updated_at": {"$exists": False}, "created_at": {"$lt": stale}}
+        ]
+    }
+
+
+async def resume_stalled() -> int:
+    """
+    Take over batches whose process died, gave up on them after an error
+    or shut down mid-batch, and resume each from its recorded offset.
+    """
+    resumed = 0
+    while True:
+        batch = await db.ingest_batches.find_one_and_update(
+            _stalled_query(),
+            {"$set": {"owner": _owner, "lease_expires_at": _lease_deadline()}},
+            return_document=ReturnDocument.BEFORE
+        )
+        if batch is None:
+            return resumed
+
+        batch_id = str(batch["_id"])
+        archive_path = batch["archive_path"]
+        attempts = batch.get("attempts", 0)
+        if batch.get("owner"):
+            # The previous owner died holding the lease: that counts as a failed attempt
+            attempts += 1
+            await db.ingest_batches.update_one({"_id": batch["_id"]}, {"$set": {"attempts": attempts}})
+        if attempts >= settings.BULK_MAX_ATTEMPTS:
+            await _finish(batch_id, archive_path, {
+                "status": "failed",
+                "error": batch.get("last_error") or "Ingest was interrupted too many times"
+            })
+            continue
+
+        job = await db.jobs.find_one({"_id": ObjectId(batch["job_id"])})
+        try:
+            names = await asyncio.to_thread(list_entries, archive_path)
+        except (OSError, zipfile.BadZipFile):
+            names = None
+        if job is None or names is None:
+            await _finish(batch_id, archive_path, {"status": "failed", "error": "Job or archive no longer available"})
+            continue
+
+        offset = batch.get("offset", 0)
+        logger.info("Resuming bulk ingest %s at entry %d of %d", batch_id, offset, len(names))
+        start_batch(batch_id, job, archive_path, names, batch.get("roster", []), offset)
+        resumed += 1
+
+
+async def run_reaper():
+    """Resume stalled batches at startup and every BULK_REAPER_INTERVAL_SECONDS"""
+    while True:
+        try:
+            await resume_stalled()
+        except Exception:
+            logger.exception("Bulk ingest reaper failed")
+        await asyncio.sleep(settings.BULK_REAPER_INTERVAL_SECONDS)
+
+
+async def batch_progress(batch_id: str) -> Optional[dict]:
+    batch = await db.ingest_batches.find_one({"_id": ObjectId(batch_id)}, PRIVATE_FIELDS)
+    if batch is None:
+        return None
+
+    evaluations = {status: 0 for status in ("pending", "processing", "completed", "failed")}
+    async for row in db.ai_queue.aggregate([
+        {"$match": {"batch_id": batch_id}},
+        {"$group": {"_id": "$status", "n": {"$sum": 1}}}
+    ]):
+        evaluations[row["_id"]] = row["n"]
+
+    finished = evaluations["completed"] + evaluations["failed"]
+    batch["batch_id"] = str(batch.pop("_id"))
+    batch["evaluations"] = evaluations
+    batch["ingest_progress"] = round(batch["processed"] / batch["entries"], 3) if batch["entries"] else 1.0
+    batch["evaluation_progress"] = round(finished / batch["queued"], 3) if batch["queued"] else 0.0
+    return batch
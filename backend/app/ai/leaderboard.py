@@ -0,0 +1,147 @@
+"""
+Materialized per-job candidate leaderboard.
+
+One document per applicant (``_id`` = applicant id) in the
+``leaderboard`` collection, upserted whenever an evaluation is written
+or rescored. The (job_id, final_score desc, _id) index serves top-k and
+keyset-paginated pages without joins or in-memory sorts.
+
+Only applicants with a scored evaluation have a row, so unlike the
+listing it replaced, the candidates endpoint leaves out applicants who
+are not evaluated yet or whose evaluation failed.
+"""
+import base64
+import json
+from datetime import datetime, timezone
+from typing import List, Optional, Tuple
+
+from bson import ObjectId
+from pymongo import UpdateOne
+
+from ..db.mongo import db
+from ..db.write_behind import write_behind
+
+CANDIDATE_FIELDS = {"name": 1, "email": 1, "github_url": 1}
+
+
+# ---------- Cursors ----------
+
+def encode_cursor(final_score: int, applicant_id: str) -> str:
+    raw = json.dumps([final_score, applicant_id]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> Tuple[int, str]:
+    final_score, applicant_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    return int(final_score), str(applicant_id)
+
+
+# ---------- Writes ----------
+
+async def record_evaluation(
+    applicant_id: str,
+    job_id: str,
+    final_score: int,
+    decision: str,
+    ai_summary: str
+):
+    applicant = await db.applicants.find_one({"_id": ObjectId(applicant_id)}, CANDIDATE_FIELDS) or {}
+    await write_behind.update_one(
+        "leaderboard",
+        {"_id": applicant_id},
+        {"$set": {
+            "job_id": job_id,
+            "name": applicant.get("name"),
+            "email": applicant.get("email"),
+            "github_url": applicant.get("github_url"),
+            "final_score": final_score,
+            "decision": decision,
+            "ai_summary": ai_summary,
+            "updated_at": datetime.now(timezone.utc)
+        }},
+        upsert=True
+    )
+
+
+def score_update(applicant_id: str, final_score: int, decision: str) -> UpdateOne:
+    """Bulk-write operation used when a job is rescored"""
+    return UpdateOne(
+        {"_id": applicant_id},
+        {"$set": {
+            "final_score": final_score,
+            "decision": decision,
+            "updated_at": datetime.now(timezone.utc)
+        }}
+    )
+
+
+async def rebuild(job_id: str) -> int:
+    """
+    Backfill a job's leaderboard from its applicants and evaluations.
+    Only scored evaluations are listed: applicants never evaluated, or
+    whose evaluation has no final score, are left out.
+    """
+    pipeline = [
+        {"$match": {"job_id": job_id}},
+        {"$addFields": {"applicant_id_str": {"$toString": "$_id"}}},
+        {"$lookup": {
+            "from": "evaluations",
+            "localField": "applicant_id_str",
+            "foreignField": "applicant_id",
+            "as": "evaluation"
+        }},
+        {"$unwind": "$evaluation"},
+        # Failed or partial runs have no score to rank by (nor to page on)
+        {"$match": {"evaluation.final_score": {"$type": "number"}}}
+    ]
+
+    operations = []
+    async for doc in db.applicants.aggregate(pipeline):
+        evaluation = doc["evaluation"]
+        operations.append(UpdateOne(
+            {"_id": doc["applicant_id_str"]},
+            {"$set": {
+                "job_id": job_id,
+                "name": doc.get("name"),
+                "email": doc.get("email"),
+                "github_url": doc.get("github_url"),
+                "final_score": evaluation.get("final_score"),
+                "decision": evaluation.get("decision"),
+                "ai_summary": evaluation.get("ai_summary"),
+                "updated_at": datetime.now(timezone.utc)
+            }},
+            upsert=True
+        ))
+
+    # Unscored rows an earlier rebuild wrote would still break paging
+    await db.leaderboard.delete_many({"job_id": job_id, "final_score": {"$not": {"$type": "number"}}})
+    if operations:
+        await db.leaderboard.bulk_write(operations, ordered=False)
+    return len(operations)
+
+
+# ---------- Reads ----------
+
+async def page(job_id: str, limit: int, cursor: Optional[str] = None) -> Tuple[List[dict], Optional[str]]:
+    """Return one page of candidates, best first, and the cursor for the next page"""
+    query = {"job_id": job_id}
+    if cursor:
+        final_score, applicant_id = decode_cursor(cursor)
+        query["$or"] = [
+            {"final_score": {"$lt": final_score}},
+            {"final_score": final_score, "_id": {"$gt": applicant_id}}
+        ]
+
+    docs = [
+        doc async for doc in db.leaderboard.find(query)
+        .sort([("final_score", -1), ("_id", 1)])
+        .limit(limit + 1)
+    ]
+
+    next_cursor = None
+    if len(docs) > limit:
+        docs = docs[:limit]
+        last = docs[-1]
+        next_cursor = encode_cursor(last["final_score"], last["_id"])
+
+    return docs, next_cursor
@@ -0,0 +1,231 @@
+"""
+Shared async LLM gateway.
+
+Every analyzer goes through one gateway. It awaits the backend with
+``ainvoke``, caps concurrent calls with a global semaphore, and memoizes
+responses by a hash of the normalized prompt for LLM_CACHE_TTL_SECONDS.
+Identical prompts that are in flight at the same time share one call.
+The backend is pluggable. LLM_BACKEND=fake runs the whole pipeline
+offline, e.g. for benchmarks.
+"""
+import asyncio
+import hashlib
+import json
+import re
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+from ..core.config import settings
+from ..core.tracing import span
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token), good enough for budgets and traces"""
+    return (len(text) + 3) // 4
+
+
+def normalize_prompt(prompt: str) -> str:
+    return re.sub(r"\s+", " ", prompt).strip()
+
+
+# ---------- Backends ----------
+
+class GeminiBackend:
+    name = "gemini"
+
+    def __init__(self, model: Optional[str] = None):
+        self.model = model or settings.GEMINI_MODEL
+        self._client = None
+
+    @property
+    def client(self):
+        # Built on first use so importing the app never constructs a client
+        if self._client is None:
+            from langchain_google_genai import ChatGoogleGenerativeAI
+
+            self._client = ChatGoogleGenerativeAI(
+                model=self.model,
+                google_api_key=settings.GEMINI_API_KEY,
+                temperature=0
+            )
+        return self._client
+
+    async def ainvoke(self, prompt: str) -> str:
+        response = await self.client.ainvoke(prompt)
+        return response.content
+
+
+def default_fake_response(prompt: str) -> str:
+    """Canned, well-formed answers for the two prompts the pipeline sends"""
+    if "GitHub profile" in prompt:
+        return json.dumps({
+            "github_score": 70,
+            "tech_strengths": ["Python"],
+            "weaknesses": [],
+            "hiring_insight": "Fake backend insight"
+        })
+    resume = {
+        "skills": ["Python", "FastAPI", "MongoDB"],
+        "years_of_experience": 3,
+        "primary_role": "Backend Engineer",
+        "tech_stack": ["Python"]
+    }
+    doc_ids = re.findall(r'<document id="([^"]+)">', prompt)
+    if doc_ids:
+        return json.dumps({doc_id: resume for doc_id in doc_ids})
+    return json.dumps(resume)
+
+
+class FakeBackend:
+    """Offline backend with configurable latency and a pluggable responder"""
+    name = "fake"
+
+    def __init__(
+        self,
+        latency: Optional[float] = None,
+        responder: Optional[Callable[[str], str]] = None
+    ):
+        if latency is None:
+            latency = settings.LLM_FAKE_LATENCY_MS / 1000
+        self.latency = latency
+        self.responder = responder or default_fake_response
+        self.calls = 0
+
+    async def ainvoke(self, prompt: str) -> str:
+        self.calls += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self.responder(prompt)
+
+
+BACKENDS = {
+    "gemini": GeminiBackend,
+    "fake": FakeBackend,
+}
+
+
+# ---------- Gateway ----------
+
+class LLMGateway:
+    def __init__(
+        self,
+        backend,
+        max_concurrency: int,
+        cache_ttl: float,
+        cache_size: int
+    ):
+        self.backend = backend
+        self.cache_ttl = cache_ttl
+        self.cache_size = cache_size
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._cache: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.stats = {"calls": 0, "cache_hits": 0, "coalesced": 0}
+
+    def cache_key(self, prompt: str) -> str:
+        model = getattr(self.backend, "model", "")
+        raw = f"{self.backend.name}:{model}:{normalize_prompt(prompt)}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _cache_get(self, key: str) -> Optional[str]:
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        expires_at, content = entry
+        if expires_at < time.monotonic():
+            del self._cache[key]
+            return None
+        self._cache.move_to_end(key)
+        return content
+
+    def _cache_put(self, key: str, content: str):
+        self._cache[key] = (time.monotonic() + self.cache_ttl, content)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    async def _call(self, prompt: str) -> str:
+        async with self._semaphore:
+            self.stats["calls"] += 1
+            return await self.backend.ainvoke(prompt)
+
+    async def complete(self, prompt: str, use_cache: bool = True) -> str:
+        """Return the model's text response for prompt"""
+        with span("llm", prompt_chars=len(prompt), prompt_tokens=estimate_tokens(prompt)) as attrs:
+            content = await self._complete(prompt, use_cache, attrs)
+            attrs["response_chars"] = len(content)
+            attrs["response_tokens"] = estimate_tokens(content)
+            return content
+
+    async def _complete(self, prompt: str, use_cache: bool, attrs: dict) -> str:
+        if not use_cache:
+            return await self._call(prompt)
+
+        key = self.cache_key(prompt)
+        cached = self._cache_get(key)
+        if cached is not None:
+            self.stats["cache_hits"] += 1
+            attrs["cache"] = "hit"
+            return cached
+
+        pending = self._inflight.get(key)
+        if pending is not None:
+            self.stats["coalesced"] += 1
+            attrs["cache"] = "coalesced"
+            return await asyncio.shield(pending)
+
+        attrs["cache"] = "miss"
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            content = await self._call(prompt)
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark retrieved so an unawaited failure is not logged
+            future.exception()
+            raise
+        else:
+            future.set_result(content)
+            self._cache_put(key, content)
+            return content
+        finally:
+            self._inflight.pop(key, None)
+
+    async def complete_many(self, prompts: List[str]) -> List[str]:
+        return list(await asyncio.gather(*(self.complete(p) for p in prompts)))
+
+    def remember(self, prompt: str, content: str):
+        """Replace the memoized answer for prompt, e.g. with a repaired one"""
+        self._cache_put(self.cache_key(prompt), content)
+
+    def forget(self, prompt: str):
+        self._cache.pop(self.cache_key(prompt), None)
+
+    def clear_cache(self):
+        self._cache.clear()
+
+
+_gateway: Optional[LLMGateway] = None
+
+
+def get_llm() -> LLMGateway:
+    """Return the process-wide gateway, building the configured backend on first use"""
+    global _gateway
+    if _gateway is None:
+        _gateway = LLMGateway(
+            backend=BACKENDS[settings.LLM_BACKEND](),
+            max_concurrency=settings.LLM_MAX_CONCURRENCY,
+            cache_ttl=settings.LLM_CACHE_TTL_SECONDS,
+            cache_size=settings.LLM_CACHE_SIZE
+        )
+    return _gateway
+
+
+def set_backend(backend):
+    """Swap the backend (e.g. a FakeBackend) and start from an empty cache"""
+    gateway = get_llm()
+    gateway.backend = backend
+    gateway.clear_cache()
+    return gateway
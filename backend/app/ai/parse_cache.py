@@ -0,0 +1,144 @@
+"""
+Content-addressed cache for parsed resumes.
+
+Entries are keyed by the SHA-256 of the resume bytes plus the parse
+version (prompt version + model), so re-uploads of the same file skip
+both text extraction and the LLM call. Lookups go through a small
+in-process LRU first and then the persistent ``parse_cache`` collection.
+"""
+import asyncio
+import hashlib
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Optional
+
+from ..core.blobstore import open_blob
+from ..core.config import settings
+from ..core.tracing import span
+from ..db.mongo import db
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def parse_version() -> str:
+    return f"{settings.RESUME_PROMPT_VERSION}:{settings.GEMINI_MODEL}"
+
+
+def hash_file(file_path: str) -> str:
+    """SHA-256 of the content, so a gzip blob hashes like the original upload"""
+    digest = hashlib.sha256()
+    with open_blob(file_path) as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ParseCache:
+    def __init__(self, max_entries: int, ttl: timedelta):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lru: "OrderedDict[str, dict]" = OrderedDict()
+
+    @staticmethod
+    def make_key(content_hash: str, version: str) -> str:
+        return f"{content_hash}:{version}"
+
+    # ---------- LRU tier ----------
+
+    def _lru_get(self, key: str) -> Optional[dict]:
+        value = self._lru.get(key)
+        if value is not None:
+            self._lru.move_to_end(key)
+        return value
+
+    def _lru_put(self, key: str, value: dict):
+        self._lru[key] = value
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.max_entries:
+            self._lru.popitem(last=False)
+
+    # ---------- Public API ----------
+
+    async def get(self, content_hash: str, version: Optional[str] = None) -> Optional[dict]:
+        key = self.make_key(content_hash, version or parse_version())
+
+        value = self._lru_get(key)
+        if value is not None:
+            return value
+
+        doc = await db.parse_cache.find_one({"_id": key}, {"resume_data": 1})
+        if doc is None:
+            return None
+
+        self._lru_put(key, doc["resume_data"])
+        return doc["resume_data"]
+
+    async def put(self, content_hash: str, resume_data: dict, version: Optional[str] = None):
+        version = version or parse_version()
+        key = self.make_key(content_hash, version)
+        now = datetime.now(timezone.utc)
+
+        self._lru_put(key, resume_data)
+        await db.parse_cache.update_one(
+            {"_id": key},
+            {"$set": {
+                "content_hash": content_hash,
+                "version": version,
+                "resume_data": resume_data,
+                "created_at": now,
+                "expires_at": now + self.ttl
+            }},
+            upsert=True
+        )
+
+    async def get_or_parse(
+        self,
+        file_path: str,
+        parse: Callable[[str], Awaitable[dict]],
+        content_hash: Optional[str] = None
+    ) -> dict:
+        """Return the cached parse of file_path, or parse it and cache the result"""
+        if not content_hash:
+            content_hash = await asyncio.to_thread(hash_file, file_path)
+
+        with span("cache.parse_lookup") as attrs:
+            cached = await self.get(content_hash)
+            attrs["hit"] = cached is not None
+        if cached is not None:
+            return cached
+
+        resume_data = await parse(file_path)
+
+        # An empty skill list is what a failed decode looks like; let it retry
+        if resume_data.get("skills"):
+            await self.put(content_hash, resume_data)
+        return resume_data
+
+    async def invalidate(self, version: Optional[str] = None) -> int:
+        """
+        Drop cached parses for one version, or every version other than
+        the current one when no version is given. Returns the number of
+        persistent entries removed.
+        """
+        if version is None:
+            current = parse_version()
+            query = {"version": {"$ne": current}}
+            stale = [k for k in self._lru if not k.endswith(f":{current}")]
+        else:
+            query = {"version": version}
+            stale = [k for k in self._lru if k.endswith(f":{version}")]
+
+        for key in stale:
+            del self._lru[key]
+
+        result = await db.parse_cache.delete_many(query)
+        return result.deleted_count
+
+    def clear_local(self):
+        self._lru.clear()
+
+
+parse_cache = ParseCache(
+    max_entries=settings.PARSE_CACHE_SIZE,
+    ttl=timedelta(days=settings.PARSE_CACHE_TTL_DAYS)
+)
@@ -0,0 +1,209 @@
+"""
+Resume text preprocessing before the LLM call.
+
+1. Normalize: drop control characters, collapse runs of spaces and blank lines.
+2. Strip page furniture: margin lines repeated on most pages (headers,
+   footers, "Page 2 of 3") and bare page-number lines.
+3. Detect sections (skills, experience, projects, ...) from heading lines.
+4. Pack sections by relevance into RESUME_TOKEN_BUDGET tokens, using the
+   local estimate_tokens heuristic, and keep them in document order.
+"""
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+
+from ..core.config import settings
+from ..core.metrics import registry
+from ..core.tracing import span
+from .extraction import PAGE_SEPARATOR
+from .llm import estimate_tokens
+
+SECTION_ALIASES = {
+    "skills": (
+        "skills", "technical skills", "core skills", "key skills", "skills & tools",
+        "technologies", "tech stack", "tools", "competencies", "core competencies"
+    ),
+    "experience": (
+        "experience", "work experience", "professional experience", "employment",
+        "employment history", "work history", "career history", "internships"
+    ),
+    "projects": ("projects", "personal projects", "key projects", "selected projects", "open source"),
+    "summary": ("summary", "profile", "professional summary", "objective", "about me", "about"),
+    "certifications": ("certifications", "certificates", "licenses", "courses"),
+    "education": ("education", "academic background", "qualifications"),
+    "achievements": ("achievements", "awards", "honors", "publications"),
+}
+
+# Lower number = packed first
+SECTION_PRIORITY = {
+    "header": 0,
+    "skills": 1,
+    "experience": 2,
+    "projects": 3,
+    "summary": 4,
+    "certifications": 5,
+    "achievements": 6,
+    "education": 7,
+    "other": 8,
+}
+
+HEADER_MAX_TOKENS = 120
+FURNITURE_MARGIN_LINES = 3
+
+_HEADINGS = {
+    alias: name
+    for name, aliases in SECTION_ALIASES.items()
+    for alias in aliases
+}
+_CONTROL = re.compile(r"[\x00-\x08\x0b\x0e-\x1f\x7f]")
+_SPACES = re.compile(r"[ \t\u00a0]+")
+_PAGE_NUMBER = re.compile(r"^(page\s*)?\d+(\s*(of|/)\s*\d+)?$", re.IGNORECASE)
+_DIGITS = re.compile(r"\d+")
+
+resume_tokens = registry.counter(
+    "resume_tokens_total",
+    "Estimated resume tokens before and after preprocessing"
+)
+
+
+@dataclass
+class Section:
+    name: str
+    lines: List[str] = field(default_factory=list)
+
+    @property
+    def text(self) -> str:
+        return "\n".join(self.lines)
+
+
+@dataclass
+class PreprocessedResume:
+    text: str
+    stats: Dict[str, object]
+
+
+def normalize_lines(page: str) -> List[str]:
+    page = _CONTROL.sub("", page)
+    return [_SPACES.sub(" ", line).strip() for line in page.splitlines()]
+
+
+def _margins(page: List[str]) -> set:
+    """Indexes of the first/last FURNITURE_MARGIN_LINES non-blank lines of a page"""
+    filled = [i for i, line in enumerate(page) if line]
+    return set(filled[:FURNITURE_MARGIN_LINES] + filled[-FURNITURE_MARGIN_LINES:])
+
+
+def strip_page_furniture(pages: List[List[str]]) -> List[str]:
+    """
+    Drop headers/footers (margin lines repeated on most pages) and bare
+    page numbers; return the remaining lines. Only page margins are
+    considered, so repeated lines in the body are kept.
+    """
+    def signature(line: str) -> str:
+        return _DIGITS.sub("#", line.lower())
+
+    margins = [_margins(page) for page in pages]
+    repeated = set()
+    if len(pages) >= 2:
+        counts = Counter(
+            sig
+            for page, margin in zip(pages, margins)
+            for sig in {signature(page[i]) for i in margin}
+        )
+        threshold = max(2, (len(pages) + 1) // 2)
+        repeated = {sig for sig, n in counts.items() if n >= threshold}
+
+    lines: List[str] = []
+    for page, margin in zip(pages, margins):
+        for i, line in enumerate(page):
+            if i in margin and (signature(line) in repeated or _PAGE_NUMBER.match(line)):
+                continue
+            # Collapse runs of blank lines
+            if not line and (not lines or not lines[-1]):
+                continue
+            lines.append(line)
+    return lines
+
+
+def heading_name(line: str) -> str:
+    """Canonical section name if the line looks like a section heading, else ''"""
+    if not line or len(line) > 40:
+        return ""
+    key = line.lower().strip(" :-•*#|").strip()
+    return _HEADINGS.get(key, "")
+
+
+def split_sections(lines: List[str]) -> List[Section]:
+    sections = [Section("header")]
+    for line in lines:
+        name = heading_name(line)
+        if name:
+            sections.append(Section(name, [line]))
+        else:
+            sections[-1].lines.append(line)
+    return [s for s in sections if any(s.lines)]
+
+
+def _truncate(section: Section, budget: int) -> Section:
+    kept, used = [], 0
+    for line in section.lines:
+        cost = estimate_tokens(line) + 1
+        if used + cost > budget:
+            break
+        kept.append(line)
+        used += cost
+    return Section(section.name, kept)
+
+
+def pack_sections(sections: List[Section], budget: int) -> Tuple[List[Section], List[str]]:
+    """
+    Choose sections by priority until the budget is spent (the last one
+    may be truncated). Returns the chosen sections in document order and
+    the names of sections that were dropped or cut.
+    """
+    order = sorted(range(len(sections)), key=lambda i: (SECTION_PRIORITY.get(sections[i].name, 8), i))
+    chosen: Dict[int, Section] = {}
+    trimmed: List[str] = []
+    remaining = budget
+
+    for i in order:
+        section = sections[i]
+        limit = min(remaining, HEADER_MAX_TOKENS) if section.name == "header" else remaining
+        cost = estimate_tokens(section.text) + 1
+        if cost <= limit:
+            chosen[i] = section
+            remaining -= cost
+            continue
+
+        trimmed.append(section.name)
+        partial = _truncate(section, limit)
+        if partial.lines:
+            chosen[i] = partial
+            remaining -= estimate_tokens(partial.text) + 1
+
+    return [chosen[i] for i in sorted(chosen)], trimmed
+
+
+def preprocess_resume(raw_text: str, token_budget: int = None) -> PreprocessedResume:
+    token_budget = token_budget or settings.RESUME_TOKEN_BUDGET
+
+    with span("resume.preprocess") as attrs:
+        pages = [normalize_lines(page) for page in raw_text.split(PAGE_SEPARATOR)]
+        lines = strip_page_furniture(pages)
+        sections = split_sections(lines)
+        packed, trimmed = pack_sections(sections, token_budget)
+        text = "\n\n".join(section.text.strip("\n") for section in packed)
+
+        stats = {
+            "raw_chars": len(raw_text),
+            "raw_tokens": estimate_tokens(raw_text),
+            "chars": len(text),
+            "tokens": estimate_tokens(text),
+            "sections": [s.name for s in packed],
+            "trimmed": trimmed,
+        }
+        attrs.update({k: v for k, v in stats.items() if k != "sections"})
+    resume_tokens.inc(stats["raw_tokens"], stage="raw")
+    resume_tokens.inc(stats["tokens"], stage="packed")
+    return PreprocessedResume(text=text, stats=stats)
@@ -1,65 +1,283 @@
+"""
+Lease-based evaluation worker pool.
+
+Each process runs one QueueWorker that keeps up to QUEUE_CONCURRENCY
+evaluations in flight. Items are claimed atomically (see ai.queue), so
+any number of processes and nodes can share the same ai_queue.
+
+    python -m app.ai.process_queue --processes 4 --concurrency 8
+"""
+import argparse
 import asyncio
+import multiprocessing
+import os
+import signal
+import time
+from typing import Dict, List, Optional, Set
+
 from bson import ObjectId
 from ..db.mongo import db
-from .graph import build_graph
+from ..db.write_behind import write_behind
+from ..core import events
+from ..core.blobstore import get_blob_store
+from ..core.config import settings
+from ..core.metrics import evaluation_duration, evaluations_total
+from ..core.tracing import start_trace
+from .graph import get_graph
+from .batching import prefill_resume_data
+from .extraction import shutdown_executor
+from .dispatch import idempotency_key
+from . import queue
 
-async def process_ai_queue():
-    """Process pending AI evaluations"""
-    graph = build_graph()
-    
-    while True:
-        try:
-            # Get pending job from queue
-            queue_item = await db.ai_queue.find_one({"status": "pending"})
-            
-            if not queue_item:
-                await asyncio.sleep(5)  # Wait 5 seconds before checking again
-                continue
-            
-            # Mark as processing
-            await db.ai_queue.update_one(
-                {"_id": queue_item["_id"]},
-                {"$set": {"status": "processing"}}
-            )
-            
-            # Get applicant and job data
-            applicant = await db.applicants.find_one({"_id": ObjectId(queue_item["applicant_id"])})
-            job = await db.jobs.find_one({"_id": ObjectId(queue_item["job_id"])})
-            
-            if not applicant or not job:
-                await db.ai_queue.update_one(
-                    {"_id": queue_item["_id"]},
-                    {"$set": {"status": "failed", "error": "Applicant or job not found"}}
-                )
-                continue
-            
-            # Prepare state for graph
-            state = {
-                "applicant_id": queue_item["applicant_id"],
-                "job_id": queue_item["job_id"],
-                "resume_path": applicant["resume_path"],
-                "github_username": applicant.get("github_username", ""),
-                "job_skills": job["required_skills"],
-                "job_role": job["title"]
-            }
-            
-            # Run AI pipeline
-            await graph.ainvoke(state)
-            
-            # Mark as completed
-            await db.ai_queue.update_one(
-                {"_id": queue_item["_id"]},
-                {"$set": {"status": "completed"}}
+
+async def build_state(queue_item: dict, owner: Optional[str] = None):
+    """Load applicant and job for a queue item; returns None if either is gone"""
+    applicant = await db.applicants.find_one({"_id": ObjectId(queue_item["applicant_id"])})
+    job = await db.jobs.find_one({"_id": ObjectId(queue_item["job_id"])})
+
+    if not applicant or not job:
+        await queue.fail(queue_item["_id"], "Applicant or job not found", owner)
+        events.publish_status(queue_item, "failed", error="Applicant or job not found")
+        return None
+
+    return {
+        "applicant_id": queue_item["applicant_id"],
+        "job_id": queue_item["job_id"],
+        "idempotency_key": queue_item.get("idempotency_key") or idempotency_key(
+            queue_item["applicant_id"],
+            queue_item["job_id"]
+        ),
+        "resume_path": applicant["resume_path"],
+        "resume_hash": applicant.get("resume_sha256", ""),
+        "github_username": applicant.get("github_username", ""),
+        "job_skills": job["required_skills"],
+        "job_role": job["title"]
+    }
+
+
+async def run_item(graph, queue_item: dict, state: dict, owner: Optional[str] = None):
+    started = time.perf_counter()
+    trace = start_trace()
+    try:
+        await graph.ainvoke(state)
+        if trace is not None:
+            await write_behind.update_one(
+                "evaluations",
+                {"idempotency_key": state["idempotency_key"]},
+                {"$set": {"trace": trace.compact()}}
             )
-            
+        await queue.complete(queue_item["_id"], owner)
+        events.publish_status(queue_item, "completed")
+        evaluations_total.inc(outcome="completed")
+    except Exception as e:
+        print(f"Error processing queue item: {e}")
+        await queue.fail(queue_item["_id"], str(e), owner)
+        events.publish_status(queue_item, "failed", error=str(e))
+        evaluations_total.inc(outcome="failed")
+    finally:
+        evaluation_duration.observe(time.perf_counter() - started)
+
+
+class QueueWorker:
+    def __init__(self, concurrency: int = None, batch_size: int = None):
+        self.owner = queue.new_worker_id()
+        self.concurrency = concurrency or settings.QUEUE_CONCURRENCY
+        self.batch_size = batch_size or settings.QUEUE_BATCH_SIZE
+        self.graph = get_graph()
+        self.leased: Set[ObjectId] = set()
+        self.tasks: Dict[asyncio.Task, List[ObjectId]] = {}
+        self._stopping = asyncio.Event()
+        self._background: List[asyncio.Task] = []
+        self.drain_timeout: Optional[float] = settings.SHUTDOWN_DRAIN_SECONDS
+
+    # ---------- Claiming ----------
+
+    async def claim_batch(self, limit: int) -> list:
+        """
+        Claim up to `limit` items, waiting at most QUEUE_BATCH_MAX_WAIT_MS
+        for a partial batch to fill up.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + settings.QUEUE_BATCH_MAX_WAIT_MS / 1000
+        items = await queue.claim_many(self.owner, limit)
+
+        while items and len(items) < limit and loop.time() < deadline:
+            await queue.wait_for_work(deadline - loop.time())
+            items.extend(await queue.claim_many(self.owner, limit - len(items)))
+        return items
+
+    # ---------- Processing ----------
+
+    async def process_one(self, item: dict):
+        state = await build_state(item, self.owner)
+        if state is not None:
+            await run_item(self.graph, item, state, self.owner)
+
+    async def process_batch(self, items: list):
+        """Extract all resumes of a batch together, then fan out per applicant"""
+        states = await asyncio.gather(*(build_state(item, self.owner) for item in items))
+        ready = [(item, state) for item, state in zip(items, states) if state]
+
+        try:
+            await prefill_resume_data([state for _, state in ready])
         except Exception as e:
-            print(f"Error processing queue item: {e}")
-            if 'queue_item' in locals():
-                await db.ai_queue.update_one(
-                    {"_id": queue_item["_id"]},
-                    {"$set": {"status": "failed", "error": str(e)}}
-                )
-            await asyncio.sleep(1)
+            # Fall back to per-applicant parsing in resume_node
+            print(f"Batched resume extraction failed: {e}")
+
+        await asyncio.gather(*(
+            run_item(self.graph, item, state, self.owner) for item, state in ready
+        ))
+
+    def _start(self, coro, items: list):
+        ids = [item["_id"] for item in items]
+        self.leased.update(ids)
+        task = asyncio.create_task(coro)
+        self.tasks[task] = ids
+        task.add_done_callback(self._finished)
+
+    def _finished(self, task: asyncio.Task):
+        for item_id in self.tasks.pop(task, []):
+            self.leased.discard(item_id)
+        if not task.cancelled() and task.exception():
+            print(f"Queue task crashed: {task.exception()}")
+
+    # ---------- Background loops ----------
+
+    async def _heartbeat_loop(self):
+        while True:
+            await asyncio.sleep(settings.QUEUE_HEARTBEAT_SECONDS)
+            try:
+                await queue.heartbeat(self.owner, list(self.leased))
+            except Exception as e:
+                print(f"Queue heartbeat failed: {e}")
+
+    async def _reaper_loop(self):
+        while True:
+            try:
+                await queue.requeue_expired()
+            except Exception as e:
+                print(f"Queue reaper failed: {e}")
+            await asyncio.sleep(settings.QUEUE_REAPER_INTERVAL_SECONDS)
+
+    async def _blob_gc_loop(self):
+        while True:
+            await asyncio.sleep(settings.BLOB_GC_INTERVAL_SECONDS)
+            try:
+                await get_blob_store().gc()
+            except Exception as e:
+                print(f"Blob garbage collection failed: {e}")
+
+    # ---------- Main loop ----------
+
+    async def run(self):
+        self._background = [
+            asyncio.create_task(self._heartbeat_loop()),
+            asyncio.create_task(self._reaper_loop()),
+        ]
+        if settings.QUEUE_USE_CHANGE_STREAMS:
+            self._background.append(asyncio.create_task(queue.watch_inserts()))
+        if settings.BLOB_GC_INTERVAL_SECONDS > 0:
+            self._background.append(asyncio.create_task(self._blob_gc_loop()))
+
+        try:
+            while not self._stopping.is_set():
+                try:
+                    free = self.concurrency - len(self.leased)
+                    if free <= 0:
+                        await asyncio.wait(list(self.tasks), return_when=asyncio.FIRST_COMPLETED)
+                        continue
+
+                    if self.batch_size > 1:
+                        items = await self.claim_batch(min(free, self.batch_size))
+                        if items:
+                            self._start(self.process_batch(items), items)
+                    else:
+                        items = await queue.claim_many(self.owner, free)
+                        for item in items:
+                            self._start(self.process_one(item), [item])
+
+                    if not items:
+                        await queue.wait_for_work(settings.QUEUE_POLL_INTERVAL_SECONDS)
+                except Exception as e:
+                    print(f"Error processing queue: {e}")
+                    await asyncio.sleep(1)
+
+            # Drain: keep heartbeating while in-flight evaluations finish.
+            # Anything still running after the timeout is abandoned and its
+            # lease lets another worker pick it up.
+            if self.tasks:
+                await asyncio.wait(list(self.tasks), timeout=self.drain_timeout)
+            await write_behind.close()
+        finally:
+            for task in self._background:
+                task.cancel()
+
+    def request_stop(self, timeout: float = None):
+        """Stop claiming new items; run() returns once in-flight work drains"""
+        if timeout is not None:
+            self.drain_timeout = timeout
+        self._stopping.set()
+        queue.notify()
+
+    async def stop(self, timeout: float = None):
+        """Stop claiming and wait for in-flight evaluations to finish"""
+        self.request_stop(timeout)
+        if self.tasks:
+            await asyncio.wait(list(self.tasks), timeout=self.drain_timeout)
+
+
+async def process_ai_queue():
+    """Process pending AI evaluations"""
+    await QueueWorker().run()
+
+
+async def _run_until_signalled(concurrency: int, batch_size: int):
+    worker = QueueWorker(concurrency, batch_size)
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, worker.request_stop)
+    try:
+        await worker.run()
+    finally:
+        shutdown_executor()
+
+
+def _worker_process(concurrency: int, batch_size: int):
+    asyncio.run(_run_until_signalled(concurrency, batch_size))
+
+
+def run_worker_processes(processes: int, concurrency: int, batch_size: int):
+    """Run one worker per process; leases make them safe to run side by side"""
+    if processes <= 1:
+        _worker_process(concurrency, batch_size)
+        return
+
+    ctx = multiprocessing.get_context("spawn")
+    children = [
+        ctx.Process(target=_worker_process, args=(concurrency, batch_size), daemon=False)
+        for _ in range(processes)
+    ]
+    for child in children:
+        child.start()
+
+    # Forward termination so every child drains its in-flight work
+    def forward(signum, frame):
+        for child in children:
+            if child.is_alive():
+                os.kill(child.pid, signal.SIGTERM)
+
+    signal.signal(signal.SIGTERM, forward)
+    signal.signal(signal.SIGINT, forward)
+
+    for child in children:
+        child.join()
+
 
 if __name__ == "__main__":
-    asyncio.run(process_ai_queue())
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Run AI evaluation workers")
+    parser.add_argument("--processes", type=int, default=1)
+    parser.add_argument("--concurrency", type=int, default=settings.QUEUE_CONCURRENCY)
+    parser.add_argument("--batch-size", type=int, default=settings.QUEUE_BATCH_SIZE)
+    args = parser.parse_args()
+
+    run_worker_processes(args.processes, args.concurrency, args.batch_size)
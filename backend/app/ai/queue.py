@@ -0,0 +1,239 @@
+"""
+ai_queue operations shared by the API and the worker pool.
+
+Items move pending -> processing -> completed / failed. A worker claims an
+item atomically with find_one_and_update and holds it under a lease
+(lease_owner, lease_expires_at) that it renews with heartbeats. If the
+worker dies, the lease expires and the reaper puts the item back to
+pending, or fails it after QUEUE_MAX_ATTEMPTS.
+"""
+import asyncio
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+
+from pymongo import ReturnDocument
+from pymongo.errors import PyMongoError
+
+from ..core import events
+from ..core.config import settings
+from ..db.mongo import db
+from ..db.counters import record_transition
+from ..db.write_behind import write_behind
+
+_wakeup: Optional[asyncio.Event] = None
+
+
+def new_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _lease_deadline() -> datetime:
+    return _now() + timedelta(seconds=settings.QUEUE_LEASE_SECONDS)
+
+
+# ---------- Claiming ----------
+
+async def claim(owner: str) -> Optional[dict]:
+    """Atomically take the oldest pending item of the highest priority, or return None"""
+    now = _now()
+    item = await db.ai_queue.find_one_and_update(
+        {"status": "pending"},
+        {
+            "$set": {
+                "status": "processing",
+                "lease_owner": owner,
+                "lease_expires_at": _lease_deadline(),
+                "updated_at": now
+            },
+            "$inc": {"attempts": 1}
+        },
+        sort=[("priority", -1), ("created_at", 1)],
+        return_document=ReturnDocument.AFTER
+    )
+    if item is not None:
+        await record_transition("pending", "processing")
+        events.publish_status(item, "processing")
+    return item
+
+
+async def claim_item(item_id, owner: str) -> Optional[dict]:
+    """Atomically take one specific pending item, or return None if someone else has it"""
+    item = await db.ai_queue.find_one_and_update(
+        {"_id": item_id, "status": "pending"},
+        {
+            "$set": {
+                "status": "processing",
+                "lease_owner": owner,
+                "lease_expires_at": _lease_deadline(),
+                "updated_at": _now()
+            },
+            "$inc": {"attempts": 1}
+        },
+        return_document=ReturnDocument.AFTER
+    )
+    if item is not None:
+        await record_transition("pending", "processing")
+        events.publish_status(item, "processing")
+    return item
+
+
+async def claim_many(owner: str, limit: int) -> List[dict]:
+    items = []
+    while len(items) < limit:
+        item = await claim(owner)
+        if item is None:
+            break
+        items.append(item)
+    return items
+
+
+async def heartbeat(owner: str, item_ids: List) -> int:
+    """Extend the lease on items this worker still owns"""
+    if not item_ids:
+        return 0
+    result = await db.ai_queue.update_many(
+        {"_id": {"$in": item_ids}, "status": "processing", "lease_owner": owner},
+        {"$set": {"lease_expires_at": _lease_deadline()}}
+    )
+    return result.modified_count
+
+
+# ---------- Transitions ----------
+
+def _owned(item_id, owner: Optional[str]) -> dict:
+    query = {"_id": item_id, "status": "processing"}
+    if owner is not None:
+        query["lease_owner"] = owner
+    return query
+
+
+async def complete(item_id, owner: Optional[str] = None):
+    """Buffered; becomes visible with the evaluation writes (see db.write_behind)"""
+    await write_behind.update_one(
+        "ai_queue",
+        _owned(item_id, owner),
+        {
+            "$set": {"status": "completed", "updated_at": _now()},
+            "$unset": {"lease_owner": "", "lease_expires_at": ""}
+        },
+        group="completed"
+    )
+
+
+async def fail(item_id, error: str, owner: Optional[str] = None):
+    await write_behind.update_one(
+        "ai_queue",
+        _owned(item_id, owner),
+        {
+            "$set": {"status": "failed", "error": error, "updated_at": _now()},
+            "$unset": {"lease_owner": "", "lease_expires_at": ""}
+        },
+        group="failed"
+    )
+
+
+async def _count_completed(modified: int):
+    await record_transition("processing", "completed", modified)
+
+
+async def _count_failed(modified: int):
+    await record_transition("processing", "failed", modified)
+
+
+write_behind.on_flush("ai_queue", "completed", _count_completed)
+write_behind.on_flush("ai_queue", "failed", _count_failed)
+
+
+async def requeue_expired() -> int:
+    """
+    Reaper pass: items whose lease ran out go back to pending, unless
+    they have used up their attempts, in which case they fail.
+
+    Items claimed before leases existed carry no lease and no heartbeat.
+    They expire once untouched for a lease period; those with no
+    updated_at are given a lease starting now, so a worker still on the
+    old code gets as long as any other to finish them.
+    """
+    now = _now()
+    stale = now - timedelta(seconds=settings.QUEUE_LEASE_SECONDS)
+    expired = {
+        "status": "processing",
+        "$or": [
+            {"lease_expires_at": {"$lt": now}},
+            {"lease_expires_at": {"$exists": False}, "updated_at": {"$lt": stale}}
+        ]
+    }
+
+    exhausted = await db.ai_queue.update_many(
+        {**expired, "attempts": {"$gte": settings.QUEUE_MAX_ATTEMPTS}},
+        {
+            "$set": {"status": "failed", "error": "Lease expired too many times", "updated_at": now},
+            "$unset": {"lease_owner": "", "lease_expires_at": ""}
+        }
+    )
+    result = await db.ai_queue.update_many(
+        expired,
+        {
+            "$set": {"status": "pending", "updated_at": now},
+            "$unset": {"lease_owner": "", "lease_expires_at": ""}
+        }
+    )
+    await db.ai_queue.update_many(
+        {"status": "processing", "lease_expires_at": {"$exists": False}},
+        {"$set": {"lease_expires_at": _lease_deadline()}}
+    )
+    await record_transition("processing", "failed", exhausted.modified_count)
+    await record_transition("processing", "pending", result.modified_count)
+    if result.modified_count:
+        notify()
+    return result.modified_count
+
+
+# ---------- Wake-ups ----------
+
+def _event() -> asyncio.Event:
+    global _wakeup
+    if _wakeup is None:
+        _wakeup = asyncio.Event()
+    return _wakeup
+
+
+def notify():
+    """Wake local workers, e.g. right after enqueueing an item"""
+    _event().set()
+
+
+async def wait_for_work(timeout: float):
+    """Sleep until notified or until timeout, whichever comes first"""
+    event = _event()
+    try:
+        await asyncio.wait_for(event.wait(), timeout)
+    except asyncio.TimeoutError:
+        pass
+    event.clear()
+
+
+async def watch_inserts():
+    """
+    Forward ai_queue inserts from a Mongo change stream to local workers,
+    so other processes and nodes wake without polling. Change streams
+    need a replica set; on a standalone server this returns and workers
+    fall back to local notifications plus the poll interval.
+    """
+    pipeline = [{"$match": {"operationType": {"$in": ["insert", "update", "replace"]}}}]
+    try:
+        async with db.ai_queue.watch(pipeline) as stream:
+            async for change in stream:
+                doc = change.get("fullDocument") or {}
+                fields = change.get("updateDescription", {}).get("updatedFields", {})
+                if doc.get("status") == "pending" or fields.get("status") == "pending":
+                    notify()
+    except PyMongoError as e:
+        print(f"Queue change stream unavailable, polling instead: {e}")
@@ -1,30 +1,197 @@
-import pdfplumber
-import json
-from langchain_google_genai import ChatGoogleGenerativeAI
+import asyncio
+import zipfile
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, Optional
+from ..core.blobstore import blob_size, open_blob, read_blob_head
 from ..core.config import settings
+from ..core.tracing import span
+from .extraction import (
+    extract_docx_text,
+    extract_pdf_pages,
+    extract_pdf_text,
+    extract_pdf_text_layer,
+    reset_executor,
+    run_in_pool,
+)
+from .llm import get_llm
+from .preprocess import preprocess_resume
+from .structured import ResumeData, decode, decode_outcomes, extract_json, validate
+
+SNIFF_BYTES = 1024
+
+OLE_MAGIC = b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"
+DOCX_MAIN_PART = "word/document.xml"
+
+
+class UnsupportedResumeFormat(Exception):
+    pass
+
+
+# ---------- Format detection ----------
+
+def is_docx(file_path: str) -> bool:
+    """A ZIP is only a DOCX if it has the main document part"""
+    try:
+        with open_blob(file_path) as data, zipfile.ZipFile(data) as archive:
+            archive.getinfo(DOCX_MAIN_PART)
+        return True
+    except (KeyError, zipfile.BadZipFile, OSError):
+        return False
+
+
+def sniff_format(head: bytes, file_path: Optional[str] = None) -> str:
+    """
+    Identify a document from its leading bytes, whatever its file name says.
+    Telling a DOCX from any other ZIP needs the file itself.
+    """
+    if b"%PDF-" in head[:SNIFF_BYTES]:
+        return "pdf"
+    if head.startswith(b"PK\x03\x04"):
+        return "docx" if file_path and is_docx(file_path) else "zip"
+    if head.startswith(OLE_MAGIC):
+        return "doc"
+    if head and b"\x00" not in head:
+        try:
+            head.decode("utf-8")
+        except UnicodeDecodeError as e:
+            # A multi-byte character may be cut at the end of the sample
+            if e.start < len(head) - 3:
+                return "unknown"
+        return "text"
+    return "unknown"
+
+
+def read_head(file_path: str) -> bytes:
+    return read_blob_head(file_path, SNIFF_BYTES)
+
+
+def sniff_file(file_path: str) -> str:
+    return sniff_format(read_head(file_path), file_path)
+
+
+# ---------- Extractor registry ----------
 
-llm = ChatGoogleGenerativeAI(
-    model="gemini-1.5-flash",
-    google_api_key=settings.GEMINI_API_KEY,
-    temperature=0
+@dataclass
+class Extractor:
+    format: str
+    extract: Callable[[str], Awaitable[str]]
+    max_bytes: int
+    timeout: float
+    # Runs in the extraction pool, which must be reset after a timeout
+    pooled: bool = True
+
+
+EXTRACTORS: Dict[str, Extractor] = {}
+
+
+def register_extractor(format: str, max_bytes: int, timeout: float, pooled: bool = True):
+    def decorate(fn):
+        EXTRACTORS[format] = Extractor(format, fn, max_bytes, timeout, pooled)
+        return fn
+    return decorate
+
+
+def unsupported_reason(format: str) -> str:
+    if format == "doc":
+        return "Legacy .doc files are not supported; upload PDF or DOCX"
+    if format == "zip":
+        return "ZIP archives are not resumes; upload PDF, DOCX or plain text"
+    return "Unrecognised resume format; upload PDF, DOCX or plain text"
+
+
+@register_extractor(
+    "pdf",
+    max_bytes=settings.EXTRACT_PDF_MAX_BYTES,
+    timeout=settings.EXTRACT_PDF_TIMEOUT_SECONDS
 )
+async def extract_pdf(file_path: str) -> str:
+    """pdfium text layer first; pdfplumber page-parallel extraction when that comes up short"""
+    try:
+        text = await run_in_pool(
+            extract_pdf_text_layer, file_path, settings.RESUME_MAX_PAGES, settings.RESUME_MAX_CHARS
+        )
+        if len(text.strip()) >= settings.PDF_FAST_MIN_CHARS:
+            return text
+    except Exception as e:
+        print(f"Fast PDF extraction failed, falling back: {str(e)}")
+    return await extract_pdf_text(file_path)
+
+
+@register_extractor(
+    "docx",
+    max_bytes=settings.EXTRACT_DOCX_MAX_BYTES,
+    timeout=settings.EXTRACT_DOCX_TIMEOUT_SECONDS
+)
+async def extract_docx(file_path: str) -> str:
+    return await run_in_pool(
+        extract_docx_text, file_path, settings.RESUME_MAX_CHARS, settings.EXTRACT_DOCX_MAX_XML_BYTES
+    )
+
+
+@register_extractor(
+    "text",
+    max_bytes=settings.EXTRACT_TEXT_MAX_BYTES,
+    timeout=settings.EXTRACT_TEXT_TIMEOUT_SECONDS,
+    pooled=False
+)
+async def extract_plain_text(file_path: str) -> str:
+    def read():
+        # At most 4 bytes per character in UTF-8
+        with open_blob(file_path) as data:
+            raw = data.read(settings.RESUME_MAX_CHARS * 4)
+        text = raw.decode("utf-8", errors="replace").replace("\r\n", "\n")
+        return text[:settings.RESUME_MAX_CHARS]
+    return await asyncio.to_thread(read)
+
 
 def extract_text_from_pdf(file_path: str) -> str:
+    """Synchronous extraction, for scripts; the API path uses extract_resume_text"""
     try:
-        text = ""
-        with pdfplumber.open(file_path) as pdf:
-            for page in pdf.pages:
-                text += page.extract_text() or ""
-        return text
+        text, _ = extract_pdf_pages(file_path, 0, settings.RESUME_MAX_PAGES, settings.RESUME_MAX_CHARS)
+        return text[:settings.RESUME_MAX_CHARS]
     except Exception as e:
         raise Exception(f"Failed to extract text from PDF: {str(e)}")
 
 
-async def parse_resume(resume_path: str) -> dict:
-    try:
-        resume_text = extract_text_from_pdf(resume_path)
+async def extract_resume_text(file_path: str) -> str:
+    """
+    Extract text with the extractor matching the file's magic bytes.
+
+    Files over the format's size guard are refused before any parsing, and
+    an extraction that overruns its timeout is abandoned and its pool
+    worker killed.
+    """
+    format = await asyncio.to_thread(sniff_file, file_path)
+    extractor = EXTRACTORS.get(format)
+    if extractor is None:
+        raise UnsupportedResumeFormat(unsupported_reason(format))
+
+    size = await asyncio.to_thread(blob_size, file_path)
+    if size > extractor.max_bytes:
+        raise Exception(f"{format} resume exceeds the {extractor.max_bytes} byte limit")
+
+    with span("resume.extract", format=format, bytes=size) as attrs:
+        try:
+            text = await asyncio.wait_for(extractor.extract(file_path), extractor.timeout)
+        except asyncio.TimeoutError:
+            if extractor.pooled:
+                reset_executor()
+            raise Exception(f"Timed out extracting {format} text after {extractor.timeout}s")
+        except Exception as e:
+            raise Exception(f"Failed to extract text from {format}: {str(e)}")
+        attrs["chars"] = len(text)
+        return text
+
 
-        prompt = f"""
+def prepare_resume_text(raw_text: str) -> str:
+    """Compress extracted text to the token budget before it reaches the LLM"""
+    if not settings.RESUME_PREPROCESS_ENABLED:
+        return raw_text
+    return preprocess_resume(raw_text).text
+
+
+def build_resume_prompt(resume_text: str) -> str:
+    return f"""
         You are a hiring AI.
         Extract the following from resume text:
         - Skills (list)
@@ -38,16 +205,73 @@ async def parse_resume(resume_path: str) -> dict:
         Output strictly in JSON format.
         """
 
-        response = llm.invoke(prompt)
-        
-        try:
-            return json.loads(response.content)
-        except json.JSONDecodeError:
-            return {
-                "skills": [],
-                "years_of_experience": 0,
-                "primary_role": "Unknown",
-                "tech_stack": []
-            }
+
+def build_batch_resume_prompt(resume_texts: Dict[str, str]) -> str:
+    """One prompt for several resumes; the answer is keyed by document id"""
+    documents = "\n\n".join(
+        f"<document id=\"{doc_id}\">\n{text}\n</document>"
+        for doc_id, text in resume_texts.items()
+    )
+    return f"""
+        You are a hiring AI.
+        For EACH resume document below, extract:
+        - Skills (list)
+        - Years of experience
+        - Primary role
+        - Tech stack
+
+        {documents}
+
+        Output strictly one JSON object whose keys are the document ids
+        and whose values are the extracted JSON for that document.
+        """
+
+
+def empty_resume_data() -> dict:
+    return {
+        "skills": [],
+        "years_of_experience": 0,
+        "primary_role": "Unknown",
+        "tech_stack": []
+    }
+
+
+async def decode_resume(content: str, prompt: str = None) -> dict:
+    result = await decode(content, ResumeData, prompt)
+    return result.model_dump() if result else empty_resume_data()
+
+
+async def parse_resume(resume_path: str) -> dict:
+    try:
+        resume_text = prepare_resume_text(await extract_resume_text(resume_path))
+        prompt = build_resume_prompt(resume_text)
+        response = await get_llm().complete(prompt)
+        return await decode_resume(response, prompt)
     except Exception as e:
         raise Exception(f"Failed to parse resume: {str(e)}")
+
+
+async def parse_resume_texts_batch(resume_texts: Dict[str, str]) -> Dict[str, dict]:
+    """
+    Parse several already-extracted resumes with a single LLM round trip.
+
+    Documents missing from the answer (or an undecodable answer) are left
+    out of the result so callers can fall back to parse_resume for them;
+    the batch answer is only repaired locally, never re-asked.
+    """
+    if not resume_texts:
+        return {}
+
+    response = await get_llm().complete(build_batch_resume_prompt(resume_texts))
+    decoded, repaired = extract_json(response)
+    if decoded is None:
+        return {}
+
+    results = {}
+    for doc_id in resume_texts:
+        data = decoded.get(doc_id)
+        result = validate(data, ResumeData) if isinstance(data, dict) else None
+        if result is not None:
+            decode_outcomes.inc(schema="ResumeData", outcome="repaired" if repaired else "clean")
+            results[doc_id] = result.model_dump()
+    return results
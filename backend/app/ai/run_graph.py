@@ -1,8 +1,8 @@
 import asyncio
-from app.ai.graph import build_graph
+from app.ai.graph import get_graph
 
 async def run():
-    graph = build_graph()
+    graph = get_graph()
 
     await graph.ainvoke({
         "applicant_id": "TEST_ID",
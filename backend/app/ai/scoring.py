@@ -0,0 +1,92 @@
+"""
+Score combination and vectorized batch skill scoring.
+
+score_batch encodes a job's required skills as columns and every
+applicant's resume skills as rows of a boolean matrix, so a whole job
+can be rescored in one NumPy pass from persisted evaluation data,
+without touching the LLM. Skills are compared by canonical name (see
+ai.skills), all applicants' lists resolved together. Results match
+match_skills / decision_node for the same inputs.
+"""
+from typing import Sequence
+
+import numpy as np
+
+from ..core.config import settings
+from .skills import required_skills, resolve_lists
+
+
+def decide(final_score: int) -> str:
+    return (
+        "Strong Match" if final_score >= settings.STRONG_MATCH_THRESHOLD else
+        "Moderate Match" if final_score >= settings.MODERATE_MATCH_THRESHOLD else
+        "Weak Match"
+    )
+
+
+def combine_scores(skill_score: float, github_score: float) -> int:
+    return int(
+        skill_score * settings.SKILL_SCORE_WEIGHT +
+        github_score * settings.GITHUB_SCORE_WEIGHT
+    )
+
+
+def skill_matrix(job_skills: Sequence, resume_skill_lists: Sequence[Sequence]):
+    """
+    Return (vocab, matrix) where vocab is the ordered list of distinct job
+    skills and matrix[i, j] is True when applicant i lists vocab[j].
+    """
+    required = required_skills(job_skills)
+    vocab = list(required.values())
+    column = {canonical: j for j, canonical in enumerate(required)}
+
+    rows, cols = [], []
+    for i, skills in enumerate(resolve_lists(resume_skill_lists)):
+        for skill in skills:
+            j = column.get(skill)
+            if j is not None:
+                rows.append(i)
+                cols.append(j)
+
+    matrix = np.zeros((len(resume_skill_lists), len(vocab)), dtype=bool)
+    matrix[rows, cols] = True
+    return vocab, matrix
+
+
+def score_batch(
+    job_skills: Sequence,
+    resume_skill_lists: Sequence[Sequence],
+    github_scores: Sequence[float]
+) -> dict:
+    """
+    Score every applicant of a job at once.
+
+    Returns the vocab and matrix plus per-applicant arrays: skill_scores,
+    final_scores, decisions.
+    """
+    vocab, matrix = skill_matrix(job_skills, resume_skill_lists)
+
+    if vocab:
+        matched = matrix.sum(axis=1)
+        skill_scores = (matched / len(vocab) * 100).astype(int)
+    else:
+        skill_scores = np.zeros(len(resume_skill_lists), dtype=int)
+
+    github = np.asarray(github_scores, dtype=float)
+    final_scores = (
+        skill_scores * settings.SKILL_SCORE_WEIGHT +
+        github * settings.GITHUB_SCORE_WEIGHT
+    ).astype(int)
+
+    decisions = np.where(
+        final_scores >= settings.STRONG_MATCH_THRESHOLD, "Strong Match",
+        np.where(final_scores >= settings.MODERATE_MATCH_THRESHOLD, "Moderate Match", "Weak Match")
+    )
+
+    return {
+        "vocab": vocab,
+        "matrix": matrix,
+        "skill_scores": skill_scores,
+        "final_scores": final_scores,
+        "decisions": decisions
+    }
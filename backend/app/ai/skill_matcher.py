@@ -1,3 +1,6 @@
+from .skills import required_skills, resolve_many
+
+
 def match_skills(job_skills: list, resume_skills: list) -> dict:
     if not job_skills:
         return {
@@ -5,17 +8,18 @@ def match_skills(job_skills: list, resume_skills: list) -> dict:
             "missing_skills": [],
             "skill_match_score": 0
         }
-    
-    job_skills_set = set(str(skill).lower() for skill in job_skills if skill)
-    resume_skills_set = set(str(skill).lower() for skill in resume_skills if skill)
 
-    matched = job_skills_set.intersection(resume_skills_set)
-    missing = job_skills_set - resume_skills_set
+    # Compare canonical names ("JS" == "JavaScript"), report the job's own wording
+    required = required_skills(job_skills)
+    resume_skills_set = set(resolve_many(resume_skills or []))
+
+    matched = [label for canonical, label in required.items() if canonical in resume_skills_set]
+    missing = [label for canonical, label in required.items() if canonical not in resume_skills_set]
 
-    score = int((len(matched) / len(job_skills_set)) * 100) if job_skills_set else 0
+    score = int((len(matched) / len(required)) * 100) if required else 0
 
     return {
-        "matched_skills": list(matched),
-        "missing_skills": list(missing),
+        "matched_skills": matched,
+        "missing_skills": missing,
         "skill_match_score": score
     }
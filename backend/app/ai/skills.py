@@ -0,0 +1,390 @@
+"""
+Skill normalization, so "JS" and "JavaScript", or "Postgres" and
+"PostgreSQL", count as the same skill.
+
+A skill is resolved to its canonical name in three steps:
+
+1. clean it: lowercase, collapse whitespace, trim surrounding punctuation
+2. look it up in the alias table (ALIASES below), with and without a
+   trailing " 3.11" style version
+3. otherwise find its nearest neighbour among every known name and alias
+   in a character n-gram TF-IDF index (a candidate needs a cosine
+   similarity of at least SKILL_FUZZY_THRESHOLD); if the key is a typo of
+   it, a few edits apart rather than a longer name containing it or a
+   different word, it maps to that neighbour's canonical name, and
+   anything else stays as cleaned
+
+The index is built once per process on first use. resolve_many() and
+resolve_lists() look up all cache misses of a call with one matrix
+product, and results are kept in a per-process LRU cache of
+SKILL_CACHE_SIZE entries.
+"""
+import math
+import re
+from collections import Counter, OrderedDict
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from ..core.config import settings
+from ..core.metrics import registry
+
+NGRAM = 3
+# Fuzzy matches may differ by one edit per this many characters
+TYPO_CHARS_PER_EDIT = 4
+# Below this length a substituted character counts as two edits
+TYPO_SUBSTITUTION_MIN_CHARS = 8
+QUERY_CHUNK = 1024
+
+# canonical name -> aliases (already in cleaned form). Only true synonyms,
+# abbreviations and spellings: related but distinct skills (GitHub and Git,
+# Scrum and Agile, Ubuntu and Linux) must stay apart or a resume gets
+# credit for a skill it never names
+ALIASES: Dict[str, List[str]] = {
+    # Languages
+    "javascript": ["js", "java script", "ecmascript", "es6", "es2015", "vanilla js"],
+    "typescript": ["ts", "type script"],
+    "python": ["py", "python3", "python 3", "python2"],
+    "java": ["java se", "core java"],
+    "c++": ["cpp", "cplusplus", "c plus plus"],
+    "c#": ["csharp", "c sharp"],
+    "go": ["golang", "go lang"],
+    "rust": ["rustlang", "rust lang"],
+    "ruby": ["ruby lang"],
+    "php": ["php7", "php8"],
+    "kotlin": ["kotlin jvm"],
+    "swift": ["swift lang"],
+    "objective-c": ["objc", "objective c", "obj-c"],
+    "scala": ["scala lang"],
+    "r": ["r lang", "rlang", "r programming"],
+    "bash": ["bash scripting", "bash shell"],
+    "sql": ["structured query language", "sql queries"],
+    "html": ["html5"],
+    "css": ["css3"],
+    "sass": ["scss"],
+    # Frontend
+    "react": ["react.js", "reactjs", "react js"],
+    "react native": ["react-native", "reactnative"],
+    "angular": ["angular 2+"],
+    "vue": ["vue.js", "vuejs", "vue js"],
+    "next.js": ["nextjs", "next js"],
+    "nuxt": ["nuxt.js", "nuxtjs"],
+    "svelte": ["sveltejs", "svelte.js"],
+    "redux": ["redux.js", "reduxjs"],
+    "jquery": ["j query"],
+    "tailwind css": ["tailwind", "tailwindcss"],
+    "bootstrap": ["twitter bootstrap"],
+    "webpack": ["web pack"],
+    # Backend
+    "node.js": ["node", "nodejs", "node js"],
+    "express": ["express.js", "expressjs", "express js"],
+    "nestjs": ["nest.js", "nest js"],
+    "django": ["django framework"],
+    "django rest framework": ["drf", "django rest"],
+    "flask": ["flask framework"],
+    "fastapi": ["fast api"],
+    "spring boot": ["springboot", "spring-boot"],
+    "spring": ["spring framework"],
+    "ruby on rails": ["rails", "ror", "ruby-on-rails"],
+    "laravel": ["laravel framework"],
+    ".net": ["dotnet", "dot net", ".net core", "dotnet core"],
+    "graphql": ["graph ql", "gql"],
+    "rest api": ["rest", "restful", "restful api", "rest apis", "restful apis", "rest services"],
+    "grpc": ["g rpc"],
+    # Data stores
+    "postgresql": ["postgres", "postgre", "postgre sql", "psql", "pgsql"],
+    "mysql": ["my sql"],
+    "mariadb": ["maria db"],
+    "sqlite": ["sqlite3"],
+    "sql server": ["mssql", "ms sql", "microsoft sql server", "ms sql server"],
+    "oracle database": ["oracle db"],
+    "mongodb": ["mongo", "mongo db"],
+    "redis": ["redis cache"],
+    "elasticsearch": ["elastic search"],
+    "cassandra": ["apache cassandra"],
+    "dynamodb": ["dynamo db", "dynamo", "aws dynamodb"],
+    "kafka": ["apache kafka"],
+    "rabbitmq": ["rabbit mq"],
+    "spark": ["apache spark"],
+    "hadoop": ["apache hadoop"],
+    "airflow": ["apache airflow"],
+    # Cloud and infrastructure
+    "aws": ["amazon web services", "amazon aws"],
+    "gcp": ["google cloud", "google cloud platform"],
+    "azure": ["microsoft azure", "ms azure"],
+    "docker": ["docker engine"],
+    "kubernetes": ["k8s", "kube", "k8"],
+    "terraform": ["hashicorp terraform"],
+    "ansible": ["ansible playbooks"],
+    "helm": ["helm charts"],
+    "linux": ["gnu/linux", "gnu linux"],
+    "ci/cd": ["cicd", "ci cd", "ci/cd pipelines"],
+    "github actions": ["gh actions", "github workflows"],
+    "gitlab ci": ["gitlab-ci", "gitlab ci/cd"],
+    "jenkins": ["jenkins ci"],
+    "git": ["git scm"],
+    "nginx": ["engine x"],
+    # Data and ML
+    "machine learning": ["ml"],
+    "deep learning": ["dl"],
+    "artificial intelligence": ["ai"],
+    "natural language processing": ["nlp"],
+    "computer vision": [],
+    "large language models": ["llm", "llms"],
+    "tensorflow": ["tensor flow", "tensorflow2"],
+    "pytorch": ["py torch"],
+    "scikit-learn": ["sklearn", "scikit learn"],
+    "pandas": ["pandas dataframe"],
+    "numpy": ["num py"],
+    "data analysis": ["data analytics"],
+    "power bi": ["powerbi", "microsoft power bi"],
+    "tableau": ["tableau desktop"],
+    # Practices and testing
+    "object-oriented programming": ["oop", "oops", "object oriented programming"],
+    "test-driven development": ["tdd", "test driven development"],
+    "microservices": ["micro services", "microservice", "microservice architecture"],
+    "agile": ["agile methodology", "agile methodologies"],
+    "unit testing": ["unit tests", "unit test"],
+    "data structures and algorithms": ["dsa", "data structures & algorithms", "data structures and algorithm"],
+    "ui/ux": ["ui ux", "ux/ui", "ui/ux design", "ux/ui design"],
+    "figma": ["figma design"],
+}
+
+# Trailing " 3.11" / " 2.x" / " v18" version numbers, which never change the skill
+VERSION_SUFFIX = re.compile(r"\s+v?\d+(\.(\d+|x))*\+?$")
+WHITESPACE = re.compile(r"\s+")
+EDGE_PUNCTUATION = " \t,;:()[]{}\"'*-_/"
+
+_index = None
+_cache: "OrderedDict[str, str]" = OrderedDict()
+
+skill_resolutions = registry.counter(
+    "skill_resolutions_total",
+    "Skills resolved outside the cache, by method (alias, fuzzy, unknown)"
+)
+
+
+def clean(skill) -> str:
+    key = WHITESPACE.sub(" ", str(skill).lower()).strip(EDGE_PUNCTUATION)
+    # A bare trailing dot is punctuation; ".js" / ".net" are not
+    if key.endswith(".") and not key.endswith(".."):
+        key = key[:-1]
+    return key
+
+
+def _alias_table() -> Dict[str, str]:
+    table = {}
+    for canonical, aliases in ALIASES.items():
+        table[canonical] = canonical
+        for alias in aliases:
+            table[alias] = canonical
+    return table
+
+
+ALIAS_TABLE = _alias_table()
+
+
+def _ngrams(key: str) -> Counter:
+    padded = f" {key} "
+    return Counter(padded[i:i + NGRAM] for i in range(max(1, len(padded) - NGRAM + 1)))
+
+
+# ---------- N-gram index ----------
+
+class SkillIndex:
+    """
+    TF-IDF vectors of character n-grams for every known name and alias,
+    L2-normalised so a dot product is the cosine similarity.
+    """
+
+    def __init__(self, table: Dict[str, str]):
+        self.names = list(table)
+        self.canonical = [table[name] for name in self.names]
+
+        grams = [_ngrams(name) for name in self.names]
+        df = Counter(gram for counts in grams for gram in counts)
+        self.features = {gram: j for j, gram in enumerate(df)}
+
+        n = len(self.names)
+        self.idf = np.array(
+            [math.log((1 + n) / (1 + df[gram])) + 1 for gram in self.features],
+            dtype=np.float32
+        )
+        # Smoothed idf of an n-gram the vocabulary has never seen
+        self.unseen_idf = math.log(1 + n) + 1
+
+        self.matrix = np.zeros((n, len(self.features)), dtype=np.float32)
+        for i, counts in enumerate(grams):
+            for gram, count in counts.items():
+                self.matrix[i, self.features[gram]] = count
+        self.matrix *= self.idf
+        self.matrix /= np.linalg.norm(self.matrix, axis=1, keepdims=True)
+
+    def nearest(self, keys: Sequence[str]):
+        """Return (known names, canonical names, similarities) of each key's nearest neighbour"""
+        names: List[str] = []
+        canonical: List[str] = []
+        similarities = np.empty(len(keys), dtype=np.float32)
+        # Chunked so a large pool of unseen skills can't build a huge query matrix
+        for start in range(0, len(keys), QUERY_CHUNK):
+            chunk = keys[start:start + QUERY_CHUNK]
+            best, scores = self._nearest(chunk)
+            names.extend(self.names[j] for j in best)
+            canonical.extend(self.canonical[j] for j in best)
+            similarities[start:start + len(chunk)] = scores
+        return names, canonical, similarities
+
+    def _nearest(self, keys: Sequence[str]):
+        queries = np.zeros((len(keys), len(self.features)), dtype=np.float32)
+        unseen = np.zeros(len(keys), dtype=np.float32)
+        for i, key in enumerate(keys):
+            for gram, count in _ngrams(key).items():
+                j = self.features.get(gram)
+                if j is None:
+                    unseen[i] += (count * self.unseen_idf) ** 2
+                else:
+                    queries[i, j] = count
+        queries *= self.idf
+        # N-grams outside the vocabulary still count towards the query's length
+        norms = np.sqrt((queries ** 2).sum(axis=1) + unseen)
+
+        similarities = (queries @ self.matrix.T) / norms[:, None]
+        best = similarities.argmax(axis=1)
+        return best, similarities[np.arange(len(keys)), best]
+
+
+def get_index() -> SkillIndex:
+    global _index
+    if _index is None:
+        _index = SkillIndex(ALIAS_TABLE)
+    return _index
+
+
+# ---------- Resolution ----------
+
+def _edit_distance(a: str, b: str, limit: int, substitution: int = 1) -> int:
+    """
+    Edit distance counting a swap of adjacent characters as one edit
+    (optimal string alignment), or limit + 1 once it must exceed limit.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    before, previous = None, list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            cost = min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (substitution if ca != cb else 0)
+            )
+            if before is not None and j > 1 and ca == b[j - 2] and a[i - 2] == cb:
+                cost = min(cost, before[j - 2] + 1)
+            current.append(cost)
+        if min(current) > limit and min(previous) > limit:
+            return limit + 1
+        before, previous = previous, current
+    return previous[-1]
+
+
+def _is_typo(key: str, name: str) -> bool:
+    """
+    N-grams also match a key contained in a longer name ("gitlab" in
+    "gitlab ci", "torch" in "pytorch"); only a few edits apart counts. In
+    a short key a changed letter more often makes a different word
+    ("flash", "scale") than a typo, so there it costs two edits, and
+    typos keep the first letter ("erlang" is not "rlang").
+    """
+    if key[:1] != name[:1]:
+        return False
+    limit = max(1, len(key) // TYPO_CHARS_PER_EDIT)
+    substitution = 1 if len(key) >= TYPO_SUBSTITUTION_MIN_CHARS else 2
+    return _edit_distance(key, name, limit, substitution) <= limit
+
+
+def _lookup(key: str) -> Optional[str]:
+    canonical = ALIAS_TABLE.get(key)
+    if canonical is None:
+        stripped = VERSION_SUFFIX.sub("", key)
+        canonical = ALIAS_TABLE.get(stripped)
+    return canonical
+
+
+def _remember(key: str, canonical: str):
+    _cache[key] = canonical
+    if len(_cache) > settings.SKILL_CACHE_SIZE:
+        _cache.popitem(last=False)
+
+
+def _clean_all(skills: Iterable) -> List[str]:
+    keys = (clean(skill) for skill in skills if skill)
+    return [key for key in keys if key]
+
+
+def _resolve(keys: Iterable[str]) -> Dict[str, str]:
+    """Canonical name per distinct key; cache misses that aren't aliases go through the index together"""
+    resolved: Dict[str, str] = {}
+    fuzzy: List[str] = []
+    for key in dict.fromkeys(keys):
+        canonical = _cache.get(key)
+        if canonical is not None:
+            _cache.move_to_end(key)
+            resolved[key] = canonical
+            continue
+
+        canonical = _lookup(key)
+        if canonical is not None:
+            skill_resolutions.inc(method="alias")
+            resolved[key] = canonical
+            _remember(key, canonical)
+        elif len(key) >= settings.SKILL_FUZZY_MIN_CHARS:
+            fuzzy.append(key)
+        else:
+            # Too short for n-grams to tell apart ("c" vs "r")
+            skill_resolutions.inc(method="unknown")
+            resolved[key] = key
+            _remember(key, key)
+
+    if fuzzy:
+        neighbours, canonicals, similarities = get_index().nearest(fuzzy)
+        for key, neighbour, canonical, similarity in zip(fuzzy, neighbours, canonicals, similarities):
+            if similarity >= settings.SKILL_FUZZY_THRESHOLD and _is_typo(key, neighbour):
+                skill_resolutions.inc(method="fuzzy")
+            else:
+                skill_resolutions.inc(method="unknown")
+                canonical = VERSION_SUFFIX.sub("", key) or key
+            resolved[key] = canonical
+            _remember(key, canonical)
+
+    return resolved
+
+
+def resolve_many(skills: Iterable) -> List[str]:
+    """Canonical names for a list of skills, in order; empty entries are dropped"""
+    keys = _clean_all(skills)
+    if not settings.SKILL_NORMALIZATION_ENABLED:
+        return keys
+    resolved = _resolve(keys)
+    return [resolved[key] for key in keys]
+
+
+def resolve_lists(skill_lists: Sequence[Sequence]) -> List[List[str]]:
+    """resolve_many over many lists in one pass, e.g. every applicant of a job"""
+    keyed = [_clean_all(skills or []) for skills in skill_lists]
+    if not settings.SKILL_NORMALIZATION_ENABLED:
+        return keyed
+    resolved = _resolve(key for keys in keyed for key in keys)
+    return [[resolved[key] for key in keys] for keys in keyed]
+
+
+def required_skills(job_skills: Sequence) -> Dict[str, str]:
+    """
+    A job's distinct requirements: canonical name -> the job's own wording
+    (lowercased), first occurrence winning, so "JS" and "JavaScript" in one
+    job count once.
+    """
+    kept = [skill for skill in job_skills or [] if skill and clean(skill)]
+    required: Dict[str, str] = {}
+    for canonical, skill in zip(resolve_many(kept), kept):
+        required.setdefault(canonical, str(skill).lower())
+    return required
@@ -0,0 +1,266 @@
+"""
+Schema-driven decoding of LLM answers.
+
+Models are asked for JSON but often wrap it in ```json fences, add prose
+around it, or loosen the types ("5+ years", "85/100", a comma-separated
+skills string). Answers are repaired locally first; only when that fails
+is the model asked once more, uncached, to restate its own answer as JSON
+matching the schema. The resume text is not resent.
+"""
+import json
+import re
+from typing import Any, List, Optional, Tuple, Type, TypeVar
+
+from pydantic import BaseModel, ConfigDict, ValidationError, field_validator, model_validator
+
+from ..core.metrics import registry
+from .llm import get_llm
+
+T = TypeVar("T", bound=BaseModel)
+
+_FENCE = re.compile(r"```[a-zA-Z]*\s*\n?(.*?)```", re.DOTALL)
+_TRAILING_COMMA = re.compile(r",\s*([}\]])")
+_NUMBER = re.compile(r"-?\d+(?:\.\d+)?")
+_LIST_SPLIT = re.compile(r"[,;\n]")
+
+decode_outcomes = registry.counter(
+    "llm_decode_total",
+    "Structured LLM answers by schema and outcome (clean, repaired, reasked, failed)"
+)
+
+
+# ---------- Coercion helpers ----------
+
+def _key(name: str) -> str:
+    return re.sub(r"[\s\-]+", "_", str(name).strip()).lower()
+
+
+def _number(value: Any) -> float:
+    if isinstance(value, bool):
+        return float(value)
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        match = _NUMBER.search(value)
+        if match:
+            return float(match.group())
+    return 0.0
+
+
+def _string_list(value: Any) -> List[str]:
+    if value is None:
+        return []
+    if isinstance(value, str):
+        items = _LIST_SPLIT.split(value)
+    elif isinstance(value, dict):
+        # {"languages": [...], "frameworks": [...]} -> flattened values
+        items = [v for group in value.values() for v in _string_list(group)]
+    elif isinstance(value, (list, tuple)):
+        items = []
+        for item in value:
+            if isinstance(item, dict):
+                item = item.get("name") or item.get("skill") or next(iter(item.values()), "")
+            items.append(item)
+    else:
+        items = [value]
+    return [str(item).strip() for item in items if str(item).strip()]
+
+
+class LenientModel(BaseModel):
+    """Normalises "Years of experience" style keys and ignores extras"""
+    model_config = ConfigDict(extra="ignore")
+
+    @model_validator(mode="before")
+    @classmethod
+    def normalise_keys(cls, data: Any) -> Any:
+        if isinstance(data, dict):
+            return {_key(k): v for k, v in data.items()}
+        return data
+
+
+# ---------- Schemas ----------
+# The core field of each schema is required: an answer without it is a
+# failed decode (repair, then re-ask), never a silently empty result.
+
+class ResumeData(LenientModel):
+    skills: List[str]
+    years_of_experience: float = 0
+    primary_role: str = "Unknown"
+    tech_stack: List[str] = []
+
+    @field_validator("skills", "tech_stack", mode="before")
+    @classmethod
+    def coerce_list(cls, value):
+        return _string_list(value)
+
+    @field_validator("years_of_experience", mode="before")
+    @classmethod
+    def coerce_years(cls, value):
+        return max(_number(value), 0.0)
+
+    @field_validator("primary_role", mode="before")
+    @classmethod
+    def coerce_role(cls, value):
+        return str(value).strip() if value else "Unknown"
+
+
+class GitHubAnalysis(LenientModel):
+    github_score: int
+    tech_strengths: List[str] = []
+    weaknesses: List[str] = []
+    hiring_insight: str = "No insight available"
+
+    @field_validator("github_score", mode="before")
+    @classmethod
+    def coerce_score(cls, value):
+        return int(round(min(max(_number(value), 0.0), 100.0)))
+
+    @field_validator("tech_strengths", "weaknesses", mode="before")
+    @classmethod
+    def coerce_list(cls, value):
+        return _string_list(value)
+
+    @field_validator("hiring_insight", mode="before")
+    @classmethod
+    def coerce_insight(cls, value):
+        if isinstance(value, (list, tuple)):
+            return " ".join(str(v) for v in value)
+        return str(value).strip() if value else "No insight available"
+
+
+# ---------- Local repair ----------
+
+def strip_fences(text: str) -> str:
+    match = _FENCE.search(text)
+    return match.group(1) if match else text
+
+
+def first_json_object(text: str) -> Optional[str]:
+    """Return the first balanced {...} in text, ignoring braces inside strings"""
+    start = text.find("{")
+    while start != -1:
+        depth = 0
+        in_string = False
+        escaped = False
+        for index in range(start, len(text)):
+            char = text[index]
+            if in_string:
+                if escaped:
+                    escaped = False
+                elif char == "\\":
+                    escaped = True
+                elif char == '"':
+                    in_string = False
+            elif char == '"':
+                in_string = True
+            elif char == "{":
+                depth += 1
+            elif char == "}":
+                depth -= 1
+                if depth == 0:
+                    return text[start:index + 1]
+        start = text.find("{", start + 1)
+    return None
+
+
+def _loads(text: str) -> Optional[dict]:
+    for candidate in (text, _TRAILING_COMMA.sub(r"\1", text)):
+        try:
+            value = json.loads(candidate)
+        except (json.JSONDecodeError, TypeError):
+            continue
+        return value if isinstance(value, dict) else None
+    return None
+
+
+def extract_json(content: str) -> Tuple[Optional[dict], bool]:
+    """
+    Return (object, repaired) for the JSON object in an LLM answer.
+
+    repaired is False when the answer was valid JSON as-is.
+    """
+    try:
+        value = json.loads(content)
+        if isinstance(value, dict):
+            return value, False
+    except (json.JSONDecodeError, TypeError):
+        pass
+
+    text = strip_fences(content or "").strip()
+    value = _loads(text)
+    if value is None:
+        candidate = first_json_object(text)
+        value = _loads(candidate) if candidate else None
+    return value, True
+
+
+def validate(data: Optional[dict], schema: Type[T]) -> Optional[T]:
+    if data is None:
+        return None
+    try:
+        return schema.model_validate(data)
+    except ValidationError:
+        return None
+
+
+# ---------- Decoding ----------
+
+def build_reask_prompt(content: str, schema: Type[T]) -> str:
+    return f"""
+        Your previous answer could not be parsed as JSON matching the
+        expected schema.
+
+        Previous answer:
+        {content}
+
+        Restate the same information as a single JSON object matching this
+        JSON schema. Output the JSON object only, with no code fences or prose.
+
+        Schema:
+        {json.dumps(schema.model_json_schema())}
+        """
+
+
+def decode_local(content: str, schema: Type[T]) -> Tuple[Optional[T], bool]:
+    data, repaired = extract_json(content)
+    result = validate(data, schema)
+    if result is None and isinstance(data, dict) and len(data) == 1:
+        # {"resume": {...}}: the expected object under a wrapper key
+        inner = next(iter(data.values()))
+        if isinstance(inner, dict):
+            result, repaired = validate(inner, schema), True
+    return result, repaired
+
+
+async def decode(content: str, schema: Type[T], prompt: Optional[str] = None) -> Optional[T]:
+    """
+    Decode an answer into schema, re-asking the model at most once.
+
+    When the original prompt is given, a successful re-ask replaces the
+    memoized answer for it and a failure evicts it, so the same broken
+    answer is not replayed on the next evaluation.
+    """
+    name = schema.__name__
+    result, repaired = decode_local(content, schema)
+    if result is not None:
+        decode_outcomes.inc(schema=name, outcome="repaired" if repaired else "clean")
+        return result
+
+    llm = get_llm()
+    try:
+        retry = await llm.complete(build_reask_prompt(content, schema), use_cache=False)
+        result, _ = decode_local(retry, schema)
+    except Exception as e:
+        print(f"Re-ask for {name} failed: {str(e)}")
+        result = None
+
+    if result is None:
+        decode_outcomes.inc(schema=name, outcome="failed")
+        if prompt is not None:
+            llm.forget(prompt)
+        return None
+
+    decode_outcomes.inc(schema=name, outcome="reasked")
+    if prompt is not None:
+        llm.remember(prompt, result.model_dump_json())
+    return result
@@ -1,58 +1,192 @@
-from fastapi import APIRouter, HTTPException
-from typing import List
+from fastapi import APIRouter, HTTPException, Query
+from typing import List, Optional
+from datetime import datetime, timezone
+import time
 from bson import ObjectId
+from pymongo import UpdateOne
 from ..db.mongo import db
+from ..core.config import settings
+from ..core import tracing
+from ..core.blobstore import get_blob_store
+from ..ai import leaderboard
+from ..ai.parse_cache import parse_cache, parse_version
+from ..ai.admission import PRIORITY_LANE, STANDARD_LANE, queue_priority
+from .jobs import invalidate_list_cache
 
 router = APIRouter(prefix="/admin", tags=["Admin"])
 
 # ---------- Routes ----------
 
 @router.get("/candidates/{job_id}")
-async def get_candidates_for_job(job_id: str):
+async def get_candidates_for_job(
+    job_id: str,
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None
+):
+    """
+    Evaluated candidates, best first, served from the materialized
+    leaderboard. Only applicants with a scored evaluation are listed;
+    those still pending or whose evaluation failed are not.
+    """
     try:
         object_id = ObjectId(job_id)
     except:
         raise HTTPException(status_code=400, detail="Invalid job ID format")
-    
-    job = await db.jobs.find_one({"_id": object_id})
+
+    job = await db.jobs.find_one({"_id": object_id}, {"title": 1})
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
 
-    pipeline = [
-        {"$match": {"job_id": job_id}},
-        {"$lookup": {
-            "from": "evaluations",
-            "localField": "_id",
-            "foreignField": "applicant_id",
-            "as": "evaluation"
-        }},
-        {"$addFields": {
-            "applicant_id_str": {"$toString": "$_id"}
-        }},
-        {"$lookup": {
-            "from": "evaluations",
-            "localField": "applicant_id_str",
-            "foreignField": "applicant_id",
-            "as": "evaluation"
-        }},
-        {"$unwind": {"path": "$evaluation", "preserveNullAndEmptyArrays": True}},
-        {"$sort": {"evaluation.final_score": -1}}
-    ]
+    try:
+        docs, next_cursor = await leaderboard.page(job_id, limit, cursor)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
 
     results = [
         {
-            "applicant_id": str(doc["_id"]),
+            "applicant_id": doc["_id"],
             "name": doc.get("name"),
             "email": doc.get("email"),
             "github_url": doc.get("github_url"),
-            "final_score": doc.get("evaluation", {}).get("final_score"),
-            "decision": doc.get("evaluation", {}).get("decision"),
-            "ai_summary": doc.get("evaluation", {}).get("ai_summary")
+            "final_score": doc.get("final_score"),
+            "decision": doc.get("decision"),
+            "ai_summary": doc.get("ai_summary")
         }
-        async for doc in db.applicants.aggregate(pipeline)
+        for doc in docs
     ]
 
     return {
         "job_title": job.get("title"),
-        "candidates": results
+        "candidates": results,
+        "next_cursor": next_cursor
+    }
+
+
+@router.post("/jobs/{job_id}/leaderboard/rebuild")
+async def rebuild_leaderboard(job_id: str):
+    """Backfill the leaderboard for evaluations written before it existed"""
+    if not ObjectId.is_valid(job_id):
+        raise HTTPException(status_code=400, detail="Invalid job ID format")
+
+    return {"job_id": job_id, "entries": await leaderboard.rebuild(job_id)}
+
+
+@router.put("/jobs/{job_id}/priority")
+async def set_job_priority(job_id: str, enabled: bool = True):
+    """Flag a job for the priority lane; its pending evaluations move up the queue"""
+    if not ObjectId.is_valid(job_id):
+        raise HTTPException(status_code=400, detail="Invalid job ID format")
+
+    result = await db.jobs.update_one({"_id": ObjectId(job_id)}, {"$set": {"priority": enabled}})
+    if result.matched_count == 0:
+        raise HTTPException(status_code=404, detail="Job not found")
+    invalidate_list_cache()
+
+    lane = PRIORITY_LANE if enabled else STANDARD_LANE
+    requeued = await db.ai_queue.update_many(
+        {"job_id": job_id, "status": "pending"},
+        {"$set": {"priority": queue_priority(lane)}}
+    )
+    return {"job_id": job_id, "lane": lane, "pending_updated": requeued.modified_count}
+
+
+@router.delete("/parse-cache")
+async def invalidate_parse_cache(version: Optional[str] = None):
+    """Drop cached resume parses for a version (default: all but the current one)"""
+    deleted = await parse_cache.invalidate(version)
+    return {
+        "current_version": parse_version(),
+        "deleted": deleted
+    }
+
+
+@router.post("/blobs/gc")
+async def collect_blobs(grace_seconds: Optional[float] = Query(None, ge=0)):
+    """Delete resume blobs no applicant refers to any more"""
+    return await get_blob_store().gc(grace_seconds)
+
+
+@router.post("/jobs/{job_id}/rescore")
+async def rescore_job(job_id: str):
+    """
+    Recompute skill and final scores for every evaluated applicant of a job
+    from persisted resume/GitHub data, using the current required_skills
+    and score weights. No LLM calls are made.
+    """
+    try:
+        object_id = ObjectId(job_id)
+    except:
+        raise HTTPException(status_code=400, detail="Invalid job ID format")
+
+    job = await db.jobs.find_one({"_id": object_id}, {"required_skills": 1})
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    # Imported here to keep NumPy out of API cold start
+    from ..ai.scoring import score_batch
+
+    started = time.perf_counter()
+
+    evaluations = [
+        doc async for doc in db.evaluations.find(
+            {"job_id": job_id, "resume_data": {"$exists": True}},
+            {"applicant_id": 1, "resume_data.skills": 1, "github_data.github_score": 1}
+        )
+    ]
+    skipped = await db.evaluations.count_documents(
+        {"job_id": job_id, "resume_data": {"$exists": False}}
+    )
+
+    if not evaluations:
+        return {"job_id": job_id, "rescored": 0, "skipped": skipped}
+
+    result = score_batch(
+        job["required_skills"],
+        [doc.get("resume_data", {}).get("skills", []) for doc in evaluations],
+        [doc.get("github_data", {}).get("github_score", 0) or 0 for doc in evaluations]
+    )
+    vocab = result["vocab"]
+    now = datetime.now(timezone.utc)
+
+    operations = []
+    for i, doc in enumerate(evaluations):
+        row = result["matrix"][i]
+        operations.append(UpdateOne(
+            {"_id": doc["_id"]},
+            {"$set": {
+                "final_score": int(result["final_scores"][i]),
+                "decision": str(result["decisions"][i]),
+                "skill_match_result": {
+                    "matched_skills": [skill for skill, hit in zip(vocab, row) if hit],
+                    "missing_skills": [skill for skill, hit in zip(vocab, row) if not hit],
+                    "skill_match_score": int(result["skill_scores"][i])
+                },
+                "rescored_at": now
+            }}
+        ))
+
+    await db.evaluations.bulk_write(operations, ordered=False)
+    await db.leaderboard.bulk_write([
+        leaderboard.score_update(
+            doc["applicant_id"],
+            int(result["final_scores"][i]),
+            str(result["decisions"][i])
+        )
+        for i, doc in enumerate(evaluations)
+    ], ordered=False)
+
+    return {
+        "job_id": job_id,
+        "rescored": len(operations),
+        "skipped": skipped,
+        "duration_ms": round((time.perf_counter() - started) * 1000, 1)
+    }
+
+
+@router.get("/traces/summary")
+async def trace_summary():
+    """p50/p95 wall time per graph node and external call, for this process"""
+    return {
+        "enabled": settings.TRACING_ENABLED,
+        "spans": tracing.summary()
     }
@@ -1,19 +1,21 @@
 from fastapi import APIRouter, UploadFile, File, Form, HTTPException, BackgroundTasks
 from datetime import datetime, timezone
-import os
+import asyncio
 import uuid
+import aiofiles.os
 from werkzeug.utils import secure_filename
 from bson import ObjectId
-import asyncio
+from pymongo.errors import DuplicateKeyError
 
 from ..db.mongo import db
-from ..core.config import settings
-from ..ai.graph import build_graph
+from ..core.blobstore import get_blob_store
+from ..core.uploads import UploadTooLarge, save_upload
+from ..ai.dispatch import dispatch_evaluation
+from ..ai.admission import AdmissionRejected, STANDARD_LANE, admit, lane_for
+from ..ai.resume_parser import EXTRACTORS, sniff_format, unsupported_reason
 
 router = APIRouter(prefix="/apply", tags=["Applicants"])
 
-os.makedirs(settings.RESUME_UPLOAD_DIR, exist_ok=True)
-
 # ---------- Helpers ----------
 
 def extract_github_username(github_url: str) -> str:
@@ -24,54 +26,27 @@ def extract_github_username(github_url: str) -> str:
     return github_url
 
 
-async def run_ai_pipeline(
-    applicant_id: str,
-    job_id: str,
-    resume_path: str,
-    github_username: str
-):
-    """
-    Background AI evaluation pipeline
-    """
-    try:
-        applicant_object_id = ObjectId(applicant_id)
-        job_object_id = ObjectId(job_id)
-
-        applicant = await db.applicants.find_one({"_id": applicant_object_id})
-        job = await db.jobs.find_one({"_id": job_object_id})
-
-        if not applicant or not job:
-            raise Exception("Applicant or Job not found")
-
-        graph = build_graph()
-
-        await graph.ainvoke({
-            "applicant_id": applicant_id,
-            "job_id": job_id,
-            "resume_path": resume_path,
-            "github_username": github_username,
-            "job_skills": job["required_skills"],
-            "job_role": job["title"]
-        })
-
-        # Mark queue completed
-        await db.ai_queue.update_one(
-            {"applicant_id": applicant_id},
-            {"$set": {"status": "completed", "updated_at": datetime.now(timezone.utc)}}
-        )
+def normalize_email(email: str) -> str:
+    return email.strip().lower()
 
-    except Exception as e:
-        # Mark queue failed
-        await db.ai_queue.update_one(
-            {"applicant_id": applicant_id},
-            {
-                "$set": {
-                    "status": "failed",
-                    "error": str(e),
-                    "updated_at": datetime.now(timezone.utc)
-                }
-            }
-        )
+
+async def existing_application(job_id: str, email: str, lane: str = STANDARD_LANE):
+    """Return the response for a repeat submission, or None for a new applicant"""
+    applicant = await db.applicants.find_one(
+        {"job_id": job_id, "email": email},
+        {"_id": 1}
+    )
+    if not applicant:
+        return None
+
+    # Idempotent: returns the existing status, and only queues an
+    # evaluation if an earlier submission never got that far
+    applicant_id = str(applicant["_id"])
+    return {
+        "message": "Application already submitted.",
+        "applicant_id": applicant_id,
+        "evaluation": await dispatch_evaluation(applicant_id, job_id, lane=lane)
+    }
 
 
 # ---------- Route ----------
@@ -98,23 +73,55 @@ async def apply_for_job(
     if not resume.filename or "." not in resume.filename:
         raise HTTPException(status_code=400, detail="Invalid resume filename")
 
-    allowed_extensions = {"pdf", "doc", "docx"}
+    allowed_extensions = {"pdf", "doc", "docx", "txt"}
     file_ext = resume.filename.split(".")[-1].lower()
 
     if file_ext not in allowed_extensions:
         raise HTTPException(
             status_code=400,
-            detail="Only PDF, DOC, DOCX files allowed"
+            detail="Only PDF, DOC, DOCX, TXT files allowed"
+        )
+
+    email = normalize_email(email)
+
+    # Duplicate submissions get the existing evaluation status
+    existing = await existing_application(job_id, email, lane_for(job))
+    if existing:
+        return existing
+
+    # Backpressure: refuse before storing anything when the queue is full
+    try:
+        lane = await admit(job)
+    except AdmissionRejected as e:
+        raise HTTPException(
+            status_code=429,
+            detail=e.reason,
+            headers={"Retry-After": str(e.retry_after)}
         )
 
-    # Save resume
+    # Stage the resume; it only enters the blob store once it is accepted
+    blob_store = get_blob_store()
     try:
         secure_name = secure_filename(resume.filename)
         file_name = f"{uuid.uuid4()}.{file_ext}"
-        file_path = os.path.join(settings.RESUME_UPLOAD_DIR, file_name)
+        stored = await save_upload(resume, blob_store.staging_dir, file_name)
+    except UploadTooLarge as e:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Resume exceeds the {e.limit // (1024 * 1024)} MB limit"
+        )
+    except Exception:
+        raise HTTPException(status_code=500, detail="Failed to save resume")
+
+    # Reject what no extractor can read before any evaluation work is queued
+    resume_format = await asyncio.to_thread(sniff_format, stored.head, stored.path)
+    if resume_format not in EXTRACTORS:
+        await aiofiles.os.remove(stored.path)
+        raise HTTPException(status_code=415, detail=unsupported_reason(resume_format))
 
-        with open(file_path, "wb") as f:
-            f.write(await resume.read())
+    # Identical files are stored once, whoever uploads them
+    try:
+        file_path = await blob_store.put(stored.path, stored.sha256, stored.size)
     except Exception:
         raise HTTPException(status_code=500, detail="Failed to save resume")
 
@@ -127,34 +134,39 @@ async def apply_for_job(
         "github_url": github_url,
         "github_username": github_username,
         "resume_path": file_path,
+        "resume_sha256": stored.sha256,
+        "resume_size": stored.size,
         "created_at": datetime.now(timezone.utc),
         "status": "submitted"
     }
 
-    result = await db.applicants.insert_one(applicant_doc)
-
-    # Insert AI queue entry
-    await db.ai_queue.insert_one({
-        "applicant_id": str(result.inserted_id),
-        "job_id": job_id,
-        "status": "pending",
-        "created_at": datetime.now(timezone.utc)
-    })
+    # Upsert on (job_id, email) so concurrent duplicates collapse into one applicant;
+    # two racing upserts can both miss, and the unique index turns one away
+    try:
+        result = await db.applicants.update_one(
+            {"job_id": job_id, "email": email},
+            {"$setOnInsert": applicant_doc},
+            upsert=True
+        )
+        upserted_id = result.upserted_id
+    except DuplicateKeyError:
+        upserted_id = None
+    except Exception:
+        # No applicant holds the reference put() took
+        await blob_store.release(stored.sha256)
+        raise
+    if upserted_id is None:
+        await blob_store.release(stored.sha256)
+        return await existing_application(job_id, email, lane)
 
+    applicant_id = str(upserted_id)
 
-    def run_ai_pipeline_sync(*args, **kwargs):
-        asyncio.run(run_ai_pipeline(*args, **kwargs))
+    # 🚀 Queue the AI evaluation exactly once; it starts in the background
+    # when this process has capacity, otherwise a worker picks it up
+    evaluation = await dispatch_evaluation(applicant_id, job_id, lane=lane)
 
-    # 🚀 Trigger AI evaluation in background
-    asyncio.create_task(
-        run_ai_pipeline(
-            applicant_id=str(result.inserted_id),
-            job_id=job_id,
-            resume_path=file_path,
-            github_username=github_username
-        )
-    )
     return {
         "message": "Application submitted successfully. AI evaluation in progress.",
-        "applicant_id": str(result.inserted_id)
+        "applicant_id": applicant_id,
+        "evaluation": evaluation
     }
@@ -0,0 +1,138 @@
+from fastapi import APIRouter, UploadFile, File, HTTPException
+from typing import List, Optional
+import asyncio
+import csv
+import io
+import uuid
+import zipfile
+import aiofiles.os
+from bson import ObjectId
+
+from ..db.mongo import db
+from ..core.config import settings
+from ..core.uploads import UploadTooLarge, save_upload
+from ..ai import ingest
+from ..ai.admission import AdmissionRejected, admit
+from .applicants import extract_github_username, normalize_email
+
+router = APIRouter(prefix="/apply", tags=["Bulk ingest"])
+
+ROSTER_COLUMNS = {
+    "name": "name",
+    "email": "email",
+    "github": "github_url",
+    "github_url": "github_url",
+    "file": "file",
+    "resume": "file"
+}
+
+# ---------- Helpers ----------
+
+def parse_roster(raw: bytes) -> List[dict]:
+    """name,email,github[,file] rows; unknown columns are ignored"""
+    reader = csv.DictReader(io.StringIO(raw.decode("utf-8-sig")))
+    rows = []
+    for record in reader:
+        row = {}
+        for column, value in record.items():
+            field = ROSTER_COLUMNS.get((column or "").strip().lower())
+            if field and value and value.strip():
+                row[field] = value.strip()
+        if not row:
+            continue
+        if row.get("email"):
+            row["email"] = normalize_email(row["email"])
+        if row.get("github_url"):
+            row["github_username"] = extract_github_username(row["github_url"])
+        rows.append(row)
+    return rows
+
+
+# ---------- Routes ----------
+
+@router.post("/{job_id}/bulk", status_code=202)
+async def bulk_apply(
+    job_id: str,
+    archive: UploadFile = File(...),
+    roster: Optional[UploadFile] = File(None)
+):
+    """
+    Ingest a ZIP of resumes, optionally with a CSV roster of
+    name,email,github[,file]. Returns a batch id at once; follow progress
+    at GET /apply/batches/{batch_id}.
+    """
+    if not ObjectId.is_valid(job_id):
+        raise HTTPException(status_code=400, detail="Invalid job ID format")
+
+    job = await db.jobs.find_one({"_id": ObjectId(job_id)})
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    try:
+        await admit(job)
+    except AdmissionRejected as e:
+        raise HTTPException(
+            status_code=429,
+            detail=e.reason,
+            headers={"Retry-After": str(e.retry_after)}
+        )
+
+    roster_rows = []
+    if roster is not None and roster.filename:
+        raw = await roster.read(settings.BULK_MAX_ROSTER_BYTES + 1)
+        if len(raw) > settings.BULK_MAX_ROSTER_BYTES:
+            raise HTTPException(status_code=413, detail="Roster CSV is too large")
+        try:
+            roster_rows = parse_roster(raw)
+        except (UnicodeDecodeError, csv.Error):
+            raise HTTPException(status_code=400, detail="Roster must be a UTF-8 CSV file")
+
+    # Spool the archive to disk; zip needs a seekable file, memory is not an option
+    try:
+        stored = await save_upload(
+            archive,
+            settings.BULK_UPLOAD_DIR,
+            f"{uuid.uuid4()}.zip",
+            settings.BULK_MAX_ARCHIVE_BYTES
+        )
+    except UploadTooLarge as e:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Archive exceeds the {e.limit // (1024 * 1024)} MB limit"
+        )
+    except Exception:
+        raise HTTPException(status_code=500, detail="Failed to save archive")
+
+    try:
+        names = await asyncio.to_thread(ingest.list_entries, stored.path)
+    except zipfile.BadZipFile:
+        await aiofiles.os.remove(stored.path)
+        raise HTTPException(status_code=400, detail="Archive is not a valid ZIP file")
+
+    if not names or len(names) > settings.BULK_MAX_ENTRIES:
+        await aiofiles.os.remove(stored.path)
+        raise HTTPException(
+            status_code=400,
+            detail=f"Archive must contain between 1 and {settings.BULK_MAX_ENTRIES} files"
+        )
+
+    batch_id = await ingest.create_batch(job_id, stored.path, len(names), roster_rows)
+    ingest.start_batch(batch_id, job, stored.path, names, roster_rows)
+
+    return {
+        "message": "Batch accepted. Resumes are being ingested.",
+        "batch_id": batch_id,
+        "entries": len(names),
+        "progress_url": f"/apply/batches/{batch_id}"
+    }
+
+
+@router.get("/batches/{batch_id}")
+async def get_batch_progress(batch_id: str):
+    if not ObjectId.is_valid(batch_id):
+        raise HTTPException(status_code=400, detail="Invalid batch ID format")
+
+    progress = await ingest.batch_progress(batch_id)
+    if progress is None:
+        raise HTTPException(status_code=404, detail="Batch not found")
+    return progress
@@ -0,0 +1,89 @@
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from bson import ObjectId
+
+from ..db.mongo import db
+from ..core import events
+from ..ai.dispatch import evaluation_status
+
+router = APIRouter(prefix="/events", tags=["Events"])
+
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    # Keep reverse proxies from buffering the stream
+    "X-Accel-Buffering": "no"
+}
+
+# ---------- Helpers ----------
+
+async def job_snapshot(job_id: str) -> dict:
+    counts = {status: 0 for status in ("pending", "processing", "completed", "failed")}
+    async for row in db.ai_queue.aggregate([
+        {"$match": {"job_id": job_id}},
+        {"$group": {"_id": "$status", "n": {"$sum": 1}}}
+    ]):
+        counts[row["_id"]] = row["n"]
+    return {"id": 0, "type": "snapshot", "job_id": job_id, "evaluations": counts}
+
+
+def stream(request: Request, snapshot: dict, subscription: events.Subscription) -> StreamingResponse:
+    """Current state first, then live events until the client goes away"""
+    async def body():
+        try:
+            yield events.format_sse(snapshot)
+            async for event in subscription:
+                if event is None:
+                    if await request.is_disconnected():
+                        break
+                    yield ": keep-alive\n\n"
+                else:
+                    yield events.format_sse(event)
+        finally:
+            subscription.close()
+
+    return StreamingResponse(body(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+
+# ---------- Routes ----------
+
+@router.get("/applicants/{applicant_id}")
+async def applicant_events(applicant_id: str, request: Request):
+    """Server-sent status and evaluation events for one applicant"""
+    if not ObjectId.is_valid(applicant_id):
+        raise HTTPException(status_code=400, detail="Invalid applicant ID format")
+
+    applicant = await db.applicants.find_one({"_id": ObjectId(applicant_id)}, {"job_id": 1})
+    if not applicant:
+        raise HTTPException(status_code=404, detail="Applicant not found")
+
+    # Subscribe before taking the snapshot so no transition falls in between
+    subscription = events.Subscription(events.applicant_topic(applicant_id))
+    try:
+        status = await evaluation_status(applicant_id, applicant["job_id"])
+    except BaseException:
+        subscription.close()
+        raise
+    snapshot = {"id": 0, "type": "snapshot", "applicant_id": applicant_id, "job_id": applicant["job_id"], **status}
+    return stream(request, snapshot, subscription)
+
+
+@router.get("/jobs/{job_id}")
+async def job_events(job_id: str, request: Request):
+    """
+    Server-sent events for every applicant of a job: queue status changes
+    and each finished evaluation's score, for live dashboards.
+    """
+    if not ObjectId.is_valid(job_id):
+        raise HTTPException(status_code=400, detail="Invalid job ID format")
+
+    job = await db.jobs.find_one({"_id": ObjectId(job_id)}, {"_id": 1})
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    subscription = events.Subscription(events.job_topic(job_id))
+    try:
+        snapshot = await job_snapshot(job_id)
+    except BaseException:
+        subscription.close()
+        raise
+    return stream(request, snapshot, subscription)
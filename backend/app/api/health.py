@@ -1,7 +1,7 @@
 from fastapi import APIRouter, HTTPException
 from ..db.mongo import db
+from ..db.counters import estimated_count, queue_counts
 from ..core.config import settings
-import asyncio
 
 router = APIRouter(prefix="/health", tags=["Health"])
 
@@ -17,9 +17,9 @@ async def database_health():
         # Test database connection
         await db.command("ping")
         
-        # Get collection stats
-        jobs_count = await db.jobs.count_documents({})
-        applicants_count = await db.applicants.count_documents({})
+        # Collection sizes from metadata, not scans (cached briefly)
+        jobs_count = await estimated_count("jobs")
+        applicants_count = await estimated_count("applicants")
         
         return {
             "status": "healthy",
@@ -40,16 +40,15 @@ async def ai_services_health():
         if not settings.GEMINI_API_KEY:
             raise Exception("Gemini API key not configured")
         
-        # Check AI queue status
-        pending_jobs = await db.ai_queue.count_documents({"status": "pending"})
-        processing_jobs = await db.ai_queue.count_documents({"status": "processing"})
+        # Check AI queue status from the maintained counters
+        counts = await queue_counts()
         
         return {
             "status": "healthy",
             "gemini_api": "configured",
             "ai_queue": {
-                "pending": pending_jobs,
-                "processing": processing_jobs
+                "pending": counts["pending"],
+                "processing": counts["processing"]
             }
         }
     except Exception as e:
@@ -1,8 +1,17 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel, Field
-from typing import List
+from typing import Dict, List, Optional, Tuple, Union
 from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from bson import ObjectId
+from bson.errors import InvalidId
+import base64
+import hashlib
+import json
+import time
 from ..db.mongo import db
+from ..core.config import settings
 
 router = APIRouter(prefix="/jobs", tags=["Jobs"])
 
@@ -13,11 +22,123 @@ class JobCreate(BaseModel):
     description: str = Field(min_length=1)
     required_skills: List[str] = Field(min_items=1)
     experience_level: str = Field(min_length=1)
+    # Recruiter-flagged: evaluated ahead of other jobs (see ai.admission)
+    priority: bool = False
 
 class JobResponse(JobCreate):
     id: str
     created_at: datetime
 
+class JobSummary(BaseModel):
+    id: str
+    title: str
+    required_skills: List[str]
+    experience_level: str
+    created_at: datetime
+
+# ---------- List cache ----------
+# Rendered list pages keyed by query. Cleared whenever this process
+# creates a job; the TTL bounds staleness for jobs created elsewhere.
+
+LIST_FIELDS = {"title": 1, "required_skills": 1, "experience_level": 1, "created_at": 1}
+
+_list_cache: Dict[tuple, Tuple[float, dict]] = {}
+
+
+def invalidate_list_cache():
+    _list_cache.clear()
+
+
+def _cache_get(key: tuple) -> Optional[dict]:
+    entry = _list_cache.get(key)
+    if entry is None or entry[0] < time.monotonic():
+        return None
+    return entry[1]
+
+
+def _cache_put(key: tuple, page: dict):
+    if len(_list_cache) >= settings.JOBS_LIST_CACHE_SIZE:
+        _list_cache.clear()
+    _list_cache[key] = (time.monotonic() + settings.JOBS_LIST_CACHE_TTL_SECONDS, page)
+
+
+def encode_cursor(created_at: datetime, job_id: ObjectId) -> str:
+    raw = f"{created_at.isoformat()}|{job_id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, ObjectId]:
+    created_at, job_id = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8").split("|")
+    return datetime.fromisoformat(created_at), ObjectId(job_id)
+
+
+def _as_utc(value: datetime) -> datetime:
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+async def render_page(limit: int, cursor: Optional[str], offset: int, summary: bool) -> dict:
+    query = {}
+    if cursor:
+        created_at, job_id = decode_cursor(cursor)
+        query["$or"] = [
+            {"created_at": {"$lt": created_at}},
+            {"created_at": created_at, "_id": {"$lt": job_id}}
+        ]
+
+    projection = dict(LIST_FIELDS)
+    if not summary:
+        projection["description"] = 1
+        projection["priority"] = 1
+
+    find = db.jobs.find(query, projection).sort([("created_at", -1), ("_id", -1)])
+    if offset and not cursor:
+        # Deprecated: linear in offset, kept for existing clients
+        find = find.skip(offset)
+    docs = [job async for job in find.limit(limit + 1)]
+
+    next_cursor = None
+    if len(docs) > limit:
+        docs = docs[:limit]
+        next_cursor = encode_cursor(docs[-1]["created_at"], docs[-1]["_id"])
+
+    jobs = []
+    for job in docs:
+        item = {
+            "id": str(job["_id"]),
+            "title": job["title"],
+            "required_skills": job["required_skills"],
+            "experience_level": job["experience_level"],
+            "created_at": job["created_at"]
+        }
+        if not summary:
+            item["description"] = job["description"]
+            item["priority"] = job.get("priority", False)
+        jobs.append(item)
+
+    body = json.dumps(jsonable_encoder(jobs), separators=(",", ":")).encode("utf-8")
+    last_modified = max((_as_utc(job["created_at"]) for job in docs), default=None)
+
+    return {
+        "body": body,
+        "etag": f'"{hashlib.sha1(body).hexdigest()}"',
+        "last_modified": format_datetime(last_modified, usegmt=True) if last_modified else None,
+        "next_cursor": next_cursor
+    }
+
+
+def _not_modified(request: Request, page: dict) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        return page["etag"] in [tag.strip() for tag in if_none_match.split(",")] or if_none_match.strip() == "*"
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and page["last_modified"]:
+        try:
+            return parsedate_to_datetime(page["last_modified"]) <= parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+    return False
+
 # ---------- Routes ----------
 
 @router.post("/", response_model=JobResponse)
@@ -28,6 +149,7 @@ async def create_job(job: JobCreate):
     }
 
     result = await db.jobs.insert_one(job_doc)
+    invalidate_list_cache()
 
     return {
         "id": str(result.inserted_id),
@@ -35,20 +157,37 @@ async def create_job(job: JobCreate):
     }
 
 
-@router.get("/", response_model=List[JobResponse])
-async def list_jobs(limit: int = 100, offset: int = 0):
-    cursor = db.jobs.find().skip(offset).limit(limit)
-    
-    jobs = [
-        {
-            "id": str(job["_id"]),
-            "title": job["title"],
-            "description": job["description"],
-            "required_skills": job["required_skills"],
-            "experience_level": job["experience_level"],
-            "created_at": job["created_at"]
-        }
-        async for job in cursor
-    ]
+@router.get("/", response_model=List[Union[JobResponse, JobSummary]])
+async def list_jobs(
+    request: Request,
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = None,
+    summary: bool = False,
+    offset: int = Query(0, ge=0, deprecated=True)
+):
+    """
+    Newest jobs first. Pass the X-Next-Cursor header value back as
+    `cursor` for the next page; `summary=true` omits descriptions.
+    Supports If-None-Match and If-Modified-Since.
+    """
+    key = (limit, cursor, summary, offset)
+    page = _cache_get(key)
+    if page is None:
+        try:
+            page = await render_page(limit, cursor, offset, summary)
+        except (ValueError, InvalidId):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        _cache_put(key, page)
+
+    headers = {"ETag": page["etag"], "Cache-Control": "no-cache"}
+    if page["last_modified"]:
+        headers["Last-Modified"] = page["last_modified"]
+    if page["next_cursor"]:
+        headers["X-Next-Cursor"] = page["next_cursor"]
+        next_url = request.url.include_query_params(cursor=page["next_cursor"])
+        headers["Link"] = f'<{next_url}>; rel="next"'
+
+    if _not_modified(request, page):
+        return Response(status_code=304, headers=headers)
 
-    return jobs
+    return Response(content=page["body"], media_type="application/json", headers=headers)
@@ -0,0 +1,368 @@
+"""
+Content-addressed resume storage.
+
+Resumes are stored once per distinct content under their sha256, fanned
+out into sharded subdirectories so no single directory grows without
+bound:
+
+    <root>/ab/cd/abcd1234...        (BLOB_SHARD_DEPTH=2)
+    <root>/ab/cd/abcd1234....gz     (gzip at rest, see BLOB_COMPRESSION)
+
+Uploads are staged in <root>/.staging by save_upload and handed to put(),
+which deduplicates them. A `blobs` document per digest counts the
+applicants referring to it; release() drops a reference and gc() deletes
+blobs that have been unreferenced for BLOB_GC_GRACE_SECONDS. gc() first
+recounts the references from the applicants themselves, so a count leaked
+by a crash between put() and the applicant insert is corrected.
+
+The read side (open_blob, blob_size, read_blob_head) touches no database
+and is safe to call from the extraction pool: uncompressed blobs are
+memory-mapped, so extractors read straight from the page cache instead of
+copying the file into the process.
+"""
+import asyncio
+import gzip
+import io
+import mmap
+import os
+import shutil
+import struct
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from pymongo import ReturnDocument
+
+from .config import settings
+from .metrics import registry
+
+STAGING_DIR = ".staging"
+COMPRESSED_SUFFIX = ".gz"
+SHARD_WIDTH = 2
+RECONCILE_CHUNK = 500
+
+blob_writes = registry.counter(
+    "blob_store_writes_total",
+    "Resume blobs written (stored) or found already present (deduplicated)"
+)
+blob_collected = registry.counter(
+    "blob_store_collected_total",
+    "Unreferenced resume blobs deleted by garbage collection"
+)
+
+
+# ---------- Read path (no database; safe in the extraction pool) ----------
+
+class MappedFile(mmap.mmap):
+    """mmap with the file-object method zipfile expects (built in from 3.13)"""
+
+    def seekable(self) -> bool:
+        return True
+
+
+def is_compressed(path: str) -> bool:
+    return path.endswith(COMPRESSED_SUFFIX)
+
+
+@contextmanager
+def open_blob(path: str):
+    """
+    Yield a seekable, file-like view of a blob's content.
+
+    Plain files (blobs and legacy uploads alike) are mapped copy-on-write,
+    which also lets C libraries borrow the mapping as a writable buffer
+    without a copy. Compressed blobs are inflated into memory.
+    """
+    if is_compressed(path):
+        with gzip.open(path, "rb") as f:
+            yield io.BytesIO(f.read())
+        return
+
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            # Empty files can't be mapped
+            yield io.BytesIO(b"")
+            return
+        view = MappedFile(f.fileno(), 0, access=mmap.ACCESS_COPY)
+        try:
+            yield view
+        finally:
+            try:
+                view.close()
+            except BufferError:
+                # Still exported to a caller; unmapped once that is collected
+                pass
+
+
+def blob_size(path: str) -> int:
+    """Size of the content, not of the file holding it"""
+    if not is_compressed(path):
+        return os.path.getsize(path)
+    # gzip trailer: uncompressed size mod 2**32, ample for a resume
+    with open(path, "rb") as f:
+        f.seek(-4, os.SEEK_END)
+        return struct.unpack("<I", f.read(4))[0]
+
+
+def read_blob_head(path: str, size: int) -> bytes:
+    opener = gzip.open if is_compressed(path) else open
+    with opener(path, "rb") as f:
+        return f.read(size)
+
+
+# ---------- Local filesystem backend ----------
+
+class LocalBlobStore:
+    def __init__(self, root: str, compression: str = "none", shard_depth: int = 2):
+        if compression not in ("none", "gzip"):
+            raise ValueError(f"Unknown blob compression: {compression}")
+        self.root = root
+        self.compression = compression
+        self.shard_depth = shard_depth
+
+    @property
+    def staging_dir(self) -> str:
+        return os.path.join(self.root, STAGING_DIR)
+
+    def path_for(self, digest: str, compressed: bool = False) -> str:
+        shards = [digest[i * SHARD_WIDTH:(i + 1) * SHARD_WIDTH] for i in range(self.shard_depth)]
+        name = digest + (COMPRESSED_SUFFIX if compressed else "")
+        return os.path.join(self.root, *shards, name)
+
+    def _on_disk(self, digest: str) -> Optional[str]:
+        for compressed in (False, True):
+            path = self.path_for(digest, compressed)
+            if os.path.exists(path):
+                return path
+        return None
+
+    def _place(self, staged_path: str, digest: str) -> str:
+        """Move a staged upload into the store, compressing it when that pays off"""
+        final_path = self.path_for(digest)
+        os.makedirs(os.path.dirname(final_path), exist_ok=True)
+
+        if self.compression == "gzip":
+            packed_path = f"{staged_path}{COMPRESSED_SUFFIX}"
+            with open(staged_path, "rb") as source, open(packed_path, "wb") as raw:
+                # mtime=0 keeps the output identical for identical content
+                with gzip.GzipFile(
+                    fileobj=raw, mode="wb", compresslevel=settings.BLOB_COMPRESSION_LEVEL, mtime=0
+                ) as out:
+                    shutil.copyfileobj(source, out, settings.UPLOAD_CHUNK_SIZE)
+            saving = 1 - os.path.getsize(packed_path) / max(os.path.getsize(staged_path), 1)
+            if saving >= settings.BLOB_COMPRESS_MIN_SAVING:
+                os.remove(staged_path)
+                staged_path, final_path = packed_path, self.path_for(digest, compressed=True)
+            else:
+                # PDFs and DOCX are mostly compressed already
+                os.remove(packed_path)
+
+        os.replace(staged_path, final_path)
+        return final_path
+
+    # ---------- References ----------
+
+    async def put(self, staged_path: str, digest: str, size: int) -> str:
+        """
+        Add a reference to the blob for a staged upload and return its path.
+
+        The staged file is consumed: moved into place for new content,
+        deleted when the content is already stored.
+        """
+        from ..db.mongo import db
+
+        # Take the reference first, so a concurrent gc() backs off
+        before = await db.blobs.find_one_and_update(
+            {"_id": digest},
+            {
+                "$inc": {"refs": 1},
+                "$set": {"referenced_at": datetime.now(timezone.utc)},
+                "$unset": {"orphaned_at": "", "collecting": ""},
+                "$setOnInsert": {"size": size, "created_at": datetime.now(timezone.utc)}
+            },
+            upsert=True,
+            return_document=ReturnDocument.BEFORE
+        )
+        try:
+            return await self._store(staged_path, digest, before)
+        except Exception:
+            await self.release(digest)
+            raise
+
+    async def _store(self, staged_path: str, digest: str, before: Optional[dict]) -> str:
+        from ..db.mongo import db
+
+        existing = before.get("path") if before else await asyncio.to_thread(self._on_disk, digest)
+        collecting = bool(before and before.get("collecting"))
+        if existing and not collecting and await asyncio.to_thread(os.path.exists, existing):
+            await asyncio.to_thread(os.remove, staged_path)
+            blob_writes.inc(outcome="deduplicated")
+            return existing
+
+        path = await asyncio.to_thread(self._place, staged_path, digest)
+        await db.blobs.update_one(
+            {"_id": digest},
+            {"$set": {
+                "path": path,
+                "compression": "gzip" if is_compressed(path) else "none",
+                "stored_size": os.path.getsize(path)
+            }}
+        )
+        blob_writes.inc(outcome="stored")
+        return path
+
+    async def release(self, digest: str, count: int = 1):
+        """Drop references; the blob becomes collectable once none are left"""
+        from ..db.mongo import db
+
+        after = await db.blobs.find_one_and_update(
+            {"_id": digest},
+            {"$inc": {"refs": -count}},
+            return_document=ReturnDocument.AFTER
+        )
+        if after is not None and after["refs"] <= 0:
+            await db.blobs.update_one(
+                {"_id": digest, "refs": {"$lte": 0}},
+                {"$set": {"orphaned_at": datetime.now(timezone.utc)}}
+            )
+
+    # ---------- Garbage collection ----------
+
+    async def reconcile(self, cutoff: datetime) -> int:
+        """
+        Recount references from applicants.resume_sha256, correcting refs
+        leaked by a put() whose applicant was never created (a crash in
+        between) or held by applicants since deleted.
+
+        Blobs referenced after the cutoff are skipped: their applicant may
+        not be inserted yet. Updates are conditional on the refs read, so a
+        concurrent put() or release() is never overwritten.
+        """
+        from ..db.mongo import db
+
+        corrected = 0
+        query = {"$or": [
+            {"referenced_at": {"$lte": cutoff}},
+            {"referenced_at": {"$exists": False}, "created_at": {"$lte": cutoff}}
+        ]}
+        blobs = db.blobs.find(query, {"refs": 1, "orphaned_at": 1})
+        while True:
+            chunk = await blobs.to_list(RECONCILE_CHUNK)
+            if not chunk:
+                return corrected
+
+            actual = {blob["_id"]: 0 for blob in chunk}
+            async for row in db.applicants.aggregate([
+                {"$match": {"resume_sha256": {"$in": list(actual)}}},
+                {"$group": {"_id": "$resume_sha256", "n": {"$sum": 1}}}
+            ]):
+                actual[row["_id"]] = row["n"]
+
+            for blob in chunk:
+                refs = actual[blob["_id"]]
+                if blob.get("refs") == refs:
+                    continue
+                update = {"$set": {"refs": refs}}
+                if refs > 0:
+                    update["$unset"] = {"orphaned_at": ""}
+                elif not blob.get("orphaned_at"):
+                    update["$set"]["orphaned_at"] = datetime.now(timezone.utc)
+                fixed = await db.blobs.update_one(
+                    {"_id": blob["_id"], "refs": blob.get("refs"), "collecting": {"$exists": False}},
+                    update
+                )
+                corrected += fixed.modified_count
+
+    async def gc(self, grace_seconds: float = None) -> dict:
+        """
+        Reconcile reference counts, then delete blobs unreferenced for
+        longer than the grace period, and staged uploads abandoned for as
+        long.
+
+        Each blob is claimed and moved aside before its document is
+        deleted; if a put() takes a new reference in between, the delete
+        matches nothing and the file is put back.
+        """
+        from ..db.mongo import db
+
+        grace_seconds = settings.BLOB_GC_GRACE_SECONDS if grace_seconds is None else grace_seconds
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=grace_seconds)
+        reconciled = await self.reconcile(cutoff)
+        collected = freed = 0
+
+        async for blob in db.blobs.find({"refs": {"$lte": 0}, "orphaned_at": {"$lte": cutoff}}):
+            claimed = await db.blobs.update_one(
+                {"_id": blob["_id"], "refs": {"$lte": 0}, "collecting": {"$exists": False}},
+                {"$set": {"collecting": True}}
+            )
+            if not claimed.modified_count:
+                continue
+
+            path = blob.get("path") or await asyncio.to_thread(self._on_disk, blob["_id"])
+            trash_path = f"{path}.{uuid.uuid4().hex}.trash" if path else None
+            if path:
+                try:
+                    await asyncio.to_thread(os.replace, path, trash_path)
+                except FileNotFoundError:
+                    trash_path = None
+
+            deleted = await db.blobs.delete_one({"_id": blob["_id"], "refs": {"$lte": 0}, "collecting": True})
+            if deleted.deleted_count:
+                collected += 1
+                blob_collected.inc()
+                if trash_path:
+                    await asyncio.to_thread(os.remove, trash_path)
+                    freed += blob.get("stored_size", 0)
+            elif trash_path:
+                await asyncio.to_thread(self._restore, trash_path, path)
+
+        staged = await asyncio.to_thread(self._sweep_staging, time.time() - grace_seconds)
+        return {
+            "reconciled": reconciled,
+            "collected": collected,
+            "bytes_freed": freed,
+            "staged_removed": staged
+        }
+
+    def _restore(self, trash_path: str, path: str):
+        if os.path.exists(path):
+            # Re-uploaded meanwhile and already put back by put()
+            os.remove(trash_path)
+        else:
+            os.replace(trash_path, path)
+
+    def _sweep_staging(self, older_than: float) -> int:
+        removed = 0
+        try:
+            entries = list(os.scandir(self.staging_dir))
+        except FileNotFoundError:
+            return 0
+        for entry in entries:
+            try:
+                if entry.is_file() and entry.stat().st_mtime < older_than:
+                    os.remove(entry.path)
+                    removed += 1
+            except FileNotFoundError:
+                pass
+        return removed
+
+
+BACKENDS = {"local": LocalBlobStore}
+
+_store = None
+
+
+def get_blob_store() -> LocalBlobStore:
+    global _store
+    if _store is None:
+        backend = BACKENDS.get(settings.BLOB_BACKEND)
+        if backend is None:
+            raise ValueError(f"Unknown blob store backend: {settings.BLOB_BACKEND}")
+        _store = backend(
+            settings.RESUME_UPLOAD_DIR,
+            compression=settings.BLOB_COMPRESSION,
+            shard_depth=settings.BLOB_SHARD_DEPTH
+        )
+    return _store
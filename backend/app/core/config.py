@@ -1,11 +1,141 @@
+from typing import Optional
+
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
     MONGODB_URI: str = "mongodb://localhost:27017"
     MONGODB_DB: str = "ai_hiring"
+    # Mongo client connection pool
+    MONGO_MAX_POOL_SIZE: int = 100
+    MONGO_MIN_POOL_SIZE: int = 0
+    MONGO_MAX_CONNECTING: int = 2
+    MONGO_MAX_IDLE_TIME_MS: Optional[int] = None
+    # Write-behind buffer for evaluation, leaderboard and queue status writes
+    WRITE_BEHIND_MAX_OPS: int = 200
+    WRITE_BEHIND_MAX_DELAY_MS: int = 100
+    WRITE_BEHIND_W: str = "1"  # e.g. "1" or "majority"
+    WRITE_BEHIND_JOURNAL: bool = False
     GEMINI_API_KEY: str
     GITHUB_TOKEN: str
     RESUME_UPLOAD_DIR: str = "uploads/resumes"
+    MAX_RESUME_BYTES: int = 10 * 1024 * 1024
+    UPLOAD_CHUNK_SIZE: int = 256 * 1024
+    # Content-addressed resume storage under RESUME_UPLOAD_DIR (see core.blobstore)
+    BLOB_BACKEND: str = "local"
+    BLOB_SHARD_DEPTH: int = 2
+    BLOB_COMPRESSION: str = "none"  # "none" or "gzip"
+    BLOB_COMPRESSION_LEVEL: int = 6
+    # Keep the gzip copy only when it is at least this much smaller
+    BLOB_COMPRESS_MIN_SAVING: float = 0.1
+    BLOB_GC_GRACE_SECONDS: int = 3600
+    BLOB_GC_INTERVAL_SECONDS: int = 3600  # 0 disables the worker's periodic gc
+
+    # Resume text extraction
+    EXTRACTION_WORKERS: int = 2
+    EXTRACTION_PAGES_PER_TASK: int = 8
+    RESUME_MAX_PAGES: int = 40
+    RESUME_MAX_CHARS: int = 60000
+    RESUME_PREPROCESS_ENABLED: bool = True
+    RESUME_TOKEN_BUDGET: int = 3000
+    # Per-format size guard and wall-clock timeout
+    EXTRACT_PDF_MAX_BYTES: int = 20 * 1024 * 1024
+    EXTRACT_PDF_TIMEOUT_SECONDS: float = 60
+    EXTRACT_DOCX_MAX_BYTES: int = 10 * 1024 * 1024
+    EXTRACT_DOCX_MAX_XML_BYTES: int = 50 * 1024 * 1024
+    EXTRACT_DOCX_TIMEOUT_SECONDS: float = 20
+    EXTRACT_TEXT_MAX_BYTES: int = 1024 * 1024
+    EXTRACT_TEXT_TIMEOUT_SECONDS: float = 5
+    # Below this many characters the fast PDF text layer falls back to pdfplumber
+    PDF_FAST_MIN_CHARS: int = 200
+
+    # LLM
+    GEMINI_MODEL: str = "gemini-1.5-flash"
+    # Part of the parse cache key: bump when the prompt or preprocessing changes
+    RESUME_PROMPT_VERSION: str = "v3"
+    LLM_BACKEND: str = "gemini"  # "gemini" or "fake"
+    LLM_MAX_CONCURRENCY: int = 8
+    LLM_CACHE_TTL_SECONDS: int = 3600
+    LLM_CACHE_SIZE: int = 2048
+    LLM_FAKE_LATENCY_MS: int = 0
+    LLM_BATCH_MAX_CHARS: int = 120000
+
+    # Health / metrics
+    HEALTH_COUNT_TTL_SECONDS: int = 10
+    TRACING_ENABLED: bool = True
+    TRACE_SAMPLE_SIZE: int = 2048
+
+    # Job listing
+    JOBS_LIST_CACHE_TTL_SECONDS: int = 30
+    JOBS_LIST_CACHE_SIZE: int = 256
+
+    # Scoring
+    SKILL_SCORE_WEIGHT: float = 0.6
+    GITHUB_SCORE_WEIGHT: float = 0.4
+    STRONG_MATCH_THRESHOLD: int = 75
+    MODERATE_MATCH_THRESHOLD: int = 50
+    # Skill normalization (see ai.skills)
+    SKILL_NORMALIZATION_ENABLED: bool = True
+    # Cosine similarity of character n-grams for a fuzzy candidate; the edit
+    # distance check in ai.skills decides whether it is accepted
+    SKILL_FUZZY_THRESHOLD: float = 0.4
+    SKILL_FUZZY_MIN_CHARS: int = 4
+    SKILL_CACHE_SIZE: int = 50000
+
+    # Bump to re-evaluate applicants under a new pipeline
+    PIPELINE_VERSION: str = "1"
+
+    # GitHub
+    GITHUB_API_URL: str = "https://api.github.com"
+    GITHUB_MAX_REPOS: int = 100
+    GITHUB_CACHE_TTL_SECONDS: int = 3600
+    GITHUB_MAX_CONNECTIONS: int = 20
+    GITHUB_TIMEOUT_SECONDS: float = 10
+    GITHUB_RATE_LIMIT_MAX_WAIT_SECONDS: int = 60
+
+    # Process lifecycle
+    RUN_EMBEDDED_WORKER: bool = True  # run a QueueWorker inside each API process
+    SHUTDOWN_DRAIN_SECONDS: float = 30
+
+    # Evaluation progress events (SSE)
+    EVENTS_BACKEND: str = "local"  # "local", or "mongo" for standalone workers / several nodes
+    EVENTS_SUBSCRIBER_BUFFER: int = 256
+    EVENTS_KEEPALIVE_SECONDS: float = 15
+
+    # Bulk ingest (POST /apply/{job_id}/bulk)
+    BULK_UPLOAD_DIR: str = "uploads/batches"
+    BULK_MAX_ARCHIVE_BYTES: int = 500 * 1024 * 1024
+    BULK_MAX_ENTRIES: int = 2000
+    BULK_MAX_ROSTER_BYTES: int = 5 * 1024 * 1024
+    BULK_INSERT_BATCH_SIZE: int = 100
+    BULK_LEASE_SECONDS: int = 300
+    BULK_REAPER_INTERVAL_SECONDS: int = 60
+    BULK_MAX_ATTEMPTS: int = 3
+
+    # Admission control on POST /apply
+    ADMISSION_MAX_INFLIGHT: int = 8  # inline evaluations per API process
+    ADMISSION_MAX_INFLIGHT_PER_JOB: int = 4
+    ADMISSION_MAX_QUEUE_DEPTH: int = 5000  # pending + processing before 429
+    ADMISSION_MAX_QUEUE_DEPTH_PER_JOB: int = 1000
+    # Share of the global limits only priority jobs may use
+    ADMISSION_PRIORITY_RESERVE: float = 0.2
+    ADMISSION_RETRY_AFTER_SECONDS: int = 30
+    ADMISSION_DEPTH_TTL_SECONDS: float = 1
+
+    # Queue worker
+    DISPATCH_INLINE: bool = True  # start evaluations in the API process as well
+    QUEUE_BATCH_SIZE: int = 1  # > 1 enables batched resume extraction
+    QUEUE_BATCH_MAX_WAIT_MS: int = 500
+    QUEUE_CONCURRENCY: int = 4
+    QUEUE_LEASE_SECONDS: int = 120
+    QUEUE_HEARTBEAT_SECONDS: int = 30
+    QUEUE_REAPER_INTERVAL_SECONDS: int = 30
+    QUEUE_MAX_ATTEMPTS: int = 3
+    QUEUE_POLL_INTERVAL_SECONDS: float = 5
+    QUEUE_USE_CHANGE_STREAMS: bool = True
+
+    # Parsed resume cache
+    PARSE_CACHE_SIZE: int = 1024
+    PARSE_CACHE_TTL_DAYS: int = 30
     
     class Config:
         env_file = ".env"
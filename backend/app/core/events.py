@@ -0,0 +1,145 @@
+"""
+In-process pub/sub for evaluation progress, consumed by the SSE routes.
+
+Events are small dicts with a `type` ("status" or "evaluation"), an
+applicant_id and a job_id, and are delivered to subscribers of
+"applicant:<id>" and "job:<id>". publish() never blocks: each subscriber
+has a bounded buffer and a slow one loses its oldest events.
+
+Backends (EVENTS_BACKEND):
+
+- "local": publishers fan out directly. Enough when the queue worker
+  runs embedded in the API process.
+- "mongo": a relay watches ai_queue and evaluations with a change stream
+  and republishes what any node wrote, so standalone workers reach every
+  API process. Local fan-out is suspended while the relay is connected,
+  and resumes if the change stream is unavailable (needs a replica set).
+"""
+import asyncio
+import itertools
+import json
+from collections import defaultdict
+from typing import Dict, Optional, Set
+
+from .config import settings
+
+_subscribers: Dict[str, Set[asyncio.Queue]] = defaultdict(set)
+_ids = itertools.count(1)
+_relay_connected = False
+
+STATUS_FIELDS = ("status", "error")
+EVALUATION_FIELDS = ("final_score", "decision", "ai_summary")
+
+
+def applicant_topic(applicant_id: str) -> str:
+    return f"applicant:{applicant_id}"
+
+
+def job_topic(job_id: str) -> str:
+    return f"job:{job_id}"
+
+
+# ---------- Publishing ----------
+
+def _deliver(event: dict):
+    event = {"id": next(_ids), **event}
+    topics = (applicant_topic(event.get("applicant_id")), job_topic(event.get("job_id")))
+    for topic in topics:
+        for queue in list(_subscribers.get(topic, ())):
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(event)
+
+
+def publish(event_type: str, applicant_id: str, job_id: str, **fields):
+    """Announce a change; a no-op when nobody is listening"""
+    if _relay_connected:
+        # The change stream will deliver it, from whichever node wrote it
+        return
+    _deliver({"type": event_type, "applicant_id": applicant_id, "job_id": job_id, **fields})
+
+
+def publish_status(item: dict, status: str, **fields):
+    publish("status", item.get("applicant_id"), item.get("job_id"), status=status, **fields)
+
+
+# ---------- Subscribing ----------
+
+class Subscription:
+    """
+    Events for topics, buffered from the moment of construction.
+
+    Iterating yields None after EVENTS_KEEPALIVE_SECONDS of silence so the
+    caller can send a keep-alive and notice a client that has gone away.
+    """
+
+    def __init__(self, *topics: str):
+        self.topics = topics
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=settings.EVENTS_SUBSCRIBER_BUFFER)
+        for topic in topics:
+            _subscribers[topic].add(self.queue)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> Optional[dict]:
+        try:
+            return await asyncio.wait_for(self.queue.get(), settings.EVENTS_KEEPALIVE_SECONDS)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self):
+        for topic in self.topics:
+            _subscribers[topic].discard(self.queue)
+            if not _subscribers[topic]:
+                del _subscribers[topic]
+
+
+def format_sse(event: dict) -> str:
+    return f"id: {event['id']}\nevent: {event['type']}\ndata: {json.dumps(event, default=str)}\n\n"
+
+
+# ---------- Mongo change-stream relay ----------
+
+def _from_change(change: dict) -> Optional[dict]:
+    collection = change.get("ns", {}).get("coll")
+    doc = change.get("fullDocument") or {}
+    updated = change.get("updateDescription", {}).get("updatedFields")
+    base = {"applicant_id": doc.get("applicant_id"), "job_id": doc.get("job_id")}
+
+    if collection == "ai_queue":
+        if updated is not None and "status" not in updated:
+            return None  # heartbeats and lease renewals
+        return {"type": "status", **base, **{k: doc[k] for k in STATUS_FIELDS if k in doc}}
+
+    if collection == "evaluations":
+        if updated is not None and not any(k in updated for k in EVALUATION_FIELDS):
+            return None  # e.g. the trace being attached
+        return {"type": "evaluation", **base, **{k: doc.get(k) for k in EVALUATION_FIELDS}}
+    return None
+
+
+async def run_relay():
+    """
+    Republish ai_queue / evaluations changes from every node; runs until
+    cancelled, or returns (leaving local fan-out on) without a replica set.
+    """
+    global _relay_connected
+    from pymongo.errors import PyMongoError
+    from ..db.mongo import db
+
+    pipeline = [{"$match": {
+        "ns.coll": {"$in": ["ai_queue", "evaluations"]},
+        "operationType": {"$in": ["insert", "update", "replace"]}
+    }}]
+    try:
+        async with db.watch(pipeline, full_document="updateLookup") as stream:
+            _relay_connected = True
+            async for change in stream:
+                event = _from_change(change)
+                if event is not None:
+                    _deliver(event)
+    except PyMongoError as e:
+        print(f"Event change stream unavailable, publishing locally: {e}")
+    finally:
+        _relay_connected = False
@@ -0,0 +1,149 @@
+"""
+Lightweight evaluation tracing.
+
+A Trace is bound to the current evaluation through a context variable;
+graph nodes and external calls append compact spans to it (name, wall
+time in ms and a few attributes such as prompt size or cache hits).
+Every span also feeds a bounded in-process sample per name, from which
+admin endpoints report p50/p95.
+
+With TRACING_ENABLED off, `traced` returns the function unchanged and
+`span` hands back a no-op context manager, so the cost is one attribute
+check per call site.
+"""
+import functools
+import time
+from collections import deque
+from contextvars import ContextVar
+from typing import Deque, Dict, List, Optional
+
+from .config import settings
+
+_current: ContextVar[Optional["Trace"]] = ContextVar("current_trace", default=None)
+_samples: Dict[str, Deque[float]] = {}
+
+
+class Trace:
+    __slots__ = ("spans", "started")
+
+    def __init__(self):
+        self.spans: List[dict] = []
+        self.started = time.perf_counter()
+
+    def add(self, name: str, ms: float, attrs: dict):
+        entry = {"name": name, "ms": round(ms, 2)}
+        if attrs:
+            entry.update(attrs)
+        self.spans.append(entry)
+
+    def compact(self) -> dict:
+        return {
+            "total_ms": round((time.perf_counter() - self.started) * 1000, 2),
+            "spans": self.spans
+        }
+
+
+def start_trace() -> Optional[Trace]:
+    """Bind a new trace to the current context (and the tasks it spawns)"""
+    if not settings.TRACING_ENABLED:
+        return None
+    trace = Trace()
+    _current.set(trace)
+    return trace
+
+
+def current_trace() -> Optional[Trace]:
+    return _current.get()
+
+
+def record(name: str, ms: float, **attrs):
+    if not settings.TRACING_ENABLED:
+        return
+    samples = _samples.get(name)
+    if samples is None:
+        samples = _samples[name] = deque(maxlen=settings.TRACE_SAMPLE_SIZE)
+    samples.append(ms)
+
+    trace = _current.get()
+    if trace is not None:
+        trace.add(name, ms, attrs)
+
+
+class _Span:
+    __slots__ = ("name", "attrs", "started")
+
+    def __init__(self, name: str, attrs: dict):
+        self.name = name
+        self.attrs = attrs
+
+    def __enter__(self) -> dict:
+        self.started = time.perf_counter()
+        return self.attrs
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.attrs["error"] = exc_type.__name__
+        record(self.name, (time.perf_counter() - self.started) * 1000, **self.attrs)
+        return False
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self) -> dict:
+        return {}
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def span(name: str, **attrs):
+    """
+    Time a block: ``with span("llm.call") as attrs: attrs["cache_hit"] = True``.
+    Attributes set on the yielded dict are stored with the span.
+    """
+    if not settings.TRACING_ENABLED:
+        return _NULL_SPAN
+    return _Span(name, attrs)
+
+
+def traced(name: str):
+    """Decorator timing an async function (e.g. a graph node) as one span"""
+    def decorate(fn):
+        if not settings.TRACING_ENABLED:
+            return fn
+
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            with _Span(name, {}):
+                return await fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def _percentile(ordered: List[float], q: float) -> float:
+    index = min(len(ordered) - 1, max(0, int(round(q * (len(ordered) - 1)))))
+    return round(ordered[index], 2)
+
+
+def summary() -> Dict[str, dict]:
+    """p50/p95/max per span name over the recent in-process samples"""
+    result = {}
+    for name, samples in sorted(_samples.items()):
+        ordered = sorted(samples)
+        if not ordered:
+            continue
+        result[name] = {
+            "count": len(ordered),
+            "p50_ms": _percentile(ordered, 0.50),
+            "p95_ms": _percentile(ordered, 0.95),
+            "max_ms": round(ordered[-1], 2)
+        }
+    return result
+
+
+def reset():
+    _samples.clear()
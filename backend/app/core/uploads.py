@@ -0,0 +1,81 @@
+"""
+Streaming upload storage.
+
+Uploads are copied in UPLOAD_CHUNK_SIZE chunks to a temp file next to
+their destination with non-blocking file I/O, hashed on the fly, and
+atomically renamed into place once complete. Nothing larger than one
+chunk is ever held in memory, and oversized uploads are aborted as soon
+as they cross MAX_RESUME_BYTES.
+"""
+import hashlib
+import os
+import uuid
+from dataclasses import dataclass
+
+import aiofiles
+import aiofiles.os
+from fastapi import UploadFile
+
+from .config import settings
+
+
+# Leading bytes kept for format sniffing
+HEAD_BYTES = 1024
+
+
+class UploadTooLarge(Exception):
+    def __init__(self, limit: int):
+        self.limit = limit
+        super().__init__(f"Upload exceeds {limit} bytes")
+
+
+@dataclass
+class StoredUpload:
+    path: str
+    sha256: str
+    size: int
+    head: bytes = b""
+
+
+async def save_upload(
+    upload: UploadFile,
+    dest_dir: str,
+    file_name: str,
+    max_bytes: int = None
+) -> StoredUpload:
+    max_bytes = max_bytes or settings.MAX_RESUME_BYTES
+
+    # Cheap early reject when the client declared the size
+    if upload.size is not None and upload.size > max_bytes:
+        raise UploadTooLarge(max_bytes)
+
+    await aiofiles.os.makedirs(dest_dir, exist_ok=True)
+    final_path = os.path.join(dest_dir, file_name)
+    temp_path = os.path.join(dest_dir, f".{uuid.uuid4().hex}.part")
+
+    digest = hashlib.sha256()
+    size = 0
+    head = b""
+    try:
+        async with aiofiles.open(temp_path, "wb") as out:
+            while True:
+                chunk = await upload.read(settings.UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLarge(max_bytes)
+                if len(head) < HEAD_BYTES:
+                    head += chunk[:HEAD_BYTES - len(head)]
+                digest.update(chunk)
+                await out.write(chunk)
+
+        await aiofiles.os.replace(temp_path, final_path)
+    except BaseException:
+        try:
+            await aiofiles.os.remove(temp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+    return StoredUpload(path=final_path, sha256=digest.hexdigest(), size=size, head=head)
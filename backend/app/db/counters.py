@@ -0,0 +1,66 @@
+"""
+Maintained collection counters.
+
+ai_queue status counts live in a single ``counters`` document that is
+updated with $inc at insert and status-transition time (see ai.queue),
+so health checks and metrics read one document instead of scanning.
+Transitions go through the write-behind buffer and are coalesced into one
+$inc per flush; only increments that add outstanding work (new pending
+rows) are written at once, so admission never undercounts the queue.
+Whole-collection sizes use estimated_document_count behind a short TTL.
+"""
+import time
+from typing import Dict, Tuple
+
+from ..core.config import settings
+from .mongo import db
+from .write_behind import write_behind
+
+QUEUE_COUNTERS_ID = "ai_queue"
+QUEUE_STATUSES = ("pending", "processing", "completed", "failed")
+
+_estimates: Dict[str, Tuple[float, int]] = {}
+
+
+async def record_transition(
+    from_status: str = None,
+    to_status: str = None,
+    count: int = 1,
+    wait: bool = False
+):
+    """Buffer a counter change; wait=True writes it before returning"""
+    if count <= 0:
+        return
+    inc = {}
+    if from_status:
+        inc[from_status] = -count
+    if to_status:
+        inc[to_status] = inc.get(to_status, 0) + count
+    if wait:
+        await db.counters.update_one({"_id": QUEUE_COUNTERS_ID}, {"$inc": inc}, upsert=True)
+    else:
+        await write_behind.update_one("counters", {"_id": QUEUE_COUNTERS_ID}, {"$inc": inc}, upsert=True)
+
+
+async def queue_counts() -> Dict[str, int]:
+    doc = await db.counters.find_one({"_id": QUEUE_COUNTERS_ID}) or {}
+    return {status: max(0, int(doc.get(status, 0))) for status in QUEUE_STATUSES}
+
+
+async def recount_queue() -> Dict[str, int]:
+    """Rebuild the queue counters from a full scan; run from init_db, not per request"""
+    counts = {status: 0 for status in QUEUE_STATUSES}
+    async for row in db.ai_queue.aggregate([{"$group": {"_id": "$status", "n": {"$sum": 1}}}]):
+        if row["_id"] in counts:
+            counts[row["_id"]] = row["n"]
+    await db.counters.update_one({"_id": QUEUE_COUNTERS_ID}, {"$set": counts}, upsert=True)
+    return counts
+
+
+async def estimated_count(collection: str) -> int:
+    cached = _estimates.get(collection)
+    if cached and cached[0] > time.monotonic():
+        return cached[1]
+    count = await db[collection].estimated_document_count()
+    _estimates[collection] = (time.monotonic() + settings.HEALTH_COUNT_TTL_SECONDS, count)
+    return count
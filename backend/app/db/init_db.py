@@ -3,7 +3,75 @@ Database initialization and health check
 """
 import asyncio
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo.errors import DuplicateKeyError, OperationFailure
 from app.core.config import settings
+from app.db.counters import recount_queue
+
+# ---------- One-time migrations (idempotent) ----------
+
+async def normalize_applicant_emails(db) -> int:
+    """Lowercase and trim emails stored before POST /apply normalised them"""
+    fixed = 0
+    async for applicant in db.applicants.find({"email": {"$regex": r"[A-Z]|^\s|\s$"}}, {"email": 1}):
+        await db.applicants.update_one(
+            {"_id": applicant["_id"]},
+            {"$set": {"email": applicant["email"].strip().lower()}}
+        )
+        fixed += 1
+    return fixed
+
+
+async def set_aside_duplicate_applicants(db) -> int:
+    """
+    Repeat applications from before (job_id, email) was unique: the first
+    keeps the email, later ones keep theirs under duplicate_email (out of
+    the unique index) with duplicate_of pointing at the first. Nothing is
+    deleted.
+    """
+    moved = 0
+    async for group in db.applicants.aggregate([
+        {"$match": {"email": {"$type": "string"}}},
+        {"$sort": {"created_at": 1, "_id": 1}},
+        {"$group": {"_id": {"job_id": "$job_id", "email": "$email"}, "ids": {"$push": "$_id"}}},
+        {"$match": {"ids.1": {"$exists": True}}}
+    ]):
+        first, *rest = group["ids"]
+        print(f"⚠️  {len(rest)} repeat application(s) for job {group['_id']['job_id']} set aside, kept {first}")
+        for applicant_id in rest:
+            await db.applicants.update_one(
+                {"_id": applicant_id},
+                {
+                    "$set": {"duplicate_email": group["_id"]["email"], "duplicate_of": first},
+                    "$unset": {"email": ""}
+                }
+            )
+            moved += 1
+    return moved
+
+
+async def backfill_idempotency_keys(collection) -> int:
+    """
+    Key ai_queue rows and evaluations from before idempotency keys, so a
+    resubmission finds them instead of starting a fresh evaluation. Of
+    several rows for one applicant the newest gets the key.
+    """
+    from app.ai.dispatch import idempotency_key
+
+    filled = 0
+    async for row in collection.find(
+        {"idempotency_key": {"$exists": False}}, {"applicant_id": 1, "job_id": 1}
+    ).sort("created_at", -1):
+        try:
+            result = await collection.update_one(
+                {"_id": row["_id"], "idempotency_key": {"$exists": False}},
+                {"$set": {"idempotency_key": idempotency_key(row["applicant_id"], row["job_id"])}}
+            )
+            filled += result.modified_count
+        except DuplicateKeyError:
+            # An older repeat of a row that already has the key
+            pass
+    return filled
+
 
 async def init_database():
     """Initialize database collections and indexes"""
@@ -16,12 +84,45 @@ async def init_database():
         print("✅ MongoDB connection successful")
         
         # Create indexes for better performance
-        await db.jobs.create_index("created_at")
+        # Keyset paging in GET /jobs sorts and seeks on (created_at, _id)
+        await db.jobs.create_index([("created_at", -1), ("_id", -1)])
         await db.applicants.create_index([("job_id", 1), ("created_at", -1)])
         await db.evaluations.create_index("applicant_id")
-        await db.ai_queue.create_index([("status", 1), ("created_at", 1)])
+        await db.evaluations.create_index("job_id")
+        await db.evaluations.create_index("idempotency_key", unique=True, sparse=True)
+        await db.ai_queue.create_index([("status", 1), ("priority", -1), ("created_at", 1)])
+        await db.ai_queue.create_index([("job_id", 1), ("status", 1)])
+        await db.ai_queue.create_index([("status", 1), ("lease_expires_at", 1)])
+        await db.ai_queue.create_index("idempotency_key", unique=True, sparse=True)
+        for collection in (db.ai_queue, db.evaluations):
+            filled = await backfill_idempotency_keys(collection)
+            print(f"📊 Idempotency keys backfilled in {collection.name}: {filled}")
+        await db.ai_queue.create_index([("batch_id", 1), ("status", 1)], sparse=True)
+        await db.ingest_batches.create_index([("status", 1), ("lease_expires_at", 1)])
+        # One applicant per email and job; bulk entries without an email are exempt
+        try:
+            await db.applicants.drop_index("job_id_1_email_1")  # the old non-unique index
+        except OperationFailure:
+            pass
+        print(f"📊 Applicant emails normalised: {await normalize_applicant_emails(db)}")
+        print(f"📊 Repeat applications set aside: {await set_aside_duplicate_applicants(db)}")
+        await db.applicants.create_index(
+            [("job_id", 1), ("email", 1)],
+            name="job_id_1_email_1_unique",
+            unique=True,
+            partialFilterExpression={"email": {"$type": "string"}}
+        )
+        await db.applicants.create_index("resume_sha256")
+        await db.leaderboard.create_index([("job_id", 1), ("final_score", -1), ("_id", 1)])
+        await db.blobs.create_index([("refs", 1), ("orphaned_at", 1)])
+        await db.parse_cache.create_index("version")
+        await db.parse_cache.create_index("expires_at", expireAfterSeconds=0)
         
         print("✅ Database indexes created")
+
+        # Seed the maintained queue counters from the current data
+        counts = await recount_queue()
+        print(f"📊 Queue counters: {counts}")
         
         # Check collections
         collections = await db.list_collection_names()
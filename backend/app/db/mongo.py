@@ -1,5 +1,18 @@
 from motor.motor_asyncio import AsyncIOMotorClient
 from ..core.config import settings
 
-client = AsyncIOMotorClient(settings.MONGODB_URI)
+if settings.MONGODB_URI.startswith("mongomock://"):
+    # In-process stand-in for benchmarks and offline runs (bench/requirements.txt)
+    from mongomock_motor import AsyncMongoMockClient
+
+    client = AsyncMongoMockClient()
+else:
+    client = AsyncIOMotorClient(
+        settings.MONGODB_URI,
+        maxPoolSize=settings.MONGO_MAX_POOL_SIZE,
+        minPoolSize=settings.MONGO_MIN_POOL_SIZE,
+        maxConnecting=settings.MONGO_MAX_CONNECTING,
+        maxIdleTimeMS=settings.MONGO_MAX_IDLE_TIME_MS
+    )
+
 db = client[settings.MONGODB_DB]
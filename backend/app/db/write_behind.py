@@ -0,0 +1,230 @@
+"""
+Write-behind buffer for the per-evaluation writes.
+
+Each finished evaluation used to cost several round trips: the evaluation
+upsert, its trace, the leaderboard row and the ai_queue status update.
+Those writes are now buffered and sent as one unordered bulk_write per
+collection, flushed when WRITE_BEHIND_MAX_OPS writes are pending or
+WRITE_BEHIND_MAX_DELAY_MS after the first one, whichever comes first.
+Writes to the same document are coalesced into a single update.
+
+Only idempotent updates ($set / $setOnInsert / $unset) go through the
+buffer, so a batch that fails is put back and simply retried. The one
+exception is the queue counters' $inc (see db.counters): increments to a
+document are summed into a single update, and being approximate and
+rebuilt by init_db, a rare double count on retry is acceptable. Collections
+are flushed in COLLECTION_ORDER and a flush stops at the first failure:
+an ai_queue item is never marked completed before its evaluation is
+stored. If the process dies with writes still buffered, the item stays
+leased, and the reaper hands it out again once the lease expires.
+"""
+import asyncio
+import json
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+from pymongo import UpdateOne, WriteConcern
+
+from ..core.config import settings
+from ..core.metrics import registry
+from .mongo import db
+
+logger = logging.getLogger(__name__)
+
+# Results first, then queue status, then the counters that track it
+COLLECTION_ORDER = ("evaluations", "leaderboard", "ai_queue", "counters")
+
+WriteKey = Tuple[str, Optional[str], str]
+
+flush_duration = registry.histogram(
+    "write_behind_flush_seconds",
+    "Duration of one write-behind bulk_write, by collection"
+)
+flushed_writes = registry.counter(
+    "write_behind_writes_total",
+    "Buffered writes sent to Mongo, by collection"
+)
+flush_failures = registry.counter(
+    "write_behind_flush_failures_total",
+    "Failed write-behind flushes (the writes are retried)"
+)
+
+
+@dataclass
+class PendingWrite:
+    filter: dict
+    update: dict
+    upsert: bool
+
+
+def parse_write_concern(w: str, journal: bool) -> WriteConcern:
+    return WriteConcern(w=int(w) if w.isdigit() else w, j=journal or None)
+
+
+def merge_updates(older: dict, newer: dict) -> dict:
+    """Combine two update documents as if they were applied in order"""
+    merged = {op: dict(fields) for op, fields in older.items()}
+    for op, fields in newer.items():
+        for field, value in fields.items():
+            if op == "$inc":
+                value += merged.get(op, {}).get(field, 0)
+            elif op == "$setOnInsert":
+                # Only takes effect on insert, so an earlier $set still wins
+                if any(field in f for o, f in merged.items() if o != op):
+                    continue
+            else:
+                for other_op, other in merged.items():
+                    if other_op != op:
+                        other.pop(field, None)
+            merged.setdefault(op, {})[field] = value
+    return {op: fields for op, fields in merged.items() if fields}
+
+
+class WriteBehind:
+    def __init__(self, max_ops: int, max_delay: float, write_concern: WriteConcern):
+        self.max_ops = max_ops
+        self.max_delay = max_delay
+        self.write_concern = write_concern
+        self._pending: "OrderedDict[WriteKey, PendingWrite]" = OrderedDict()
+        self._callbacks: Dict[Tuple[str, str], Callable[[int], Awaitable]] = {}
+        self._lock: Optional[asyncio.Lock] = None
+        self._timer: Optional[asyncio.Task] = None
+
+    def on_flush(self, collection: str, group: str, callback: Callable[[int], Awaitable]):
+        """Call callback(modified_count) after each flush of a write group"""
+        self._callbacks[(collection, group)] = callback
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    async def update_one(
+        self,
+        collection: str,
+        filter: dict,
+        update: dict,
+        upsert: bool = False,
+        group: Optional[str] = None
+    ):
+        """
+        Buffer an update. Updates in the same group to the same filter are
+        coalesced; a group gets its own bulk_write so on_flush callbacks
+        see its modified count.
+        """
+        key = (collection, group, json.dumps(filter, sort_keys=True, default=str))
+        existing = self._pending.get(key)
+        if existing is None:
+            self._pending[key] = PendingWrite(filter, update, upsert)
+        else:
+            existing.update = merge_updates(existing.update, update)
+            existing.upsert = existing.upsert or upsert
+
+        # on_flush callbacks buffer writes while the lock is held; they wait for the timer
+        if len(self._pending) >= self.max_ops and not (self._lock and self._lock.locked()):
+            await self._flush_quietly()
+        elif self._timer is None or self._timer.done():
+            self._timer = asyncio.create_task(self._flush_later(self.max_delay))
+
+    async def flush(self):
+        """Write everything buffered so far; raises if Mongo rejects a batch"""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if not self._pending:
+                return
+            batch, self._pending = self._pending, OrderedDict()
+            try:
+                await self._write(batch)
+            except BaseException:
+                self._restore(batch)
+                raise
+
+    async def close(self, attempts: int = 3):
+        """Flush on shutdown, retrying briefly before giving up"""
+        if self._timer is not None and not self._timer.done():
+            self._timer.cancel()
+        for attempt in range(attempts):
+            try:
+                # Flush callbacks may buffer counter updates; write those too
+                while self._pending:
+                    await self.flush()
+                return
+            except Exception as e:
+                logger.warning("Write-behind flush failed on shutdown (attempt %d): %s", attempt + 1, e)
+                await asyncio.sleep(1)
+        if self._pending:
+            logger.error(
+                "Dropping %d buffered writes; their queue items stay leased and will be re-run",
+                len(self._pending)
+            )
+            self._pending.clear()
+
+    # ---------- Internals ----------
+
+    async def _flush_later(self, delay: float):
+        await asyncio.sleep(delay)
+        if not await self._flush_quietly() and self._pending:
+            # Back off while Mongo is unavailable
+            self._timer = asyncio.create_task(self._flush_later(min(max(delay * 2, 0.5), 10)))
+
+    async def _flush_quietly(self) -> bool:
+        try:
+            await self.flush()
+            return True
+        except Exception as e:
+            flush_failures.inc()
+            logger.warning("Write-behind flush failed, %d writes kept for retry: %s", len(self._pending), e)
+            return False
+
+    def _groups(self, batch: "OrderedDict[WriteKey, PendingWrite]"):
+        groups: "OrderedDict[Tuple[str, Optional[str]], list]" = OrderedDict()
+        for key in batch:
+            groups.setdefault(key[:2], []).append(key)
+        rank = {name: i for i, name in enumerate(COLLECTION_ORDER)}
+        return sorted(groups.items(), key=lambda item: rank.get(item[0][0], len(rank)))
+
+    async def _write(self, batch: "OrderedDict[WriteKey, PendingWrite]"):
+        for (collection, group), keys in self._groups(batch):
+            operations = [
+                UpdateOne(batch[k].filter, batch[k].update, upsert=batch[k].upsert)
+                for k in keys
+            ]
+            started = time.perf_counter()
+            result = await db.get_collection(
+                collection, write_concern=self.write_concern
+            ).bulk_write(operations, ordered=False)
+            flush_duration.observe(time.perf_counter() - started, collection=collection)
+            flushed_writes.inc(len(operations), collection=collection)
+
+            # Written: nothing from this group goes back on failure further on
+            for k in keys:
+                del batch[k]
+
+            callback = self._callbacks.get((collection, group))
+            if callback is not None:
+                try:
+                    await callback(result.modified_count)
+                except Exception as e:
+                    logger.warning("Write-behind callback for %s/%s failed: %s", collection, group, e)
+
+    def _restore(self, batch: "OrderedDict[WriteKey, PendingWrite]"):
+        """Put unwritten writes back ahead of anything buffered since"""
+        newer = self._pending
+        self._pending = OrderedDict(batch)
+        for key, write in newer.items():
+            existing = self._pending.get(key)
+            if existing is None:
+                self._pending[key] = write
+            else:
+                existing.update = merge_updates(existing.update, write.update)
+                existing.upsert = existing.upsert or write.upsert
+
+
+write_behind = WriteBehind(
+    max_ops=settings.WRITE_BEHIND_MAX_OPS,
+    max_delay=settings.WRITE_BEHIND_MAX_DELAY_MS / 1000,
+    write_concern=parse_write_concern(settings.WRITE_BEHIND_W, settings.WRITE_BEHIND_JOURNAL)
+)
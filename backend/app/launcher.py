@@ -0,0 +1,72 @@
+"""
+Production entry point.
+
+API processes and evaluation workers are separate process types so they
+can be scaled independently:
+
+    python -m app.launcher api --workers 4           # HTTP only
+    python -m app.launcher worker --processes 2      # evaluation workers
+    python -m app.launcher all --workers 2           # API processes with embedded workers
+
+Both drain in-flight evaluations on SIGTERM (see SHUTDOWN_DRAIN_SECONDS).
+"""
+import argparse
+import os
+
+from .core.config import settings
+from .core.logging_config import setup_logging
+
+
+def run_api(args):
+    import uvicorn
+
+    # Read by Settings in each uvicorn worker process
+    os.environ["RUN_EMBEDDED_WORKER"] = "true" if args.embedded_worker else "false"
+    if args.embedded_worker:
+        # Requests can still start evaluations inline; workers pick up the rest
+        os.environ.setdefault("DISPATCH_INLINE", "true")
+    else:
+        # Leave evaluation to the dedicated worker processes
+        os.environ.setdefault("DISPATCH_INLINE", "false")
+
+    uvicorn.run(
+        "app.main:app",
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        reload=False,
+        proxy_headers=True,
+        timeout_graceful_shutdown=int(settings.SHUTDOWN_DRAIN_SECONDS)
+    )
+
+
+def run_worker(args):
+    from .ai.process_queue import run_worker_processes
+
+    run_worker_processes(args.processes, args.concurrency, args.batch_size)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="AI Hiring Platform launcher")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    for name in ("api", "all"):
+        api = sub.add_parser(name, help="serve the HTTP API" + (" with embedded workers" if name == "all" else ""))
+        api.add_argument("--host", default="0.0.0.0")
+        api.add_argument("--port", type=int, default=8000)
+        api.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+        api.set_defaults(func=run_api, embedded_worker=name == "all")
+
+    worker = sub.add_parser("worker", help="run evaluation worker processes")
+    worker.add_argument("--processes", type=int, default=1)
+    worker.add_argument("--concurrency", type=int, default=settings.QUEUE_CONCURRENCY)
+    worker.add_argument("--batch-size", type=int, default=settings.QUEUE_BATCH_SIZE)
+    worker.set_defaults(func=run_worker)
+
+    args = parser.parse_args()
+    setup_logging()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,86 @@
+import time
+
+_import_started = time.perf_counter()
+
+import asyncio
+import logging
+import os
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from .api import jobs, applicants, admin, health
+from .api import jobs, applicants, bulk, events, admin, health, metrics
 from .middleware.error_handler import error_handler
+from .middleware.metrics import metrics_middleware
+from .core.config import settings
+from .core.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+startup_seconds = registry.gauge(
+    "process_startup_seconds",
+    "Cold start time by phase (import, lifespan)"
+)
+startup_seconds.set(time.perf_counter() - _import_started, phase="import")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start background work on startup and drain it on shutdown"""
+    from .ai import dispatch, ingest
+    from .ai.extraction import shutdown_executor
+    from .ai.github_client import close_github_client
+    from .core.events import run_relay
+    from .db.write_behind import write_behind
+
+    started = time.perf_counter()
+    os.makedirs(settings.RESUME_UPLOAD_DIR, exist_ok=True)
+
+    worker = None
+    worker_task = None
+    if settings.RUN_EMBEDDED_WORKER:
+        # Imported here so API-only processes never build the graph
+        from .ai.process_queue import QueueWorker
+
+        worker = QueueWorker()
+        worker_task = asyncio.create_task(worker.run())
+
+    # Progress events written by other processes / nodes (see core.events)
+    relay_task = None
+    if settings.EVENTS_BACKEND == "mongo":
+        relay_task = asyncio.create_task(run_relay())
+
+    # Resumes bulk ingests left unfinished by this or another process
+    ingest_reaper = asyncio.create_task(ingest.run_reaper())
+
+    startup_seconds.set(time.perf_counter() - started, phase="lifespan")
+    logger.info(
+        "AI Hiring Platform started in %.0f ms (imports %.0f ms), embedded worker: %s",
+        (time.perf_counter() - _import_started) * 1000,
+        startup_seconds.value(phase="import") * 1000,
+        settings.RUN_EMBEDDED_WORKER
+    )
+
+    yield
+
+    logger.info("Shutting down AI Hiring Platform, draining in-flight evaluations")
+    if worker is not None:
+        worker.request_stop(settings.SHUTDOWN_DRAIN_SECONDS)
+        await asyncio.wait([worker_task], timeout=settings.SHUTDOWN_DRAIN_SECONDS + 5)
+    await dispatch.drain(settings.SHUTDOWN_DRAIN_SECONDS)
+    ingest_reaper.cancel()
+    await ingest.drain(settings.SHUTDOWN_DRAIN_SECONDS)
+    await write_behind.close()
+    if relay_task is not None:
+        relay_task.cancel()
+    await close_github_client()
+    shutdown_executor()
+
 
-app = FastAPI(title="AI Hiring Platform")
+app = FastAPI(title="AI Hiring Platform", lifespan=lifespan)
 
 # Add error handling middleware
 app.middleware("http")(error_handler)
+app.middleware("http")(metrics_middleware)
 
 # Add CORS middleware
 app.add_middleware(
@@ -18,6 +92,6 @@ app.add_middleware(
 )
 
 # Include API routers
-routers = [jobs.router, applicants.router, admin.router, health.router]
+routers = [jobs.router, applicants.router, bulk.router, events.router, admin.router, health.router, metrics.router]
 for router in routers:
     app.include_router(router)
@@ -0,0 +1,20 @@
+from fastapi import Request
+import time
+from ..core.metrics import http_request_duration
+
+async def metrics_middleware(request: Request, call_next):
+    """Record request latency per route template"""
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        http_request_duration.observe(
+            time.perf_counter() - started,
+            method=request.method,
+            route=getattr(route, "path", "unmatched"),
+            status=status
+        )
@@ -0,0 +1 @@
+# Offline benchmark suite (see bench/pipeline.py)
@@ -0,0 +1,73 @@
+"""
+Outcome check for structured LLM decoding.
+
+Feeds canned answers through ai.structured.decode with a fake backend
+whose re-ask answer is well-formed, and checks each one ends up clean,
+repaired locally, or re-asked as expected. Wrong-shape objects (no core
+field) must be re-asked, never decoded to empty results. Exits non-zero
+on any mismatch.
+
+    python -m bench.decode
+"""
+import asyncio
+import json
+import os
+import sys
+
+RESUME = {"skills": ["Python", "FastAPI"], "years_of_experience": 4, "primary_role": "Backend", "tech_stack": []}
+GITHUB = {"github_score": 80, "tech_strengths": ["Go"], "weaknesses": [], "hiring_insight": "Solid"}
+
+CASES = [
+    # (schema, answer, expected outcome)
+    ("ResumeData", json.dumps(RESUME), "clean"),
+    ("ResumeData", "```json\n" + json.dumps(RESUME) + ",\n```", "repaired"),
+    ("ResumeData", "Here you go: " + json.dumps(RESUME) + " Hope this helps", "repaired"),
+    ("ResumeData", json.dumps({"resume": RESUME}), "repaired"),
+    ("ResumeData", json.dumps({"error": "cannot parse"}), "reasked"),
+    ("ResumeData", json.dumps({"resume": {"name": "x"}, "notes": []}), "reasked"),
+    ("ResumeData", "I could not read this resume.", "reasked"),
+    ("GitHubAnalysis", json.dumps(GITHUB), "clean"),
+    ("GitHubAnalysis", json.dumps({"tech_strengths": ["Go"]}), "reasked"),
+    ("GitHubAnalysis", json.dumps({"analysis": {"github_score": "85/100"}}), "repaired"),
+]
+
+
+async def run() -> int:
+    from app.ai import structured
+    from app.ai.llm import FakeBackend, set_backend
+
+    def responder(prompt: str) -> str:
+        return json.dumps(GITHUB if "github_score" in prompt else RESUME)
+
+    set_backend(FakeBackend(latency=0, responder=responder))
+
+    failures = 0
+    for name, answer, expected in CASES:
+        schema = getattr(structured, name)
+        before = {
+            outcome: structured.decode_outcomes.value(schema=name, outcome=outcome)
+            for outcome in ("clean", "repaired", "reasked", "failed")
+        }
+        result = await structured.decode(answer, schema)
+        outcome = next(
+            o for o, count in before.items()
+            if structured.decode_outcomes.value(schema=name, outcome=o) > count
+        )
+        ok = outcome == expected and result is not None
+        failures += not ok
+        print(f"{'ok  ' if ok else 'FAIL'} {name:15} {outcome:9} (expected {expected}) {answer[:50]!r}")
+
+    print(f"{len(CASES) - failures}/{len(CASES)} cases as expected")
+    return 1 if failures else 0
+
+
+def main():
+    os.environ.setdefault("GEMINI_API_KEY", "bench")
+    os.environ.setdefault("GITHUB_TOKEN", "")
+    os.environ.setdefault("LLM_BACKEND", "fake")
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    sys.exit(asyncio.run(run()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+In-process fake of the GitHub REST endpoints the analyzer uses.
+
+Served through httpx.ASGITransport, it exercises the real GitHubClient:
+pagination via Link headers, ETag / 304 handling and X-RateLimit headers,
+with a configurable per-request latency.
+"""
+import asyncio
+import hashlib
+import json
+import time
+
+from fastapi import FastAPI, Request, Response
+
+REPOS_PER_USER = 30
+LANGUAGES = ["Python", "TypeScript", "Go", "Rust", None]
+
+
+def build_app(latency: float = 0.0, rate_limit: int = 5000) -> FastAPI:
+    app = FastAPI()
+    app.state.requests = 0
+    app.state.remaining = rate_limit
+
+    def repos_for(username: str):
+        return [
+            {
+                "name": f"{username}-project-{i}",
+                "description": f"Project {i} by {username}",
+                "language": LANGUAGES[i % len(LANGUAGES)],
+                "stargazers_count": i * 3,
+            }
+            for i in range(REPOS_PER_USER)
+        ]
+
+    @app.get("/users/{username}/repos")
+    async def repos(username: str, request: Request, per_page: int = 30, page: int = 1):
+        app.state.requests += 1
+        if latency:
+            await asyncio.sleep(latency)
+
+        all_repos = repos_for(username)
+        start = (page - 1) * per_page
+        body = json.dumps(all_repos[start:start + per_page]).encode()
+        etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+
+        headers = {
+            "ETag": etag,
+            "X-RateLimit-Limit": str(rate_limit),
+            "X-RateLimit-Reset": str(int(time.time()) + 3600),
+        }
+        if start + per_page < len(all_repos):
+            next_url = request.url.include_query_params(page=page + 1)
+            headers["Link"] = f'<{next_url}>; rel="next"'
+
+        # Conditional hits are free on GitHub, so they don't consume quota
+        if request.headers.get("if-none-match") == etag:
+            headers["X-RateLimit-Remaining"] = str(app.state.remaining)
+            return Response(status_code=304, headers=headers)
+
+        app.state.remaining = max(0, app.state.remaining - 1)
+        headers["X-RateLimit-Remaining"] = str(app.state.remaining)
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    return app
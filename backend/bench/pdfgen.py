@@ -0,0 +1,91 @@
+"""
+Generate synthetic resume PDFs without any PDF library.
+
+The output is a minimal but valid PDF (one Helvetica text stream per
+page, correct xref table), which pdfplumber extracts like a real
+text-layer resume.
+"""
+import random
+from typing import List
+
+SKILLS = [
+    "Python", "FastAPI", "Django", "Flask", "MongoDB", "PostgreSQL", "Redis",
+    "Docker", "Kubernetes", "AWS", "GCP", "React", "TypeScript", "JavaScript",
+    "Go", "Rust", "Java", "Kafka", "Terraform", "GraphQL", "Pandas", "NumPy",
+]
+
+FILLER = [
+    "Designed and shipped services used by {n} thousand customers.",
+    "Owned on-call for {n} production systems and cut paging volume.",
+    "Wrote design docs and mentored {n} engineers across two teams.",
+    "Migrated {n} legacy jobs to a queue-based pipeline.",
+    "Reduced p99 latency by {n} percent through profiling and caching.",
+]
+
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def _content_stream(lines: List[str]) -> bytes:
+    parts = ["BT", "/F1 10 Tf", "12 TL", "50 790 Td"]
+    for line in lines:
+        parts.append(f"({_escape(line)}) Tj T*")
+    parts.append("ET")
+    return "\n".join(parts).encode("latin-1", "replace")
+
+
+def make_pdf(pages: List[List[str]]) -> bytes:
+    """Build a PDF with one page per list of text lines"""
+    objects: List[bytes] = []
+    page_ids = [4 + 2 * i for i in range(len(pages))]
+
+    objects.append(b"<< /Type /Catalog /Pages 2 0 R >>")
+    kids = " ".join(f"{pid} 0 R" for pid in page_ids)
+    objects.append(f"<< /Type /Pages /Kids [{kids}] /Count {len(pages)} >>".encode())
+    objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    for page_id, lines in zip(page_ids, pages):
+        stream = _content_stream(lines)
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {page_id + 1} 0 R >>".encode()
+        )
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+
+    xref_at = len(out)
+    out += b"xref\n0 %d\n" % (len(objects) + 1)
+    out += b"0000000000 65535 f \n"
+    for offset in offsets:
+        out += b"%010d 00000 n \n" % offset
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref_at)
+    return bytes(out)
+
+
+def make_resume(index: int, pages: int = 2, rng: random.Random = None) -> bytes:
+    rng = rng or random.Random(index)
+    skills = rng.sample(SKILLS, k=6)
+    content = []
+    for page in range(pages):
+        lines = [f"Candidate {index}  -  candidate{index}@example.com"]
+        if page == 0:
+            lines += ["", "SKILLS", ", ".join(skills), "", "EXPERIENCE"]
+        lines += [rng.choice(FILLER).format(n=rng.randint(2, 90)) for _ in range(50)]
+        lines += ["", f"Page {page + 1} of {pages}"]
+        content.append(lines)
+    return make_pdf(content)
+
+
+def make_corpus(count: int, pages: int = 2, unique: int = None) -> List[bytes]:
+    """
+    `count` resumes; with `unique` set, only that many distinct files are
+    generated and reused, which models candidates re-applying.
+    """
+    distinct = [make_resume(i, pages) for i in range(unique or count)]
+    return [distinct[i % len(distinct)] for i in range(count)]
@@ -0,0 +1,223 @@
+"""
+Offline end-to-end benchmark for apply -> evaluate.
+
+Drives POST /apply/{job_id} through the ASGI app and lets the evaluation
+pipeline drain, entirely in-process:
+
+- Mongo: mongomock-motor (MONGODB_URI=mongomock://), or a real local
+  mongod with --mongodb-uri
+- LLM: the gateway's FakeBackend with a configurable latency
+- GitHub: bench.fake_github served through httpx.ASGITransport
+- Resumes: generated PDFs (bench.pdfgen)
+
+Reports applications/sec, HTTP latency percentiles, per-stage latency
+percentiles from the tracing layer, event-loop lag and memory.
+
+    pip install -r requirements.txt -r bench/requirements.txt
+    python -m bench.pipeline --applicants 200 --concurrency 20 --llm-latency-ms 300
+"""
+import argparse
+import asyncio
+import json
+import os
+import resource
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import List
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Offline apply -> evaluate benchmark")
+    parser.add_argument("--applicants", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=10, help="concurrent POST /apply clients")
+    parser.add_argument("--unique-resumes", type=int, default=None, help="reuse N distinct files (re-applications)")
+    parser.add_argument("--pages", type=int, default=2, help="pages per generated resume")
+    parser.add_argument("--llm-latency-ms", type=int, default=200)
+    parser.add_argument("--github-latency-ms", type=int, default=50)
+    parser.add_argument("--mode", choices=["inline", "worker"], default="worker",
+                        help="start evaluations from the API when admission allows (overflow goes "
+                             "to the worker pool), or only through the worker pool")
+    parser.add_argument("--workers", type=int, default=8, help="worker pool concurrency")
+    parser.add_argument("--batch-size", type=int, default=1)
+    parser.add_argument("--mongodb-uri", default="mongomock://bench")
+    parser.add_argument("--timeout", type=float, default=600)
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    return parser.parse_args()
+
+
+def configure_environment(args, upload_dir: str):
+    """Settings are read at import time, so this must run before importing app"""
+    os.environ.update({
+        "MONGODB_URI": args.mongodb_uri,
+        "MONGODB_DB": "ai_hiring_bench",
+        "GEMINI_API_KEY": os.environ.get("GEMINI_API_KEY", "bench"),
+        "GITHUB_TOKEN": "",
+        "RESUME_UPLOAD_DIR": upload_dir,
+        "LLM_BACKEND": "fake",
+        "LLM_FAKE_LATENCY_MS": str(args.llm_latency_ms),
+        "QUEUE_USE_CHANGE_STREAMS": "false",
+        "QUEUE_CONCURRENCY": str(args.workers),
+        "QUEUE_BATCH_SIZE": str(args.batch_size),
+        "DISPATCH_INLINE": "true" if args.mode == "inline" else "false",
+        "TRACING_ENABLED": "true",
+    })
+
+
+def percentiles(values: List[float]) -> dict:
+    if not values:
+        return {}
+    ordered = sorted(values)
+
+    def at(q):
+        return round(ordered[min(len(ordered) - 1, int(q * (len(ordered) - 1) + 0.5))], 2)
+
+    return {"p50": at(0.50), "p95": at(0.95), "p99": at(0.99), "max": round(ordered[-1], 2)}
+
+
+async def monitor_loop_lag(samples: List[float], interval: float = 0.01):
+    loop = asyncio.get_running_loop()
+    while True:
+        started = loop.time()
+        await asyncio.sleep(interval)
+        samples.append(max(0.0, loop.time() - started - interval) * 1000)
+
+
+async def run(args) -> dict:
+    import httpx
+
+    from app.main import app
+    from app.ai import queue
+    from app.ai.github_client import GitHubClient, set_github_client
+    from app.ai.process_queue import QueueWorker
+    from app.core import tracing
+    from app.db.mongo import db
+    from bench import fake_github
+    from bench.pdfgen import make_corpus
+
+    github_app = fake_github.build_app(latency=args.github_latency_ms / 1000)
+    set_github_client(GitHubClient(
+        base_url="http://fake-github",
+        token="",
+        transport=httpx.ASGITransport(app=github_app)
+    ))
+
+    corpus = make_corpus(args.applicants, pages=args.pages, unique=args.unique_resumes)
+    lag_ms: List[float] = []
+    lag_task = asyncio.create_task(monitor_loop_lag(lag_ms))
+
+    # Also in inline mode: evaluations admission defers to the queue need a worker
+    worker = QueueWorker(args.workers, args.batch_size)
+    worker_task = asyncio.create_task(worker.run())
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+        response = await client.post("/jobs/", json={
+            "title": "Backend Engineer",
+            "description": "Benchmark job",
+            "required_skills": ["Python", "FastAPI", "MongoDB", "Docker", "AWS"],
+            "experience_level": "Mid"
+        })
+        response.raise_for_status()
+        job_id = response.json()["id"]
+
+        http_ms: List[float] = []
+        semaphore = asyncio.Semaphore(args.concurrency)
+
+        async def apply(index: int):
+            async with semaphore:
+                started = time.perf_counter()
+                response = await client.post(
+                    f"/apply/{job_id}",
+                    data={
+                        "name": f"Candidate {index}",
+                        "email": f"candidate{index}@example.com",
+                        "github_url": f"https://github.com/user{index % 50}",
+                    },
+                    files={"resume": (f"resume{index}.pdf", corpus[index], "application/pdf")},
+                )
+                http_ms.append((time.perf_counter() - started) * 1000)
+                response.raise_for_status()
+
+        started = time.perf_counter()
+        await asyncio.gather(*(apply(i) for i in range(args.applicants)))
+        submitted_at = time.perf_counter()
+
+        # Wait for the queue to drain
+        deadline = submitted_at + args.timeout
+        while time.perf_counter() < deadline:
+            open_items = await db.ai_queue.count_documents({"status": {"$in": ["pending", "processing"]}})
+            if open_items == 0:
+                break
+            await asyncio.sleep(0.05)
+        finished_at = time.perf_counter()
+
+    await worker.stop(timeout=5)
+    queue.notify()
+    worker_task.cancel()
+    lag_task.cancel()
+
+    outcomes = {}
+    async for row in db.ai_queue.aggregate([{"$group": {"_id": "$status", "n": {"$sum": 1}}}]):
+        outcomes[row["_id"]] = row["n"]
+
+    submit_s = submitted_at - started
+    total_s = finished_at - started
+    current, peak = tracemalloc.get_traced_memory()
+    return {
+        "config": {k: v for k, v in vars(args).items() if k != "json"},
+        "queue_outcomes": outcomes,
+        "submit_seconds": round(submit_s, 3),
+        "total_seconds": round(total_s, 3),
+        "submit_per_sec": round(args.applicants / submit_s, 1) if submit_s else None,
+        "applications_per_sec": round(args.applicants / total_s, 1) if total_s else None,
+        "http_apply_ms": percentiles(http_ms),
+        "stages_ms": tracing.summary(),
+        "event_loop_lag_ms": percentiles(lag_ms),
+        "memory": {
+            "python_peak_mb": round(peak / 1024 / 1024, 1),
+            "max_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        },
+        "github_requests": github_app.state.requests,
+    }
+
+
+def print_report(report: dict):
+    print(f"\nApplicants: {report['config']['applicants']}  mode: {report['config']['mode']}  "
+          f"outcomes: {report['queue_outcomes']}")
+    print(f"Submit:     {report['submit_seconds']}s  ({report['submit_per_sec']}/s)")
+    print(f"End-to-end: {report['total_seconds']}s  ({report['applications_per_sec']} applications/s)")
+    print(f"POST /apply ms:      {report['http_apply_ms']}")
+    print(f"Event-loop lag ms:   {report['event_loop_lag_ms']}")
+    print(f"Memory:              {report['memory']}")
+    print(f"GitHub requests:     {report['github_requests']}")
+    print("\nStage latency (ms):")
+    for name, stats in report["stages_ms"].items():
+        print(f"  {name:<28} n={stats['count']:<6} p50={stats['p50_ms']:<9} "
+              f"p95={stats['p95_ms']:<9} max={stats['max_ms']}")
+
+
+def main():
+    args = parse_args()
+    upload_dir = tempfile.mkdtemp(prefix="bench-uploads-")
+    configure_environment(args, upload_dir)
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+    tracemalloc.start()
+    try:
+        report = asyncio.run(run(args))
+    finally:
+        from app.ai.extraction import shutdown_executor
+        shutdown_executor()
+        shutil.rmtree(upload_dir, ignore_errors=True)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+
+
+if __name__ == "__main__":
+    main()
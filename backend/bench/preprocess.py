@@ -0,0 +1,57 @@
+"""
+Compression and skill-recall check for resume preprocessing.
+
+Extracts a generated resume corpus, runs preprocess_resume at the given
+token budget and reports token savings and how many of the skills that
+appear in the raw text survive packing (should be 100%).
+
+    python -m bench.preprocess --resumes 50 --pages 4 --budget 1500
+"""
+import argparse
+import os
+import re
+import sys
+import tempfile
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Resume preprocessing recall check")
+    parser.add_argument("--resumes", type=int, default=50)
+    parser.add_argument("--pages", type=int, default=4)
+    parser.add_argument("--budget", type=int, default=None)
+    args = parser.parse_args()
+
+    os.environ.setdefault("GEMINI_API_KEY", "bench")
+    os.environ.setdefault("GITHUB_TOKEN", "")
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+    from app.ai.extraction import extract_pdf_pages
+    from app.ai.preprocess import preprocess_resume
+    from bench.pdfgen import SKILLS, make_resume
+
+    raw_tokens = packed_tokens = expected = recalled = 0
+    with tempfile.TemporaryDirectory() as tmp:
+        for i in range(args.resumes):
+            path = os.path.join(tmp, f"{i}.pdf")
+            with open(path, "wb") as f:
+                f.write(make_resume(i, pages=args.pages))
+
+            raw, _ = extract_pdf_pages(path, 0, args.pages, 10 ** 7)
+            result = preprocess_resume(raw, args.budget)
+
+            raw_tokens += result.stats["raw_tokens"]
+            packed_tokens += result.stats["tokens"]
+            for skill in SKILLS:
+                pattern = re.compile(rf"\b{re.escape(skill)}\b")
+                if pattern.search(raw):
+                    expected += 1
+                    recalled += bool(pattern.search(result.text))
+
+    print(f"Resumes:        {args.resumes} x {args.pages} pages")
+    print(f"Tokens:         {raw_tokens} -> {packed_tokens} "
+          f"({100 - packed_tokens * 100 // max(raw_tokens, 1)}% saved)")
+    print(f"Skill recall:   {recalled}/{expected} ({recalled * 100 // max(expected, 1)}%)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Regression check for skill normalization.
+
+Typos must resolve to their skill; distinct skills and ordinary words
+that are a letter or a longer name away must stay as they are. Exits
+non-zero on any mismatch.
+
+    python -m bench.skills
+"""
+import os
+import sys
+
+CASES = [
+    # (input, expected canonical name)
+    # One-edit typos the fuzzy layer exists for
+    ("reactt", "react"),
+    ("dockr", "docker"),
+    ("pythn", "python"),
+    ("terrafrom", "terraform"),
+    ("tensorflw", "tensorflow"),
+    ("javascrpt", "javascript"),
+    ("angularr", "angular"),
+    ("kotlinn", "kotlin"),
+    ("Kubernets", "kubernetes"),
+    ("Typescipt", "typescript"),
+    ("postgress", "postgresql"),
+    ("scikit-lean", "scikit-learn"),
+    # Aliases and versions
+    ("JS", "javascript"),
+    ("Golang 1.21", "go"),
+    ("Tensorflow 2.x", "tensorflow"),
+    # Related or longer names stay apart
+    ("github", "github"),
+    ("gitlab", "gitlab"),
+    ("scrum", "scrum"),
+    ("ubuntu", "ubuntu"),
+    ("tf", "tf"),
+    ("elastic", "elastic"),
+    ("torch", "torch"),
+    ("shell", "shell"),
+    ("next", "next"),
+    ("rabbit", "rabbit"),
+    # A changed letter in a short word is another word
+    ("flash", "flash"),
+    ("scale", "scale"),
+    ("shift", "shift"),
+    ("erlang", "erlang"),
+    ("rest", "rest api"),
+]
+
+
+def run() -> int:
+    from app.ai.skills import resolve_many
+
+    resolved = resolve_many([skill for skill, _ in CASES])
+    failures = 0
+    for (skill, expected), got in zip(CASES, resolved):
+        ok = got == expected
+        failures += not ok
+        print(f"{'ok  ' if ok else 'FAIL'} {skill:15} -> {got:15} (expected {expected})")
+
+    print(f"{len(CASES) - failures}/{len(CASES)} skills as expected")
+    return 1 if failures else 0
+
+
+def main():
+    os.environ.setdefault("GEMINI_API_KEY", "bench")
+    os.environ.setdefault("GITHUB_TOKEN", "")
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    sys.exit(run())
+
+
+if __name__ == "__main__":
+    main()